@@ -1,483 +1,1040 @@
+import io
+import os
+import tempfile
+import time
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-from transformers import pipeline
 import matplotlib.pyplot as plt
-import seaborn as sns
-from PIL import Image
-
-# Initialize the AI chatbot model
-chatbot = pipeline("text-generation", model="microsoft/DialoGPT-medium", framework="pt")
-
-st.markdown("""
-    <style>
-    /* General Styles */
-    body {
-        font-family: 'Arial', sans-serif;
-        background-color: #f4f7f6;
-    }
-
-    /* Footer Styling */
-    .footer {
-        position: fixed;
-        bottom: 0;
-        width: 100%;
-        background: linear-gradient(to right, #2E8B57, #4682B4);
-        color: white;
-        text-align: center;
-        padding: 12px 0;
-        font-size: 16px;
-        font-weight: bold;
-        border-top-left-radius: 10px;
-        border-top-right-radius: 10px;
-        box-shadow: 0px -2px 5px rgba(0, 0, 0, 0.2);
-    }
-
-    /* Highlight Box for Important Information */
-    .highlight-box {
-        background: linear-gradient(135deg, #E3F2FD, #BBDEFB);
-        padding: 15px;
-        border-left: 5px solid #4682B4;
-        border-radius: 8px;
-        font-size: 16px;
-        color: #333;
-        margin-bottom: 20px;
-        box-shadow: 2px 2px 8px rgba(0, 0, 0, 0.1);
-    }
-
-    /* Sidebar Enhancements */
-    .sidebar .block-container {
-        background: white;
-        border-radius: 10px;
-        padding: 20px;
-        box-shadow: 2px 2px 10px rgba(0, 0, 0, 0.1);
-    }
-
-    /* Button Styling */
-    .stButton > button {
-        background: linear-gradient(to right, #2E8B57, #4682B4);
-        color: white;
-        font-size: 16px;
-        padding: 10px 15px;
-        border-radius: 8px;
-        border: none;
-        cursor: pointer;
-        transition: 0.3s ease-in-out;
-    }
-    .stButton > button:hover {
-        background: linear-gradient(to right, #4682B4, #2E8B57);
-        transform: scale(1.05);
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-
-# Page title and introduction
-st.title("🌍 Advanced Ecosystem Analyzer ")
-
-# Introduction Section
-st.markdown("""
-    🌿 **Welcome to the Ecosystem Simulation Portal!**  
-    Gain deep insights into biodiversity, species interactions, and ecosystem dynamics through **interactive simulations and AI-powered analytics.**  
-    🦁 Predict changes in wildlife populations, explore conservation strategies, and uncover the impact of climate on ecosystems! 🌎  
-""")
+from ecosim import DEFAULT_PARAMS, SPECIES, run_ensemble
+from ecosim.core import population_insights, run_simulation
+from ecosim.continuous import ODE_METHODS, solve_continuous
+from ecosim.foodweb import random_food_web, simulate_web, three_species_env
+from ecosim.plots import dashboard_views
+from ecosim.sensitivity import PARAMETER_RANGES, morris_analysis, sobol_analysis
+from ecosim.spatial import SpatialEcosystem
+from ecosim.streaming import PeakDownsampler, RunningStats, simulation_chunks
+from ecosim.batching import get_worker
+from ecosim.cache import get_response_cache
+from ecosim.generation import Conversation, stream_reply
+from ecosim import inference
+from ecosim.knowledge import CONSERVATION_GUIDES, QUIZ_QUESTIONS, RESOURCES, get_index, match_species
+from ecosim.models import CHATBOT_MODEL, registry, resident_memory
+from ecosim.runstore import PARAMETERS, get_run_store
+from ecosim.timing import SamplingProfiler, SectionTimer, enable_span_log, prometheus_text, process_timer, span, start_prometheus_export
+
+# How the chatbot model runs on the CPU: ECOSIM_INFERENCE_PROFILE=int8 quantizes
+# it (smaller and faster, slightly different answers), and
+# ECOSIM_CONCURRENT_SESSIONS splits the cores between that many simultaneous
+# generations instead of letting each one use them all. Must be set before the
+# model loads.
+inference.configure(inference.get_profile(
+    os.environ.get("ECOSIM_INFERENCE_PROFILE", "fp32"),
+    int(os.environ.get("ECOSIM_CONCURRENT_SESSIONS", 0)) or None,
+))
+
+# Curated guides, quiz and resources, indexed once per process for the chatbot
+knowledge = get_index()
+PROMPT_SEPARATOR = "<|endoftext|>"  # DialoGPT's end-of-turn token
+
+# The AI chatbot model is loaded once per process, on first use, and shared by
+# every session. Set ECOSIM_WARMUP_CHATBOT=1 to load it in the background as
+# soon as the first page is served instead.
+if os.environ.get("ECOSIM_WARMUP_CHATBOT") == "1":
+    registry.warm_up(CHATBOT_MODEL)
+
+# Questions from all sessions go through one worker thread that runs them
+# through the model in small batches. ECOSIM_BATCH_SIZE and ECOSIM_BATCH_WAIT_MS
+# trade per-question latency for throughput under concurrent load.
+chatbot_worker = get_worker(
+    CHATBOT_MODEL,
+    max_batch_size=int(os.environ.get("ECOSIM_BATCH_SIZE", 8)),
+    max_wait=float(os.environ.get("ECOSIM_BATCH_WAIT_MS", 20)) / 1000,
+)
+
+# Answers are cached in memory for all sessions and, when ECOSIM_CACHE_PATH
+# names a file, on disk across restarts as well.
+response_cache = get_response_cache(
+    max_entries=int(os.environ.get("ECOSIM_CACHE_ENTRIES", 512)),
+    path=os.environ.get("ECOSIM_CACHE_PATH"),
+    max_disk_bytes=int(os.environ.get("ECOSIM_CACHE_MAX_MB", 64)) * 2**20,
+    ttl=float(os.environ.get("ECOSIM_CACHE_TTL_HOURS", 168)) * 3600,
+)
+
+# Every run with population trends is saved to a store on disk, shared by all
+# sessions and kept across restarts, so past runs can be overlaid, compared and
+# replayed without simulating them again. ECOSIM_RUN_STORE names its directory.
+run_store = get_run_store(os.environ.get("ECOSIM_RUN_STORE") or os.path.join(tempfile.gettempdir(), "ecosim-runs"))
+
+# Per-session record of which sections each rerun executes and how long they take
+timer = st.session_state.setdefault("section_timer", SectionTimer())
+
+# The same timings summed over all sessions: ECOSIM_METRICS_PATH names a file
+# rewritten in the Prometheus text format (e.g. for node_exporter's textfile
+# collector), ECOSIM_SPAN_LOG a file that gets one JSON line per measurement.
+if os.environ.get("ECOSIM_METRICS_PATH"):
+    start_prometheus_export(os.environ["ECOSIM_METRICS_PATH"], float(os.environ.get("ECOSIM_METRICS_INTERVAL", 15)))
+if os.environ.get("ECOSIM_SPAN_LOG"):
+    enable_span_log(os.environ["ECOSIM_SPAN_LOG"])
+
+# The debug panel at the bottom of the page is hidden unless the page is
+# opened with ?debug=1 or the server runs with ECOSIM_DEBUG=1. From there a
+# sampling profiler can be switched on for one full run of this script.
+debug_mode = st.query_params.get("debug") == "1" or os.environ.get("ECOSIM_DEBUG") == "1"
+profiler = st.session_state.pop("profiler", None)
+if profiler is not None:
+    # The profiled run was interrupted before it reached the end
+    profiler.stop()
+if st.session_state.pop("profile_next_run", False):
+    profiler = st.session_state["profiler"] = SamplingProfiler().start()
+
+# Sections that only run on a full script run are timed inline; widget-driven
+# sections are fragments, so interacting with them reruns only that fragment.
+with timer.section("Page setup"):
+    with span("CSS injection"):
+        st.markdown("""
+            <style>
+            /* General Styles */
+            body {
+                font-family: 'Arial', sans-serif;
+                background-color: #f4f7f6;
+            }
+
+            /* Footer Styling */
+            .footer {
+                position: fixed;
+                bottom: 0;
+                width: 100%;
+                background: linear-gradient(to right, #2E8B57, #4682B4);
+                color: white;
+                text-align: center;
+                padding: 12px 0;
+                font-size: 16px;
+                font-weight: bold;
+                border-top-left-radius: 10px;
+                border-top-right-radius: 10px;
+                box-shadow: 0px -2px 5px rgba(0, 0, 0, 0.2);
+            }
+
+            /* Highlight Box for Important Information */
+            .highlight-box {
+                background: linear-gradient(135deg, #E3F2FD, #BBDEFB);
+                padding: 15px;
+                border-left: 5px solid #4682B4;
+                border-radius: 8px;
+                font-size: 16px;
+                color: #333;
+                margin-bottom: 20px;
+                box-shadow: 2px 2px 8px rgba(0, 0, 0, 0.1);
+            }
+
+            /* Sidebar Enhancements */
+            .sidebar .block-container {
+                background: white;
+                border-radius: 10px;
+                padding: 20px;
+                box-shadow: 2px 2px 10px rgba(0, 0, 0, 0.1);
+            }
+
+            /* Button Styling */
+            .stButton > button {
+                background: linear-gradient(to right, #2E8B57, #4682B4);
+                color: white;
+                font-size: 16px;
+                padding: 10px 15px;
+                border-radius: 8px;
+                border: none;
+                cursor: pointer;
+                transition: 0.3s ease-in-out;
+            }
+            .stButton > button:hover {
+                background: linear-gradient(to right, #4682B4, #2E8B57);
+                transform: scale(1.05);
+            }
+            </style>
+        """, unsafe_allow_html=True)
+
+
+    # Page title and introduction
+    st.title("🌍 Advanced Ecosystem Analyzer ")
+
+    # Introduction Section
+    st.markdown("""
+        🌿 **Welcome to the Ecosystem Simulation Portal!**  
+        Gain deep insights into biodiversity, species interactions, and ecosystem dynamics through **interactive simulations and AI-powered analytics.**  
+        🦁 Predict changes in wildlife populations, explore conservation strategies, and uncover the impact of climate on ecosystems! 🌎  
+    """)
 
-# Call-to-Action
-st.success("🔍 **Start exploring by adjusting parameters in the sidebar!**")
+    # Call-to-Action
+    st.success("🔍 **Start exploring by adjusting parameters in the sidebar!**")
 
 
 # AI Chatbot Interface
-st.sidebar.title("🤖 AI Ecosystem Chatbot")
-
-# User Input Area
-st.sidebar.markdown("💬 **Ask me anything about the ecosystem, biodiversity, or species!**")
-user_query = st.sidebar.text_area("🔍 Type your question below:", placeholder="e.g., How does deforestation affect biodiversity?")
-
-# Chatbot Response Area
-if st.sidebar.button("💡 Get Expert Insights"):
-    with st.spinner("Thinking... 🤔"):
-        try:
-            # Generate AI Response
-            response = chatbot(user_query, max_length=150, num_return_sequences=1)
-            chatbot_response = response[0]['generated_text']
-
-            # Display Response
-            st.sidebar.markdown("### 🌍 AI Ecosystem Insight:")
-            st.sidebar.success(chatbot_response)
-
-            # Additional Suggestions
-            st.sidebar.info("💡 **Tip:** You can also ask about specific species, ecosystems, or conservation methods!")
-        
-        except Exception as e:
-            st.sidebar.error(f"❌ Error: {str(e)}")
-
-# Additional Features for a Better Experience
-st.sidebar.markdown("---")  # Separator for UI clarity
-st.sidebar.markdown("🔹 **Try asking:**")
-st.sidebar.markdown("- What are the main threats to coral reefs? 🪸")
-st.sidebar.markdown("- How do predators maintain ecological balance? 🦁")
-st.sidebar.markdown("- What are the best conservation practices for tigers? 🐅")
-st.sidebar.markdown("- How does climate change impact marine ecosystems? 🌊")
-
+@st.fragment
+def chatbot_section():
+    with timer.section("Chatbot"):
+        st.title("🤖 AI Ecosystem Chatbot")
+
+        # User Input Area
+        st.markdown("💬 **Ask me anything about the ecosystem, biodiversity, or species!**")
+        user_query = st.text_area("🔍 Type your question below:", placeholder="e.g., How does deforestation affect biodiversity?")
+
+        stream_answer = st.checkbox("⚡ Stream the answer as it is written", value=True, help="Show words as soon as the AI produces them. Turn off to have your question batched with other users' questions instead.")
+        multi_turn = st.checkbox("🗨️ Remember the conversation", value=False, help="Answer each question in the context of your earlier ones. Follow-up answers are quick because the conversation so far is not re-read.")
+        conversation = st.session_state.get("conversation")
+        if multi_turn and conversation is not None and conversation.turns:
+            for message, answer in conversation.turns:
+                if answer is not None:
+                    st.markdown(f"**You:** {message}")
+                    st.markdown(f"**AI:** {answer}")
+            if st.button("🧹 Start a New Conversation"):
+                conversation.reset()
+                st.rerun(scope="fragment")
+
+        # Chatbot Response Area
+        if st.button("💡 Get Expert Insights"):
+            spinner_text = "Thinking... 🤔" if registry.is_loaded(CHATBOT_MODEL) else "Loading the AI model (first question only)... 🤔"
+            # Questions the guides, quiz or resources answer outright skip the
+            # model; others get the closest passages prepended as context
+            with span("knowledge.lookup"):
+                knowledge_hit = None if multi_turn else knowledge.answer(user_query)
+                prompt = user_query if multi_turn else knowledge.prompt(user_query, PROMPT_SEPARATOR)
+            grounded = prompt != user_query
+            # With context the prompt length varies, so bound the answer instead of the total
+            generation_params = {"max_new_tokens": 100} if grounded else {"max_length": 150}
+            try:
+                cached_response = None if multi_turn or knowledge_hit else response_cache.get(user_query, **generation_params)
+                if knowledge_hit is not None:
+                    st.markdown("### 🌍 AI Ecosystem Insight:")
+                    st.success(knowledge_hit.document.text)
+                    st.caption(f"📚 Answered instantly from the {knowledge_hit.document.kind} “{knowledge_hit.document.title}”.")
+                elif multi_turn:
+                    with st.spinner(spinner_text):
+                        chatbot = registry.get(CHATBOT_MODEL)
+                    if conversation is None:
+                        conversation = st.session_state["conversation"] = Conversation(chatbot)
+
+                    # Answers depend on the earlier turns, so they bypass the answer cache
+                    st.button("⏹ Stop Answer")
+                    st.markdown("### 🌍 AI Ecosystem Insight:")
+                    answer_box = st.empty()
+                    with conversation.reply(user_query, max_new_tokens=100) as reply:
+                        for _ in reply:
+                            answer_box.success(reply.text + " ▌")
+                    answer_box.success(reply.text)
+                elif cached_response is not None:
+                    # Same question asked before: no generation needed
+                    st.markdown("### 🌍 AI Ecosystem Insight:")
+                    st.success(cached_response)
+                elif stream_answer:
+                    with st.spinner(spinner_text):
+                        chatbot = registry.get(CHATBOT_MODEL)
+
+                    # Clicking Stop, editing the question or leaving the page interrupts
+                    # this run, which exits the with block below and cancels generation.
+                    st.button("⏹ Stop Answer")
+                    st.markdown("### 🌍 AI Ecosystem Insight:")
+                    answer_box = st.empty()
+                    with stream_reply(chatbot, prompt, skip_prompt=grounded, **generation_params) as reply:
+                        for _ in reply:
+                            answer_box.success(reply.text + " ▌")
+                    chatbot_response = reply.text
+                    answer_box.success(chatbot_response)
+                    response_cache.put(user_query, chatbot_response, **generation_params)
+                else:
+                    with st.spinner(spinner_text):
+                        # Generate AI Response (batched with other sessions' questions)
+                        answer = chatbot_worker.submit(prompt, num_return_sequences=1, return_full_text=not grounded, **generation_params)
+                        try:
+                            with span("chatbot.wait_for_batch"):
+                                chatbot_response = answer.result()
+                        finally:
+                            # Frees the batch slot if this script run is interrupted before the answer arrives
+                            answer.cancel()
+                    response_cache.put(user_query, chatbot_response, **generation_params)
+
+                    # Display Response
+                    st.markdown("### 🌍 AI Ecosystem Insight:")
+                    st.success(chatbot_response)
+
+                # Additional Suggestions
+                st.info("💡 **Tip:** You can also ask about specific species, ecosystems, or conservation methods!")
+
+            except Exception as e:
+                st.error(f"❌ Error: {str(e)}")
+
+        # Additional Features for a Better Experience
+        st.markdown("---")  # Separator for UI clarity
+        st.markdown("🔹 **Try asking:**")
+        st.markdown("- What are the main threats to coral reefs? 🪸")
+        st.markdown("- How do predators maintain ecological balance? 🦁")
+        st.markdown("- What are the best conservation practices for tigers? 🐅")
+        st.markdown("- How does climate change impact marine ecosystems? 🌊")
+
+        # Model load cost, shared by all sessions of this server process
+        with st.expander("⚙️ AI Model Status"):
+            model_stats = registry.stats().get(CHATBOT_MODEL)
+            if model_stats is None:
+                st.write("Not loaded yet: the model loads on the first question.")
+            else:
+                st.write(f"**Status:** {model_stats['status']}")
+                if model_stats["load_seconds"] is not None:
+                    st.write(f"**Load time:** {model_stats['load_seconds']:.1f} s")
+                    st.write(f"**Memory used by model:** {model_stats['rss_delta_bytes'] / 2**20:.0f} MB")
+                if model_stats["error"]:
+                    st.write(f"**Last error:** {model_stats['error']}")
+            st.write(f"**Server process memory:** {resident_memory() / 2**20:.0f} MB")
+            profile = inference.active_profile()
+            threads = profile.intra_op_threads or "all"
+            st.write(f"**Inference profile:** {profile.name} ({threads} threads per generation)")
+            if conversation is not None and conversation.encoded_tokens:
+                st.write(f"**This conversation:** {conversation.reused_tokens} tokens reused from the cache · "
+                         f"{conversation.encoded_tokens} tokens encoded")
+            queue_stats = chatbot_worker.stats()
+            st.write(f"**Questions waiting:** {queue_stats['queue_depth']}")
+            if queue_stats["batches"]:
+                st.write(f"**Answered:** {queue_stats['requests']} questions in {queue_stats['batches']} batches "
+                         f"(mean batch size {queue_stats['mean_batch_size']:.1f})")
+                st.write(f"**Response time:** p50 {queue_stats['latency_p50']:.2f} s · "
+                         f"p90 {queue_stats['latency_p90']:.2f} s · p99 {queue_stats['latency_p99']:.2f} s")
+            cache_stats = response_cache.stats()
+            st.write(f"**Answer cache:** {cache_stats['memory_hits']} memory hits · {cache_stats['disk_hits']} disk hits · "
+                     f"{cache_stats['misses']} misses")
+            if cache_stats["disk_entries"] is not None:
+                st.write(f"**Cached on disk:** {cache_stats['disk_entries']} answers ({cache_stats['disk_bytes'] / 2**10:.0f} KB)")
+
+
+with st.sidebar:
+    chatbot_section()
+
+
+# Simulation modes offered in the sidebar
+SINGLE_RUN_MODE = "📈 Single Run"
+ENSEMBLE_MODE = "🎲 Monte Carlo Ensemble"
+FOOD_WEB_MODE = "🕸 Large Food Web"
+SPATIAL_MODE = "🗺 Spatial Grid"
+CONTINUOUS_MODE = "〰️ Continuous Time (Adaptive ODE)"
+STREAMING_MODE = "♾️ Long Horizon (Streaming)"
+SIMULATION_MODES = [SINGLE_RUN_MODE, ENSEMBLE_MODE, FOOD_WEB_MODE, SPATIAL_MODE, CONTINUOUS_MODE, STREAMING_MODE]
+
+# Seconds between redraws of the live long-horizon chart
+STREAM_REDRAW_INTERVAL = 0.25
+
+# Largest side, in pixels, of the live spatial map
+SPATIAL_FRAME_SIZE = 720
+
+# Percentiles drawn as uncertainty bands in ensemble mode
+ENSEMBLE_PERCENTILES = (5, 25, 50, 75, 95)
 
 # Sidebar Parameters for Simulation
-st.sidebar.title("🔧 Simulation Settings")
-
-# 🌱 Ecosystem Parameters
-st.sidebar.subheader("🌍 Ecosystem Settings")
-plant_growth_rate = st.sidebar.slider("🌱 Plant Growth Rate", 0.01, 0.5, 0.2, help="Controls how quickly plants regenerate.")
-herbivore_birth_rate = st.sidebar.slider("🐇 Herbivore Birth Rate", 0.01, 0.3, 0.1, help="Rate at which herbivores reproduce.")
-predator_birth_rate = st.sidebar.slider("🦁 Predator Birth Rate", 0.01, 0.2, 0.05, help="Rate at which predators reproduce.")
-
-# 📊 Initial Population Settings
-st.sidebar.subheader("👥 Initial Population")
-initial_plants = st.sidebar.slider("🌼 Initial Plant Population", 50, 500, 100, help="Starting number of plants in the ecosystem.")
-initial_herbivores = st.sidebar.slider("🐐 Initial Herbivore Population", 10, 100, 30, help="Starting number of herbivores.")
-initial_predators = st.sidebar.slider("🦅 Initial Predator Population", 5, 50, 10, help="Starting number of predators.")
-
-# ⏳ Simulation Control
-st.sidebar.subheader("⏳ Simulation Control")
-time_steps = st.sidebar.slider("⏱ Simulation Duration (Steps)", 10, 200, 50, help="Number of time steps the simulation will run.")
-
-# 🌿 Abiotic Environmental Factors
-st.sidebar.subheader("🌿 Abiotic Factors")
-water_availability = st.sidebar.slider("💧 Water Availability", 0.0, 1.0, 0.5, help="Amount of water available in the ecosystem.")
-temperature_variation = st.sidebar.slider("🌡 Temperature Variation (°C)", -10, 40, 25, help="Range of temperature fluctuations.")
-soil_quality = st.sidebar.slider("🌾 Soil Quality Index", 0.1, 1.0, 0.7, help="Quality of soil affecting plant growth.")
-
-# 🚧 Human Impact & External Factors
-st.sidebar.subheader("🚧 Human & External Impact")
-human_impact = st.sidebar.slider("🏗 Human Impact Factor", 0.0, 1.0, 0.2, help="Influence of human activities on the ecosystem.")
-pollution_level = st.sidebar.slider("☣ Pollution Level", 0.0, 1.0, 0.3, help="Amount of pollution affecting the environment.")
-natural_disasters = st.sidebar.slider("🌪 Frequency of Natural Disasters", 0, 10, 2, help="Number of natural disasters occurring in the simulation.")
-
-# 🔄 Additional Dynamic Factors
-st.sidebar.subheader("🔄 Dynamic Changes")
-seasonal_variation = st.sidebar.slider("🍂 Seasonal Variation Impact", 0.0, 1.0, 0.5, help="Effect of seasonal changes on population dynamics.")
-disease_outbreak = st.sidebar.slider("🦠 Disease Outbreak Probability", 0.0, 1.0, 0.2, help="Chance of a disease affecting the population.")
-
-st.sidebar.markdown("---")  # Adds a separator for cleaner UI
-st.sidebar.info("🔍 Adjust these parameters to explore different ecosystem scenarios and analyze how various factors impact species populations.")
-
-
-
-# Function to run the simulation
-def run_simulation(initial_plants, initial_herbivores, initial_predators, time_steps):
-    plants, herbivores, predators = initial_plants, initial_herbivores, initial_predators
-    plant_pop, herbivore_pop, predator_pop = [], [], []
-
-    for t in range(time_steps):
-        plants = max(plants + plants * plant_growth_rate * (1 + water_availability - 0.1 * human_impact) - herbivores * 0.01, 0)
-        herbivores = max(herbivores + herbivores * herbivore_birth_rate * (1 + soil_quality - 0.05 * temperature_variation) - predators * 0.01, 0)
-        predators = max(predators + predators * predator_birth_rate * (herbivores / (herbivores + 1)), 0)
-        plant_pop.append(plants)
-        herbivore_pop.append(herbivores)
-        predator_pop.append(predators)
-    
-    return plant_pop, herbivore_pop, predator_pop
-
-# Initialize empty lists for population data
-plant_pop, herbivore_pop, predator_pop = [], [], []
-
-# Run the simulation and visualize the results
-if st.sidebar.button("Run Simulation"):
-    plant_pop, herbivore_pop, predator_pop = run_simulation(initial_plants, initial_herbivores, initial_predators, time_steps)
-    
-    # Create a more detailed visualization
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))  # Creating a grid of plots
-    
-    # Main population dynamics over time
-    axes[0, 0].plot(range(time_steps), plant_pop, label='Plants', color='green', linewidth=2)
-    axes[0, 0].plot(range(time_steps), herbivore_pop, label='Herbivores', color='blue', linewidth=2)
-    axes[0, 0].plot(range(time_steps), predator_pop, label='Predators', color='red', linewidth=2)
-    axes[0, 0].set_xlabel("Time Steps")
-    axes[0, 0].set_ylabel("Population")
-    axes[0, 0].set_title("📈 Population Trends Over Time")
-    axes[0, 0].legend()
-    axes[0, 0].grid(True)
-
-    # Stack plot for proportion visualization
-    axes[0, 1].stackplot(range(time_steps), plant_pop, herbivore_pop, predator_pop, 
-                         labels=['Plants', 'Herbivores', 'Predators'], colors=['green', 'blue', 'red'], alpha=0.6)
-    axes[0, 1].set_xlabel("Time Steps")
-    axes[0, 1].set_ylabel("Population")
-    axes[0, 1].set_title("📊 Proportional Representation of Species Over Time")
-    axes[0, 1].legend(loc="upper left")
-    
-    # Distribution of population fluctuations
-    sns.histplot(plant_pop, ax=axes[1, 0], kde=True, color='green', bins=20, label="Plants")
-    sns.histplot(herbivore_pop, ax=axes[1, 0], kde=True, color='blue', bins=20, label="Herbivores")
-    sns.histplot(predator_pop, ax=axes[1, 0], kde=True, color='red', bins=20, label="Predators")
-    axes[1, 0].set_title("📊 Population Distribution (Fluctuations Over Time)")
-    axes[1, 0].set_xlabel("Population Count")
-    axes[1, 0].set_ylabel("Frequency")
-    axes[1, 0].legend()
-    
-    # Correlation heatmap
-    data = pd.DataFrame({"Plants": plant_pop, "Herbivores": herbivore_pop, "Predators": predator_pop})
-    sns.heatmap(data.corr(), annot=True, cmap="coolwarm", ax=axes[1, 1])
-    axes[1, 1].set_title("🔗 Correlation Between Species Populations")
-    
-    # Adjust layout for better visibility
-    plt.tight_layout()
-    st.pyplot(fig)
-
-    # Summary Statistics & Observations
-    st.write("## 🌍 Simulation Observations & Insights")
-    st.write("This visualization presents key ecosystem interactions over time:")
-    st.markdown("""
-    - **Population Growth Trends**: See how plants, herbivores, and predators interact dynamically.
-    - **Proportional Representation**: The stack plot shows the relative population share over time.
-    - **Population Distribution**: Understand fluctuations in population through histograms.
-    - **Correlation Insights**: The heatmap reveals relationships between species (e.g., predators increase when herbivores increase).
-    """)
-
-
-
-# Generate summary insights if the simulation was run
-if plant_pop:
-    st.write("## 🌍 Ecosystem Insights & Key Observations")
-    st.markdown("""
-    The simulation has provided valuable insights into how different species interact and how environmental factors impact their survival. Here’s what we observed:
-    """)
+with timer.section("Simulation settings"):
+    st.sidebar.title("🔧 Simulation Settings")
+
+    # 🌱 Ecosystem Parameters
+    st.sidebar.subheader("🌍 Ecosystem Settings")
+    plant_growth_rate = st.sidebar.slider("🌱 Plant Growth Rate", 0.01, 0.5, 0.2, help="Controls how quickly plants regenerate.")
+    herbivore_birth_rate = st.sidebar.slider("🐇 Herbivore Birth Rate", 0.01, 0.3, 0.1, help="Rate at which herbivores reproduce.")
+    predator_birth_rate = st.sidebar.slider("🦁 Predator Birth Rate", 0.01, 0.2, 0.05, help="Rate at which predators reproduce.")
+
+    # 📊 Initial Population Settings
+    st.sidebar.subheader("👥 Initial Population")
+    initial_plants = st.sidebar.slider("🌼 Initial Plant Population", 50, 500, 100, help="Starting number of plants in the ecosystem.")
+    initial_herbivores = st.sidebar.slider("🐐 Initial Herbivore Population", 10, 100, 30, help="Starting number of herbivores.")
+    initial_predators = st.sidebar.slider("🦅 Initial Predator Population", 5, 50, 10, help="Starting number of predators.")
+
+    # ⏳ Simulation Control
+    st.sidebar.subheader("⏳ Simulation Control")
+    time_steps = st.sidebar.slider("⏱ Simulation Duration (Steps)", 10, 200, 50, help="Number of time steps the simulation will run.")
+
+    # 🌿 Abiotic Environmental Factors
+    st.sidebar.subheader("🌿 Abiotic Factors")
+    water_availability = st.sidebar.slider("💧 Water Availability", 0.0, 1.0, 0.5, help="Amount of water available in the ecosystem.")
+    temperature_variation = st.sidebar.slider("🌡 Temperature Variation (°C)", -10, 40, 25, help="Range of temperature fluctuations.")
+    soil_quality = st.sidebar.slider("🌾 Soil Quality Index", 0.1, 1.0, 0.7, help="Quality of soil affecting plant growth.")
+
+    # 🚧 Human Impact & External Factors
+    st.sidebar.subheader("🚧 Human & External Impact")
+    human_impact = st.sidebar.slider("🏗 Human Impact Factor", 0.0, 1.0, 0.2, help="Influence of human activities on the ecosystem.")
+    pollution_level = st.sidebar.slider("☣ Pollution Level", 0.0, 1.0, 0.3, help="Amount of pollution affecting the environment.")
+    natural_disasters = st.sidebar.slider("🌪 Frequency of Natural Disasters", 0, 10, 2, help="Number of natural disasters occurring in the simulation.")
+
+    # 🔄 Additional Dynamic Factors
+    st.sidebar.subheader("🔄 Dynamic Changes")
+    seasonal_variation = st.sidebar.slider("🍂 Seasonal Variation Impact", 0.0, 1.0, 0.5, help="Effect of seasonal changes on population dynamics.")
+    disease_outbreak = st.sidebar.slider("🦠 Disease Outbreak Probability", 0.0, 1.0, 0.2, help="Chance of a disease affecting the population.")
+
+    # 🧪 Simulation Mode
+    st.sidebar.subheader("🧪 Simulation Mode")
+    simulation_mode = st.sidebar.radio("Choose how to simulate:", SIMULATION_MODES, help="Single run: one trajectory of the three-species model. Ensemble: many random replicates with uncertainty bands. Food web: a large random web of many species. Spatial: the three species on a grid of habitat cells, migrating between neighbours. Continuous: the same model as a differential equation, solved with adaptive step sizes. Long horizon: millions of steps, streamed and summarized as they run.")
+    mode_settings = {}
+    if simulation_mode == ENSEMBLE_MODE:
+        st.sidebar.caption("Seasons, pollution, natural disasters and disease act as random shocks.")
+        mode_settings["ensemble_size"] = st.sidebar.slider("🔁 Number of Replicates", 100, 10000, 1000, step=100, help="Number of random replicates simulated together.")
+        mode_settings["seed"] = int(st.sidebar.number_input("🎯 Random Seed", 0, 2**32 - 1, 42, help="The same seed always reproduces the same ensemble."))
+    elif simulation_mode == FOOD_WEB_MODE:
+        st.sidebar.caption("Initial populations are split evenly within each trophic level; producers react to water and human impact.")
+        mode_settings["n_species"] = st.sidebar.slider("🕸 Number of Species", 10, 1000, 200, step=10, help="Species in the randomly generated food web.")
+        mode_settings["n_levels"] = st.sidebar.slider("🪜 Trophic Levels", 2, 6, 4, help="Producers, herbivores, and one or more levels of predators.")
+        mode_settings["connectance"] = st.sidebar.slider("🔗 Connectance", 0.01, 0.5, 0.05, help="Probability that a species feeds on a given species of the level below.")
+        mode_settings["seed"] = int(st.sidebar.number_input("🎯 Random Seed", 0, 2**32 - 1, 42, help="The same seed always generates the same food web."))
+    elif simulation_mode == SPATIAL_MODE:
+        st.sidebar.caption("Water and soil vary across the grid around their slider values; initial populations are per cell.")
+        mode_settings["grid_size"] = st.sidebar.slider("🗺 Grid Size (cells per side)", 50, 1000, 200, step=50, help="The grid has this many cells along each side.")
+        mode_settings["frame_every"] = st.sidebar.slider("🎞 Map Update Interval (Steps)", 1, 20, 5, help="Redraw the live map every this many steps.")
+        mode_settings["seed"] = int(st.sidebar.number_input("🎯 Random Seed", 0, 2**32 - 1, 42, help="The same seed always generates the same terrain and starting populations."))
+    elif simulation_mode == CONTINUOUS_MODE:
+        st.sidebar.caption("Each step becomes one unit of continuous time; the solver chooses its own step sizes.")
+        mode_settings["method"] = st.sidebar.selectbox("🧮 Solver", ODE_METHODS, index=ODE_METHODS.index("LSODA"), help="LSODA switches between non-stiff and stiff methods automatically; Radau and BDF are stiff solvers.")
+        mode_settings["rtol"] = st.sidebar.select_slider("🎯 Relative Tolerance", [1e-3, 1e-4, 1e-5, 1e-6, 1e-7, 1e-8], 1e-6, format_func="{:.0e}".format, help="Smaller tolerances are more accurate but need more evaluations.")
+        mode_settings["points_per_step"] = st.sidebar.slider("🔍 Output Points per Time Unit", 1, 20, 4, help="Resolution of the continuous trajectory plot, read from the solver's dense output.")
+    elif simulation_mode == STREAMING_MODE:
+        st.sidebar.caption("Replaces the duration slider. Each population grows logistically towards a carrying capacity, so runs stay finite however long. The chart keeps every peak and crash but only a bounded number of points.")
+        mode_settings["capacity"] = st.sidebar.slider("🧱 Carrying Capacity (× Initial Population)", 2, 1000, 100, help="Each species' population levels off at this multiple of its initial population.")
+        mode_settings["horizon"] = st.sidebar.select_slider("♾️ Horizon (Steps)", [10**4, 10**5, 10**6, 10**7], 10**6, format_func="{:,}".format, help="Total number of time steps to simulate.")
+        mode_settings["display_points"] = st.sidebar.slider("📉 Chart Points per Species", 500, 5000, 2000, step=500, help="Upper bound on the points drawn for each species, however long the run.")
+
+    st.sidebar.markdown("---")  # Adds a separator for cleaner UI
+    st.sidebar.info("🔍 Adjust these parameters to explore different ecosystem scenarios and analyze how various factors impact species populations.")
+
+
+
+# Every slider the simulation depends on; together with the run settings this
+# is the cache key of a run
+sim_params = {
+    "plant_growth_rate": plant_growth_rate, "herbivore_birth_rate": herbivore_birth_rate,
+    "predator_birth_rate": predator_birth_rate, "initial_plants": initial_plants,
+    "initial_herbivores": initial_herbivores, "initial_predators": initial_predators,
+    "water_availability": water_availability, "temperature_variation": temperature_variation,
+    "soil_quality": soil_quality, "human_impact": human_impact, "pollution_level": pollution_level,
+    "natural_disasters": natural_disasters, "seasonal_variation": seasonal_variation,
+    "disease_outbreak": disease_outbreak,
+}
 
-    # Understanding plant growth
-    if np.mean(plant_pop) > initial_plants:
-        st.write("🌱 **Plant Population Thrived!**")
-        st.write("The ecosystem provided favorable conditions for plant growth, leading to a steady or increasing plant population. Factors such as high water availability, fertile soil, and minimal human impact played a key role.")
-    else:
-        st.write("🌱 **Plant Population Declined!**")
-        st.write("The plant population faced challenges such as overgrazing, harsh climate conditions, or human interference, leading to a decline over time.")
 
-    # Understanding herbivore population
-    if np.mean(herbivore_pop) > initial_herbivores:
-        st.write("🐇 **Herbivores Thrived!**")
-        st.write("An abundance of plant life ensured herbivores had plenty of food. The stable environment led to population growth, supporting a healthy ecosystem.")
+# Results and figures are cached per parameter set and shared by all sessions,
+# so a scenario anyone has already run is never simulated or drawn again
+@st.cache_data(max_entries=128, show_spinner="Running simulation... 🌱")
+@span("simulate")
+def simulate(sim_params, time_steps, simulation_mode, mode_settings):
+    results = {"bands": None, "web": None, "ode": None}
+    if simulation_mode == ENSEMBLE_MODE:
+        ensemble = run_ensemble(sim_params, time_steps, n_replicates=mode_settings["ensemble_size"], seed=mode_settings["seed"])
+        bands = ensemble.percentiles(ENSEMBLE_PERCENTILES)
+        # The detailed dashboard follows the median trajectory
+        plant_pop, herbivore_pop, predator_pop = (bands[name][2].tolist() for name in SPECIES)
+        results["bands"] = bands
+    elif simulation_mode == FOOD_WEB_MODE:
+        web = random_food_web(mode_settings["n_species"], mode_settings["n_levels"], mode_settings["connectance"], seed=mode_settings["seed"])
+        env = three_species_env(sim_params["water_availability"], sim_params["human_impact"],
+                                sim_params["soil_quality"], sim_params["temperature_variation"])
+        # Level totals start at the sidebar's initial populations (all predator levels share one total)
+        groups = np.minimum(web.levels, 2)
+        totals = np.array([sim_params["initial_plants"], sim_params["initial_herbivores"], sim_params["initial_predators"]], dtype=float)
+        initial = totals[groups] / np.bincount(groups, minlength=3)[groups]
+        populations = simulate_web(web, initial, time_steps, env)
+        # The detailed dashboard follows producer, herbivore and predator totals
+        plant_pop, herbivore_pop, predator_pop = (populations[:, groups == g].sum(axis=1).tolist() for g in range(3))
+        results["web"] = {"populations": populations.astype(np.float32), "levels": web.levels}
+    elif simulation_mode == CONTINUOUS_MODE:
+        solution = solve_continuous(sim_params, time_steps, method=mode_settings["method"], rtol=mode_settings["rtol"])
+        # The detailed dashboard follows the solution at whole time steps, like the stepped model
+        plant_pop, herbivore_pop, predator_pop = solution.at(np.arange(1, time_steps + 1)).tolist()
+        t = np.linspace(0, time_steps, time_steps * mode_settings["points_per_step"] + 1)
+        results["ode"] = {
+            "t": t, "populations": solution.at(t), "method": solution.method,
+            "nfev": solution.nfev, "njev": solution.njev, "nlu": solution.nlu, "n_steps": solution.n_steps,
+        }
     else:
-        st.write("🐇 **Herbivore Population Declined!**")
-        st.write("Scarcity of food, increased predation, or unsuitable environmental conditions led to a reduction in herbivore numbers, affecting the balance of the ecosystem.")
+        plant_pop, herbivore_pop, predator_pop = run_simulation(sim_params, time_steps)
+    return {"plant_pop": plant_pop, "herbivore_pop": herbivore_pop, "predator_pop": predator_pop, **results}
+
+
+@span("figure.png")
+def figure_png(fig):
+    # st.image decodes, downsizes and re-encodes any image wider than 1460 px
+    # on every rerun, so render at a resolution that fits. Closing the figure
+    # frees it for good.
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=100)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_ensemble_bands(bands, time_steps, ensemble_size):
+    # Uncertainty bands: 5-95% and 25-75% ranges around the median
+    fig, ax = plt.subplots(figsize=(14, 5))
+    for name, color in zip(SPECIES, ['green', 'blue', 'red']):
+        p5, p25, p50, p75, p95 = bands[name]
+        ax.fill_between(range(time_steps), p5, p95, color=color, alpha=0.15)
+        ax.fill_between(range(time_steps), p25, p75, color=color, alpha=0.3)
+        ax.plot(range(time_steps), p50, color=color, linewidth=2, label=f"{name.title()} (median)")
+    ax.set_xlabel("Time Steps")
+    ax.set_ylabel("Population")
+    ax.set_title(f"🎲 Ensemble of {ensemble_size} Replicates (5–95% and 25–75% bands)")
+    ax.legend()
+    ax.grid(True)
+    return figure_png(fig)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_food_web(populations, levels):
+    # One row per species, grouped by trophic level, coloured by log abundance
+    fig, ax = plt.subplots(figsize=(14, 6))
+    image = ax.imshow(np.log10(populations.T + 1), aspect="auto", cmap="viridis", interpolation="nearest")
+    for boundary in np.flatnonzero(np.diff(levels)):
+        ax.axhline(boundary + 0.5, color="white", linewidth=1)
+    fig.colorbar(image, ax=ax, label="log₁₀(population + 1)")
+    ax.set_xlabel("Time Steps")
+    ax.set_ylabel("Species (grouped by trophic level, producers first)")
+    ax.set_title(f"🕸 Food Web of {populations.shape[1]} Species")
+    return figure_png(fig)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def render_continuous(t, populations, stepped):
+    # Dense ODE solution, with the unit-step model as dots for comparison
+    fig, ax = plt.subplots(figsize=(14, 5))
+    steps = range(1, len(stepped[0]) + 1)
+    for name, color, solution, stepped_pop in zip(SPECIES, ['green', 'blue', 'red'], populations, stepped):
+        ax.plot(t, solution, color=color, linewidth=2, label=f"{name.title()} (continuous)")
+        ax.plot(steps, stepped_pop, "o", color=color, markersize=3, alpha=0.5, label=f"{name.title()} (unit steps)")
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Population")
+    ax.set_title("〰️ Continuous-Time Solution vs. Unit-Step Model")
+    ax.legend(ncol=2)
+    ax.grid(True)
+    return figure_png(fig)
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+@span("dashboard.build")
+def render_dashboard(plant_pop, herbivore_pop, predator_pop):
+    # Trend, proportion, distribution and correlation views, drawn by the
+    # browser from decimated data; also returns each view's payload and build time
+    return dashboard_views({"Plants": plant_pop, "Herbivores": herbivore_pop, "Predators": predator_pop})
+
+
+def run_spatial(sim_params, time_steps, mode_settings):
+    # Steps the grid live, redrawing the map as it goes; only the mean
+    # densities per step and the final map are kept
+    eco = SpatialEcosystem(sim_params, shape=(mode_settings["grid_size"],) * 2, seed=mode_settings["seed"])
+    progress = st.progress(0.0, text="Running spatial simulation... 🌱")
+    live_map = st.empty()
+    trends = {"plant_pop": [], "herbivore_pop": [], "predator_pop": []}
+    for t in eco.run(time_steps):
+        for series, density in zip(trends.values(), eco.mean_densities()):
+            series.append(density)
+        if t % mode_settings["frame_every"] == 0 or t == time_steps:
+            live_map.image(eco.frame(SPATIAL_FRAME_SIZE), caption=f"Step {t}: plants green, herbivores blue, predators red", width="stretch")
+            progress.progress(t / time_steps, text=f"Running spatial simulation... step {t} of {time_steps} 🌱")
+    final_map = eco.frame(SPATIAL_FRAME_SIZE)
+    live_map.empty()
+    progress.empty()
+    # Set when populations outgrew single precision and the run stopped early
+    overflow = {"steps": eco.t, "horizon": time_steps} if eco.t < time_steps else None
+    return {**trends, "bands": None, "web": None, "ode": None, "final_map": final_map, "overflow": overflow}
+
+
+def stream_figure(stream):
+    frames = [pd.DataFrame({"Step": steps, "Population": values, "Species": name.title()})
+              for name, (steps, values) in zip(SPECIES, stream["series"])]
+    fig = px.line(pd.concat(frames), x="Step", y="Population", color="Species", log_y=True,
+                  color_discrete_map={"Plants": "green", "Herbivores": "blue", "Predators": "red"})
+    fig.update_layout(title=f"♾️ Population Trends over {stream['steps']:,} Steps (log scale)")
+    return fig
+
+
+def run_streaming(sim_params, mode_settings):
+    # Only running aggregates and a bounded, peak-preserving series are kept;
+    # the chart is redrawn from them while the run continues
+    horizon = mode_settings["horizon"]
+    stats, downsampler = RunningStats(), PeakDownsampler(mode_settings["display_points"])
+    progress = st.progress(0.0, text="Streaming simulation... 🌱")
+    live_chart = st.empty()
+    last_draw = 0.0
+
+    def snapshot():
+        return {"series": [downsampler.series(i) for i in range(len(SPECIES))], "steps": stats.count}
+
+    capacity = [mode_settings["capacity"] * sim_params[f"initial_{name}"] for name in SPECIES]
+    for chunk in simulation_chunks(sim_params, horizon, capacity=capacity):
+        stats.update(chunk)
+        downsampler.update(chunk)
+        if time.perf_counter() - last_draw > STREAM_REDRAW_INTERVAL:
+            live_chart.plotly_chart(stream_figure(snapshot()), width="stretch", key=f"stream_live_{stats.count}")
+            progress.progress(stats.count / horizon, text=f"Streaming simulation... step {stats.count:,} of {horizon:,} 🌱")
+            last_draw = time.perf_counter()
+    live_chart.empty()
+    progress.empty()
+
+    stream = {**snapshot(), "horizon": horizon, "mean": stats.mean, "min": stats.min, "max": stats.max,
+              "correlation": stats.correlation}
+    insights = population_insights(*([m] for m in stats.mean), sim_params)
+    return {"plant_pop": None, "herbivore_pop": None, "predator_pop": None, "bands": None, "web": None, "ode": None,
+            "stream": stream, "insights": insights}
+
+
+def save_run(sim_params, time_steps, simulation_mode, mode_settings, series):
+    # Labelled by the parameters that differ from the sidebar defaults; a
+    # repeat of a run this session already saved is not stored twice
+    run_id = run_store.find(sim_params, time_steps, simulation_mode, mode_settings, session=timer.id)
+    if run_id is None:
+        label = ", ".join(f"{name}={value:g}" for name, value in sim_params.items() if value != DEFAULT_PARAMS[name])
+        with span("runstore.append"):
+            run_id = run_store.append(sim_params, series, mode=simulation_mode, label=label or "defaults",
+                                      session=timer.id, settings=mode_settings)
+    return run_id
+
+
+# Run the simulation. The run and its figures are kept in session state, so
+# other widgets on the page can rerun the script without touching them.
+with timer.section("Simulation run"):
+    if st.sidebar.button("Run Simulation"):
+        if simulation_mode == SPATIAL_MODE:
+            results = run_spatial(sim_params, time_steps, mode_settings)
+        elif simulation_mode == STREAMING_MODE:
+            results = run_streaming(sim_params, mode_settings)
+        else:
+            results = simulate(sim_params, time_steps, simulation_mode, mode_settings)
+        figures = []
+        if results.get("final_map") is not None:
+            figures.append(results.pop("final_map"))
+        if results["bands"] is not None:
+            figures.append(render_ensemble_bands(results["bands"], time_steps, mode_settings["ensemble_size"]))
+        if results["web"] is not None:
+            figures.append(render_food_web(results["web"]["populations"], results["web"]["levels"]))
+        if results["ode"] is not None:
+            stepped = simulate(sim_params, time_steps, SINGLE_RUN_MODE, {})
+            figures.append(render_continuous(results["ode"]["t"], results["ode"]["populations"],
+                                             (stepped["plant_pop"], stepped["herbivore_pop"], stepped["predator_pop"])))
+        run_params = dict(sim_params, time_steps=time_steps)
+        views = view_stats = None
+        if results.get("overflow") is not None:
+            run_params["time_steps"] = results["overflow"]["steps"]
+        if results.get("stream") is None:
+            views, view_stats = render_dashboard(results["plant_pop"], results["herbivore_pop"], results["predator_pop"])
+        else:
+            run_params["time_steps"] = results["stream"]["steps"]
+        run_id = None
+        if results["plant_pop"] is not None:
+            run_id = save_run(sim_params, run_params["time_steps"], simulation_mode, mode_settings,
+                              (results["plant_pop"], results["herbivore_pop"], results["predator_pop"]))
+        st.session_state["current_run"] = {"params": run_params, "figures": figures, "views": views, "view_stats": view_stats,
+                                           "run_id": run_id, **results}
+
+
+
+# Simulation results and insights
+@st.fragment
+def simulation_section():
+    with timer.section("Simulation results"):
+        current_run = st.session_state.get("current_run")
+        if current_run:
+            if current_run.get("run_id") is not None:
+                st.caption(f"💾 Saved as run #{current_run['run_id']}; compare it with other runs under Saved Runs below.")
+            with span("charts.send"):
+                for figure in current_run["figures"]:
+                    st.image(figure, width="stretch")
+                if current_run["views"]:
+                    columns = st.columns(2)
+                    for i, view in enumerate(current_run["views"].values()):
+                        with columns[i % 2]:
+                            st.plotly_chart(view, width="stretch")
+            if current_run["views"]:
+                with st.expander("📦 Chart Payloads"):
+                    st.dataframe(pd.DataFrame(current_run["view_stats"]).assign(payload_kb=lambda df: df.pop("payload_bytes") / 1024),
+                                 hide_index=True)
+            overflow = current_run.get("overflow")
+            if overflow is not None:
+                st.warning(f"⚠️ Populations outgrew the range of single-precision numbers after {overflow['steps']:,} of "
+                           f"{overflow['horizon']:,} steps, so the run stopped there.")
+            ode = current_run.get("ode")
+            if ode is not None:
+                cost = f"{ode['nfev']} function evaluations in {ode['n_steps']} adaptive steps"
+                if ode["njev"]:
+                    cost += f", {ode['njev']} Jacobian evaluations and {ode['nlu']} LU decompositions"
+                st.caption(f"⚙️ **Solver cost ({ode['method']}):** {cost}. The unit-step model evaluates the same equations once per step.")
+            stream = current_run.get("stream")
+            if stream is not None:
+                st.plotly_chart(stream_figure(stream), width="stretch", key="stream_result")
+                if stream["steps"] < stream["horizon"]:
+                    st.warning(f"⚠️ Populations outgrew the range of floating-point numbers after {stream['steps']:,} of "
+                               f"{stream['horizon']:,} steps, so the run stopped there.")
+                st.dataframe(pd.DataFrame({"Mean": stream["mean"], "Min": stream["min"], "Max": stream["max"]},
+                                          index=[name.title() for name in SPECIES]))
+                st.write("🔗 **Correlation Between Species Populations**")
+                st.dataframe(pd.DataFrame(stream["correlation"], index=[name.title() for name in SPECIES],
+                                          columns=[name.title() for name in SPECIES]))
+
+            # Summary Statistics & Observations
+            st.write("## 🌍 Simulation Observations & Insights")
+            st.write("This visualization presents key ecosystem interactions over time:")
+            st.markdown("""
+            - **Population Growth Trends**: See how plants, herbivores, and predators interact dynamically.
+            - **Proportional Representation**: The stack plot shows the relative population share over time.
+            - **Population Distribution**: Understand fluctuations in population through histograms.
+            - **Correlation Insights**: The heatmap reveals relationships between species (e.g., predators increase when herbivores increase).
+            """)
+
+            # Generate summary insights if the simulation was run
+            run_params = current_run["params"]
+            insights = current_run.get("insights") or population_insights(
+                current_run["plant_pop"], current_run["herbivore_pop"], current_run["predator_pop"], run_params)
+
+            st.write("## 🌍 Ecosystem Insights & Key Observations")
+            st.markdown("""
+            The simulation has provided valuable insights into how different species interact and how environmental factors impact their survival. Here’s what we observed:
+            """)
+
+            # Understanding plant growth
+            if insights["plants"]:
+                st.write("🌱 **Plant Population Thrived!**")
+                st.write("The ecosystem provided favorable conditions for plant growth, leading to a steady or increasing plant population. Factors such as high water availability, fertile soil, and minimal human impact played a key role.")
+            else:
+                st.write("🌱 **Plant Population Declined!**")
+                st.write("The plant population faced challenges such as overgrazing, harsh climate conditions, or human interference, leading to a decline over time.")
+
+            # Understanding herbivore population
+            if insights["herbivores"]:
+                st.write("🐇 **Herbivores Thrived!**")
+                st.write("An abundance of plant life ensured herbivores had plenty of food. The stable environment led to population growth, supporting a healthy ecosystem.")
+            else:
+                st.write("🐇 **Herbivore Population Declined!**")
+                st.write("Scarcity of food, increased predation, or unsuitable environmental conditions led to a reduction in herbivore numbers, affecting the balance of the ecosystem.")
+
+            # Understanding predator population
+            if insights["predators"]:
+                st.write("🦁 **Predators Maintained a Healthy Population!**")
+                st.write("The presence of sufficient prey allowed predators to sustain or grow their population without major disruptions.")
+            else:
+                st.write("🦁 **Predators Faced Challenges!**")
+                st.write("A decline in prey numbers, harsh conditions, or human activities may have impacted the predator population, leading to difficulties in survival.")
+
+            # Overall ecosystem balance
+            if insights["balanced"]:
+                st.success("🌎 **Ecosystem in Balance!**")
+                st.write("The ecosystem maintained stability, with all species coexisting in a sustainable manner. This indicates a healthy balance between food availability, reproduction, and natural cycles.")
+            else:
+                st.error("⚠️ **Ecosystem Instability Detected!**")
+                st.write("Certain populations struggled to sustain themselves, possibly due to over-predation, food shortages, climate shifts, or human impact. Addressing these factors could improve biodiversity resilience.")
+
+            # Display duration of the simulation
+            st.write(f"🕒 **Total Simulation Duration**: {run_params['time_steps']} time steps")
+
+        else:
+            st.warning("⚠️ Run the simulation first to view key highlights.")
+
+
+simulation_section()
+
+
+def describe_run(row):
+    return f"#{row['run_id']} · {row['mode']} · {row['steps']} steps · {row['label']}"
+
+
+def runs_figure(series, rows, title, log_y):
+    frames = [pd.DataFrame({"Step": steps, "Population": values, "Run": describe_run(rows[run_id])})
+              for run_id, (steps, values) in series.items()]
+    fig = px.line(pd.concat(frames), x="Step", y="Population", color="Run", log_y=log_y)
+    fig.update_layout(title=title, legend={"orientation": "h", "y": -0.25})
+    return fig
+
+
+def replay_run(run_id):
+    # Loads the stored trends in place of a new simulation; the mode-specific
+    # figures (bands, food web, map, solver) are not stored. Populations that
+    # overflowed single precision are shown at its largest value
+    series = np.nan_to_num(run_store.trajectory(run_id), posinf=np.finfo(np.float32).max).astype(float)
+    plant_pop, herbivore_pop, predator_pop = (values.tolist() for values in series)
+    views, view_stats = render_dashboard(plant_pop, herbivore_pop, predator_pop)
+    st.session_state["current_run"] = {
+        "params": run_store.params(run_id), "figures": [], "views": views, "view_stats": view_stats, "run_id": run_id,
+        "plant_pop": plant_pop, "herbivore_pop": herbivore_pop, "predator_pop": predator_pop,
+        "bands": None, "web": None, "ode": None,
+    }
 
-    # Understanding predator population
-    if np.mean(predator_pop) > initial_predators:
-        st.write("🦁 **Predators Maintained a Healthy Population!**")
-        st.write("The presence of sufficient prey allowed predators to sustain or grow their population without major disruptions.")
-    else:
-        st.write("🦁 **Predators Faced Challenges!**")
-        st.write("A decline in prey numbers, harsh conditions, or human activities may have impacted the predator population, leading to difficulties in survival.")
-
-    # Overall ecosystem balance
-    if (np.mean(plant_pop) > initial_plants and 
-        np.mean(herbivore_pop) > initial_herbivores and 
-        np.mean(predator_pop) > initial_predators):
-        st.success("🌎 **Ecosystem in Balance!**")
-        st.write("The ecosystem maintained stability, with all species coexisting in a sustainable manner. This indicates a healthy balance between food availability, reproduction, and natural cycles.")
-    else:
-        st.error("⚠️ **Ecosystem Instability Detected!**")
-        st.write("Certain populations struggled to sustain themselves, possibly due to over-predation, food shortages, climate shifts, or human impact. Addressing these factors could improve biodiversity resilience.")
 
-    # Display duration of the simulation
-    st.write(f"🕒 **Total Simulation Duration**: {time_steps} time steps")
+@st.cache_data(max_entries=8, show_spinner=False)
+def saved_run_rows(path, generation):
+    # The decoded catalog of a store's first ``generation`` runs; runs are only
+    # ever appended, so the run count identifies what the store holds
+    return {row["run_id"]: row for row in get_run_store(path).rows(np.arange(generation))}
+
+
+# Saved runs: every run is read from the store on disk, a species column at a
+# time, so even hundreds of them can be compared without simulating again. The
+# store is only read while the section is open, not on every rerun of the page
+@st.fragment
+def saved_runs_section():
+    with timer.section("Saved runs"):
+        st.write("## 🗂 Saved Runs")
+        if not st.toggle("Browse saved runs", key="browse_runs"):
+            st.caption(f"{len(run_store)} runs saved so far, to overlay, compare and replay.")
+            return
+        scope = st.radio("Runs to show", ["This session", "All sessions"], horizontal=True,
+                         help="The store keeps the runs of every session on this server, across restarts.")
+        session = timer.id if scope == "This session" else None
+        run_ids = run_store.select(session=session)
+        if not len(run_ids):
+            st.info("ℹ️ Every simulation you run is saved here, to overlay, compare and replay later.")
+            return
+
+        with st.expander("🔎 Filter by Parameter"):
+            parameter = st.selectbox("Parameter", PARAMETERS, format_func=lambda name: name.replace("_", " ").capitalize())
+            values = run_store.catalog(run_ids)[parameter]
+            low, high = float(np.nanmin(values)), float(np.nanmax(values))
+            if low < high:
+                bounds = st.slider("Range", low, high, (low, high))
+                run_ids = run_store.select(session=session, **{parameter: bounds})
+            else:
+                st.caption(f"Every run shown has {parameter} = {low:g}.")
+
+        saved = saved_run_rows(run_store.path, len(run_store))
+        rows = {run_id: saved[run_id] for run_id in run_ids.tolist()}
+        table = pd.DataFrame(list(rows.values())[::-1])
+        table["created"] = pd.to_datetime(table["created"], unit="s").dt.strftime("%H:%M:%S")
+        st.dataframe(table[["run_id", "created", "mode", "steps", "label",
+                            *(f"{name}_final" for name in SPECIES), *(f"{name}_max" for name in SPECIES)]],
+                     hide_index=True)
+        st.caption(f"{len(run_ids)} of {len(run_store)} saved runs. Populations are stored at single precision; "
+                   "values beyond about 3.4e38 show as infinite.")
+        options = list(rows)[::-1]
+
+        st.write("### 📈 Overlay")
+        chosen = st.multiselect("Runs to overlay", options, default=options[:5], format_func=lambda i: describe_run(rows[i]))
+        species = st.radio("Species", SPECIES, horizontal=True, format_func=str.title)
+        log_y = st.checkbox("Log scale", value=True)
+        if chosen:
+            with span("runstore.overlay"):
+                series = run_store.overlay(chosen, species, max_points=500)
+            st.plotly_chart(runs_figure(series, rows, f"{species.title()} across {len(chosen)} runs", log_y), width="stretch")
+
+        if len(options) > 1:
+            st.write("### ⚖️ Compare Two Runs")
+            columns = st.columns(2)
+            a = columns[0].selectbox("Run A", options, index=1, format_func=lambda i: describe_run(rows[i]))
+            b = columns[1].selectbox("Run B", options, index=0, format_func=lambda i: describe_run(rows[i]))
+            with span("runstore.diff"):
+                diff = run_store.diff(a, b, max_points=500)
+            changed = {key: (rows[a][key], rows[b][key]) for key in ("mode", "settings") if rows[a][key] != rows[b][key]}
+            changed.update(diff["params"])
+            if changed:
+                st.dataframe(pd.DataFrame(changed, index=["Run A", "Run B"]).T.astype(str))
+            else:
+                st.caption("Both runs have the same parameters.")
+            st.dataframe(pd.DataFrame({name.title(): {key: value for key, value in stats.items() if key != "series"}
+                                       for name, stats in diff["species"].items()}).T
+                         .rename(columns={"max_abs": "Largest difference", "rmse": "RMS difference",
+                                          "final_a": "Final (A)", "final_b": "Final (B)"}))
+            frames = [pd.DataFrame({"Step": steps, "B - A": values, "Species": name.title()})
+                      for name, stats in diff["species"].items() for steps, values in [stats["series"]]]
+            fig = px.line(pd.concat(frames), x="Step", y="B - A", color="Species",
+                          color_discrete_map={"Plants": "green", "Herbivores": "blue", "Predators": "red"})
+            fig.update_layout(title=f"Difference over the first {diff['steps']} steps")
+            st.plotly_chart(fig, width="stretch")
+
+        st.write("### ⏪ Replay")
+        replay = st.selectbox("Run to show in the results above", options, format_func=lambda i: describe_run(rows[i]))
+        if st.button("Replay Run"):
+            replay_run(replay)
+            st.rerun()
+
+
+saved_runs_section()
+
+
+# Which sidebar parameters drive each population, across the sliders' whole ranges
+SENSITIVITY_METHODS = {"Morris screening": morris_analysis, "Sobol indices": sobol_analysis}
+# Study sizes offered, as the exact number of model evaluations: Morris costs
+# k + 1 per trajectory, Sobol k + 2 per base sample, a power of two
+SENSITIVITY_EVALUATIONS = {
+    "Morris screening": [r * (len(PARAMETER_RANGES) + 1) for r in (700, 2_000, 7_000, 20_000)],
+    "Sobol indices": [2**m * (len(PARAMETER_RANGES) + 2) for m in (9, 11, 13, 14)],
+}
 
-else:
-    st.warning("⚠️ Run the simulation first to view key highlights.")
+@st.fragment
+def sensitivity_section():
+    with timer.section("Sensitivity analysis"):
+        st.write("## 🔬 Sensitivity Analysis")
+        st.write("Samples all sidebar parameters at once over their full slider ranges and ranks which ones drive each population.")
+        method = st.radio("Method", list(SENSITIVITY_METHODS), horizontal=True,
+                          help="Morris screening ranks parameters cheaply by their average effect. Sobol indices split the variance of each population between the parameters, including interactions.")
+        options = SENSITIVITY_EVALUATIONS[method]
+        evaluations = st.select_slider("Model evaluations", options, options[2],
+                                       format_func="{:,}".format, help="More evaluations give more precise indices.")
+        seed = int(st.number_input("🎯 Analysis Seed", 0, 2**32 - 1, 42, help="The same seed always gives the same analysis."))
+
+        if st.button("Run Sensitivity Analysis"):
+            k = len(PARAMETER_RANGES)
+            progress = st.progress(0.0, text="Sampling parameter space... 🔬")
+
+            def report(done, total):
+                progress.progress(done / total, text=f"Evaluated {done:,} of {total:,} parameter sets... 🔬")
+
+            if method == "Morris screening":
+                result = morris_analysis(evaluations // (k + 1), time_steps, seed=seed, progress=report)
+            else:
+                result = sobol_analysis(evaluations // (k + 2), time_steps, seed=seed, progress=report)
+            progress.empty()
+            st.session_state["sensitivity"] = {"result": result, "time_steps": time_steps}
+
+        sensitivity = st.session_state.get("sensitivity")
+        if sensitivity:
+            result = sensitivity["result"]
+            label = {"mu_star": "Mean absolute effect (μ*)", "ST": "Total-effect index (ST)"}[result.key_index]
+            table = pd.DataFrame(result.rows())
+            table["parameter"] = table["parameter"].str.replace("_", " ").str.capitalize()
+            fig = px.bar(table, x=result.key_index, y="parameter", color="species", barmode="group", orientation="h",
+                         color_discrete_map={"plants": "green", "herbivores": "blue", "predators": "red"},
+                         labels={result.key_index: label, "parameter": ""}, height=600)
+            fig.update_yaxes(categoryorder="total ascending")
+            st.plotly_chart(fig, width="stretch")
+            for name in SPECIES:
+                drivers = ", ".join(p.replace("_", " ") for p in result.ranking(name)[:3])
+                st.write(f"**{name.title()}** are driven most by: {drivers}.")
+            st.caption(f"{result.method.title()} analysis of {result.n_evaluations:,} runs of {sensitivity['time_steps']} steps "
+                       f"in {result.seconds:.1f} s. Output: log(1 + mean population) of each species.")
+            with st.expander("All indices"):
+                st.dataframe(table, hide_index=True)
+
+
+sensitivity_section()
 
 
 # Conservation Tips Section
-st.sidebar.header("💡 Conservation Tips & Care Guide")
-
 # List of species (can be expanded)
 species_list = [
     "Tiger", "Elephant", "Panda", "Coral Reefs", "Blue Whale", "Mangroves", 
     "Amazon Rainforest", "Snow Leopard", "Sea Turtles", "Monarch Butterfly"
 ]
 
-# User input (selection or manual entry)
-selected_species = st.sidebar.selectbox("Select a species:", species_list)
-custom_species = st.sidebar.text_input("Or enter a species name:")
-
 # Function to generate conservation tips
 def get_conservation_tips(species):
-    conservation_guides = {
-        "Tiger": """
-        **Conservation Strategies for Tigers:**
-        - Protect natural habitats from deforestation and illegal logging.
-        - Strengthen anti-poaching laws and wildlife crime monitoring.
-        - Support breeding programs in conservation reserves.
-        - Reduce human-wildlife conflict by promoting safe buffer zones.
-        - Raise awareness about illegal wildlife trade and tiger farming.
-        """,
-        
-        "Elephant": """
-        **Conservation Strategies for Elephants:**
-        - Preserve migratory corridors to ensure safe movement.
-        - Prevent poaching by enforcing strict anti-ivory trade laws.
-        - Reduce habitat destruction by promoting sustainable agriculture.
-        - Support eco-tourism that funds conservation efforts.
-        - Raise awareness on human-elephant conflict resolution.
-        """,
-
-        "Panda": """
-        **Conservation Strategies for Pandas:**
-        - Expand and protect bamboo forests, their primary food source.
-        - Prevent habitat fragmentation by creating wildlife corridors.
-        - Strengthen captive breeding and reintroduction programs.
-        - Promote sustainable farming near panda habitats.
-        - Educate communities about the ecological importance of pandas.
-        """,
-
-        "Coral Reefs": """
-        **Conservation Strategies for Coral Reefs:**
-        - Reduce ocean pollution, especially plastic and chemical runoff.
-        - Implement sustainable fishing practices to prevent overfishing.
-        - Combat climate change by reducing carbon footprints.
-        - Promote coral reef restoration projects like coral farming.
-        - Encourage marine protected areas (MPAs) and responsible tourism.
-        """,
-
-        "Blue Whale": """
-        **Conservation Strategies for Blue Whales:**
-        - Reduce ship strikes by implementing safe marine traffic routes.
-        - Minimize ocean noise pollution to avoid disrupting whale communication.
-        - Combat illegal whaling through international agreements.
-        - Monitor populations through satellite tracking and conservation programs.
-        - Protect krill populations by managing sustainable fisheries.
-        """,
-
-        "Mangroves": """
-        **Conservation Strategies for Mangroves:**
-        - Prevent coastal deforestation and illegal land reclamation.
-        - Promote mangrove afforestation and restoration projects.
-        - Reduce pollution from agricultural and industrial waste.
-        - Educate communities about the role of mangroves in flood control.
-        - Establish protected mangrove reserves with strict regulations.
-        """,
-
-        "Amazon Rainforest": """
-        **Conservation Strategies for the Amazon Rainforest:**
-        - Combat illegal logging and land encroachment.
-        - Support indigenous communities and their conservation efforts.
-        - Promote sustainable agriculture to reduce deforestation.
-        - Reduce greenhouse gas emissions to combat climate change.
-        - Strengthen law enforcement against wildlife trafficking.
-        """,
-
-        "Snow Leopard": """
-        **Conservation Strategies for Snow Leopards:**
-        - Protect mountain ecosystems and prevent habitat fragmentation.
-        - Work with local herders to reduce human-wildlife conflict.
-        - Strengthen anti-poaching and illegal fur trade enforcement.
-        - Support snow leopard monitoring programs using GPS tracking.
-        - Raise awareness through global conservation campaigns.
-        """,
-
-        "Sea Turtles": """
-        **Conservation Strategies for Sea Turtles:**
-        - Reduce plastic pollution to prevent ingestion and entanglement.
-        - Protect nesting beaches from human encroachment.
-        - Implement fishing gear modifications to prevent accidental capture.
-        - Enforce laws against turtle egg poaching and illegal trade.
-        - Educate coastal communities about turtle conservation.
-        """,
-
-        "Monarch Butterfly": """
-        **Conservation Strategies for Monarch Butterflies:**
-        - Plant milkweed, their primary food source, in gardens and wild areas.
-        - Reduce pesticide and herbicide use to prevent poisoning.
-        - Protect migratory routes by preserving wildflower habitats.
-        - Raise awareness about butterfly conservation through education.
-        - Support research on population declines and climate adaptation.
-        """
-    }
-    
-    return conservation_guides.get(species, "No conservation data available for this species. Try selecting another one.")
+    return CONSERVATION_GUIDES.get(species, "No conservation data available for this species. Try selecting another one.")
+
+
+@st.fragment
+def conservation_section():
+    with timer.section("Conservation guide"):
+        st.header("💡 Conservation Tips & Care Guide")
+
+        # User input (selection or manual entry)
+        selected_species = st.selectbox("Select a species:", species_list)
+        custom_species = st.text_input("Or enter a species name:")
+
+        # Determine the species input and display tips
+        if custom_species:
+            # Tolerates plurals, partial names and typos ("turtles", "snow leopard", "elefant")
+            species = match_species(custom_species) or custom_species.title()
+            if species not in CONSERVATION_GUIDES:
+                st.warning("No guide matches that name yet. Selecting from the list is recommended.")
+            elif species != custom_species.strip():
+                st.caption(f"Showing the closest match for “{custom_species}”.")
+        else:
+            species = selected_species
 
-# Determine the species input and display tips
-if custom_species:
-    st.sidebar.warning("Custom species feature is in development. Selecting from the list is recommended.")
-    species = custom_species.title()
-else:
-    species = selected_species
+        conservation_info = get_conservation_tips(species)
+        st.markdown(f"### 🛡 Conservation Guide for **{species}**")
+        st.markdown(conservation_info)
 
-conservation_info = get_conservation_tips(species)
-st.sidebar.markdown(f"### 🛡 Conservation Guide for **{species}**")
-st.sidebar.markdown(conservation_info)
+
+with st.sidebar:
+    conservation_section()
 
 
 # Educational Resources
-st.write("### 📚 Educational Resources")
-st.write("Expand your knowledge about biodiversity, conservation, and ecological balance through these trusted resources:")
+with timer.section("Educational resources"):
+    st.write("### 📚 Educational Resources")
+    st.write("Expand your knowledge about biodiversity, conservation, and ecological balance through these trusted resources:")
 
-st.markdown("""
-#### 🌿 **Global Biodiversity & Conservation**
-- **[IUCN Red List](https://www.iucnredlist.org/)** – A comprehensive source that tracks the conservation status of species worldwide, including endangered and extinct species.
-- **[World Wildlife Fund (WWF)](https://www.worldwildlife.org/)** – Provides insights into global conservation efforts, endangered species protection, and climate action.
-- **[Convention on Biological Diversity (CBD)](https://www.cbd.int/)** – The official platform for international biodiversity agreements and action plans.
-
-#### 🌏 **Climate Change & Environmental Science**
-- **[NASA Climate Change](https://climate.nasa.gov/)** – Real-time data on global climate change, temperature variations, and CO₂ levels.
-- **[United Nations Environment Programme (UNEP)](https://www.unep.org/)** – Reports on climate policies, biodiversity loss, and sustainable development goals (SDGs).
-- **[IPCC (Intergovernmental Panel on Climate Change)](https://www.ipcc.ch/)** – Scientific assessments on climate change, its impacts, and potential adaptation strategies.
-
-#### 📖 **Educational Platforms & Learning**
-- **[National Geographic](https://www.nationalgeographic.com/)** – Engaging articles, documentaries, and interactive maps on biodiversity, wildlife, and ecosystems.
-- **[Khan Academy - Ecology](https://www.khanacademy.org/science/biology/ecology)** – Free courses on ecosystems, food webs, and environmental science.
-- **[Smithsonian National Museum of Natural History](https://naturalhistory.si.edu/education)** – A collection of interactive exhibits and educational materials on biodiversity and evolution.
-
-#### 🏞 **Citizen Science & Wildlife Monitoring**
-- **[eBird](https://ebird.org/)** – A platform where birdwatchers contribute data on bird populations and migration patterns.
-- **[iNaturalist](https://www.inaturalist.org/)** – Allows users to document and share observations of plant and animal species with a global community.
-- **[Global Biodiversity Information Facility (GBIF)](https://www.gbif.org/)** – Provides open access to biodiversity data, including species distribution maps and occurrence records.
-
-🔍 *Explore these resources to stay informed, participate in conservation efforts, and contribute to scientific research!* 🌱🌎
-""")
+    for heading, entries in RESOURCES:
+        st.markdown(f"#### {heading}\n" + "\n".join(f"- **[{name}]({url})** – {description}" for name, url, description in entries))
+
+    st.markdown("""
+    🔍 *Explore these resources to stay informed, participate in conservation efforts, and contribute to scientific research!* 🌱🌎
+    """)
 
 
 # Interactive Quiz Section
-st.write("### ❓ Interactive Quiz")
-
-quiz_questions = {
-    "What is the biggest threat to biodiversity?": {
-        "options": ["Habitat Loss", "Climate Change", "Pollution", "Overexploitation"],
-        "answer": "Habitat Loss"
-    },
-    "Which gas is primarily responsible for global warming?": {
-        "options": ["Oxygen", "Carbon Dioxide", "Nitrogen", "Methane"],
-        "answer": "Carbon Dioxide"
-    },
-    "What percentage of the Earth's surface is covered by forests?": {
-        "options": ["10%", "31%", "50%", "75%"],
-        "answer": "31%"
-    },
-    "Which organization maintains the Red List of Threatened Species?": {
-        "options": ["UNESCO", "WWF", "IUCN", "Greenpeace"],
-        "answer": "IUCN"
-    },
-    "Which biome is home to the most biodiversity?": {
-        "options": ["Desert", "Tundra", "Tropical Rainforest", "Savanna"],
-        "answer": "Tropical Rainforest"
-    }
-}
+quiz_questions = QUIZ_QUESTIONS
 
-# Display quiz questions
-selected_question = st.selectbox("Choose a question to answer:", list(quiz_questions.keys()))
-options = quiz_questions[selected_question]["options"]
-correct_answer = quiz_questions[selected_question]["answer"]
 
-user_answer = st.radio("Select your answer:", options)
+@st.fragment
+def quiz_section():
+    with timer.section("Quiz"):
+        st.write("### ❓ Interactive Quiz")
 
-if st.button("Submit Answer"):
-    if user_answer == correct_answer:
-        st.success("Correct! 🎉")
-    else:
-        st.error(f"Incorrect! The correct answer is: {correct_answer}")
+        # Display quiz questions
+        selected_question = st.selectbox("Choose a question to answer:", list(quiz_questions.keys()))
+        options = quiz_questions[selected_question]["options"]
+        correct_answer = quiz_questions[selected_question]["answer"]
+
+        user_answer = st.radio("Select your answer:", options)
+
+        if st.button("Submit Answer"):
+            if user_answer == correct_answer:
+                st.success("Correct! 🎉")
+            else:
+                st.error(f"Incorrect! The correct answer is: {correct_answer}")
+
+
+quiz_section()
 
 
 # User Feedback Section
-st.subheader("💬 User Feedback")
-feedback = st.text_area("Please provide your feedback on the simulation and chatbot responses:")
-if st.button("Submit Feedback"):
-    st.success("Thank you for your feedback!")
+@st.fragment
+def feedback_section():
+    with timer.section("Feedback"):
+        st.subheader("💬 User Feedback")
+        feedback = st.text_area("Please provide your feedback on the simulation and chatbot responses:")
+        if st.button("Submit Feedback"):
+            st.success("Thank you for your feedback!")
+
+
+feedback_section()
+
+
+# Section timing report. Its own fragment, so refreshing it reruns nothing else
+@st.fragment
+def timing_report_section():
+    with st.expander("⏱ Page Performance"):
+        st.write("How often each section of this page has executed in your session, and how long it took. "
+                 "Interacting with the chatbot, quiz, feedback or conservation guide reruns only that section.")
+        st.button("🔄 Refresh Timings")
+        st.dataframe(pd.DataFrame(timer.report()).round(1), hide_index=True)
+
+
+timing_report_section()
+
+
+def debug_section():
+    profiler = st.session_state.pop("profiler", None)
+    if profiler is not None:
+        profiler.stop()
+        st.session_state["profile"] = {"seconds": profiler.seconds, "samples": profiler.samples,
+                                       "top": profiler.top(), "collapsed": profiler.collapsed()}
+    if not debug_mode:
+        return
+    with st.expander("🐞 Debug: Hot Paths and Profiling", expanded=True):
+        st.write(f"**All sessions of this server process** (this session is `{timer.id}`). "
+                 "Sections include the hot paths (lower-case names) that run inside them.")
+        st.dataframe(pd.DataFrame(process_timer.report()).round(2), hide_index=True)
+        st.download_button("⬇️ Prometheus Metrics", prometheus_text(), file_name="ecosim_metrics.prom", mime="text/plain")
+
+        if st.button("🔬 Profile One Full Rerun"):
+            st.session_state["profile_next_run"] = True
+            st.rerun()
+        profile = st.session_state.get("profile")
+        if profile is not None:
+            st.write(f"**Last profiled rerun:** {profile['seconds'] * 1000:.0f} ms, {profile['samples']} samples. "
+                     "Total counts time spent in a function and everything it calls; own, in the function itself.")
+            st.dataframe(pd.DataFrame(profile["top"]).round(1), hide_index=True)
+            st.download_button("⬇️ Stacks for a Flame Graph", profile["collapsed"], file_name="ecosim_profile.txt", mime="text/plain")
+
+
+debug_section()
 
 # Footer
 st.markdown("""
@@ -0,0 +1,20 @@
+"""Performance benchmarks of the simulation engines, charts, chatbot and page.
+
+Run ``python -m benchmarks`` from the repository root.  Every case is timed
+several times, and its fastest run is compared with the one recorded in
+``benchmarks/baseline.json``; any case slower than its baseline by more than
+the case's threshold is reported as a regression (exit status 1).
+``--update-baseline`` records the current results as the new baseline.
+
+The cases are grouped (see ``benchmarks.cases``):
+
+- ``simulation``: ``run_simulation`` across run lengths;
+- ``ensemble``: ``run_ensemble`` across replicate counts;
+- ``dashboard``: building and serializing the four dashboard views;
+- ``chatbot``: cold load in a fresh process and per-token generation
+  latency, with a tiny randomly initialized model built locally, so the
+  suite runs offline;
+- ``page``: script runs of CODE.py driven through Streamlit's AppTest.
+
+Timings depend on the machine; keep baselines per machine class.
+"""
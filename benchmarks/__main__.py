@@ -0,0 +1,139 @@
+"""Command-line runner: ``python -m benchmarks [--groups ...] [--update-baseline]``."""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+from importlib import metadata
+
+from .cases import GROUPS, THRESHOLDS
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PACKAGES = ("numpy", "scipy", "plotly", "streamlit", "torch", "transformers")
+
+
+def machine():
+    """Description of the machine and library versions, stored with every result."""
+    versions = {}
+    for name in PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return {"platform": platform.platform(), "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(), "python": platform.python_version(), "packages": versions}
+
+
+def summarize(group, samples):
+    return {"group": group, "median_s": statistics.median(samples), "min_s": min(samples), "max_s": max(samples),
+            "n": len(samples)}
+
+
+def run(groups, repeat, progress=None):
+    """Run ``groups`` and return ``{case: summary}``."""
+    cases = {}
+    for group in groups:
+        for name, samples in GROUPS[group](repeat):
+            cases[name] = summarize(group, samples)
+            if progress is not None:
+                progress(name, cases[name])
+    return cases
+
+
+def compare(cases, baseline, threshold=None):
+    """One row per case: its baseline, the ratio to it and a status.
+
+    Cases are compared by their fastest run, which other load on the
+    machine disturbs least (see ``timeit``).  The status is ``regressed``
+    when it is slower than the baseline's by more than the case's threshold
+    (``threshold`` overrides every case's), ``improved`` when it is faster
+    by the same factor, ``new`` without a baseline and ``ok`` otherwise.
+    """
+    rows = []
+    for name, case in cases.items():
+        base = baseline.get("cases", {}).get(name)
+        row = {"case": name, "min_s": case["min_s"], "median_s": case["median_s"], "baseline_s": None, "ratio": None,
+               "threshold": threshold or THRESHOLDS[case["group"]], "status": "new"}
+        if base is not None:
+            limit = threshold or base.get("threshold") or THRESHOLDS[case["group"]]
+            ratio = case["min_s"] / base["min_s"]
+            status = "regressed" if ratio > limit else "improved" if ratio < 1 / limit else "ok"
+            row.update(baseline_s=base["min_s"], ratio=ratio, threshold=limit, status=status)
+        rows.append(row)
+    return rows
+
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run the performance benchmarks and compare them with the baseline.")
+    parser.add_argument("--groups", default=",".join(GROUPS), help=f"comma-separated groups to run (default: {','.join(GROUPS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case, at least; microbenchmarks run for about a second (default: 5)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, help="tolerated slowdown ratio for every case, overriding the baseline's")
+    parser.add_argument("-o", "--output", help="also write the results to this JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to the baseline file, keeping its per-case thresholds")
+    args = parser.parse_args(argv)
+
+    groups = args.groups.split(",")
+    for group in groups:
+        if group not in GROUPS:
+            parser.error(f"unknown group {group!r}; choose from {', '.join(GROUPS)}")
+
+    def progress(name, case):
+        print(f"  {name:<45} {_format_seconds(case['min_s']):>10}  ({case['n']} runs)", file=sys.stderr)
+
+    cases = run(groups, args.repeat, progress)
+    results = {"created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+               "machine": machine(), "repeat": args.repeat, "cases": cases}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+    if baseline and baseline.get("machine", {}).get("cpu_count") != results["machine"]["cpu_count"]:
+        print("note: the baseline was recorded on a different machine; ratios may not be meaningful", file=sys.stderr)
+
+    rows = compare(cases, baseline, args.threshold)
+    print(f"{'case':<45} {'best':>10} {'median':>10} {'baseline':>10} {'ratio':>6} {'limit':>6}  status")
+    for row in rows:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        print(f"{row['case']:<45} {_format_seconds(row['min_s']):>10} {_format_seconds(row['median_s']):>10} "
+              f"{_format_seconds(row['baseline_s']):>10} "
+              f"{ratio:>6} {row['threshold']:>6.2f}  {row['status']}")
+
+    if args.update_baseline:
+        updated = {**results, "cases": {**baseline.get("cases", {})}}
+        for name, case in cases.items():
+            threshold = baseline.get("cases", {}).get(name, {}).get("threshold", THRESHOLDS[case["group"]])
+            updated["cases"][name] = {**case, "threshold": threshold}
+        with open(args.baseline, "w") as f:
+            json.dump(updated, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressed = [row["case"] for row in rows if row["status"] == "regressed"]
+    if regressed:
+        print(f"{len(regressed)} regression(s): {', '.join(regressed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Benchmark cases, by group.
+
+Each group is a generator function taking a repeat count and yielding
+``(case name, [seconds per sample])`` pairs.  ``THRESHOLDS`` holds the
+default regression threshold of each group: the largest tolerated ratio of
+a case's fastest run to its baseline's fastest run.  Groups that involve threads,
+subprocesses or the Streamlit runtime are noisier and get more headroom.
+"""
+
+import gc
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "CODE.py")
+
+PROMPT = "How do predators maintain ecological balance?"
+NEW_TOKENS = 32
+# Seconds of timed calls the in-process microbenchmarks collect at least
+MIN_TIME = 1.0
+
+
+def measure(run, repeat, setup=None, warmup=1, min_time=0.0, max_samples=10_000):
+    """Seconds taken by each call of ``run``, after ``warmup`` untimed calls.
+
+    ``run`` is called ``repeat`` times, or more until the timed calls add up
+    to ``min_time`` seconds (at most ``max_samples`` calls), so that fast
+    cases get enough samples.  ``setup()``, if given, runs untimed before
+    every call and returns the arguments of ``run``.  As in ``timeit``,
+    garbage collection is paused while a call is timed.
+    """
+    samples = []
+    i = 0
+    while len(samples) < repeat or (sum(samples) < min_time and len(samples) < max_samples):
+        i += 1
+        args = setup() if setup is not None else ()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(*args)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        if i > warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def simulation_cases(repeat):
+    from ecosim.core import run_simulation
+
+    for steps in (50, 200, 5000):
+        yield f"simulation.run_simulation[steps={steps}]", measure(lambda: run_simulation(time_steps=steps), repeat, min_time=MIN_TIME)
+
+
+def ensemble_cases(repeat):
+    from ecosim.ensemble import DEFAULT_PARAMS, run_ensemble
+
+    for replicates in (100, 1000, 10000):
+        yield (f"ensemble.run_ensemble[replicates={replicates}]",
+               measure(lambda: run_ensemble(DEFAULT_PARAMS, 50, n_replicates=replicates, seed=0), repeat, min_time=MIN_TIME))
+
+
+def dashboard_cases(repeat):
+    from ecosim.ensemble import DEFAULT_PARAMS, run_ensemble
+    from ecosim.plots import dashboard_views
+
+    rng = np.random.default_rng(0)
+    for steps in (50, 100_000):
+        if steps <= 200:
+            run = run_ensemble(DEFAULT_PARAMS, steps, n_replicates=1, seed=0)
+            series = {"Plants": run.plants[0], "Herbivores": run.herbivores[0], "Predators": run.predators[0]}
+        else:
+            # Long runs overflow, so use noisy cycles of the same length instead
+            t = np.arange(steps)
+            series = {name: 100 + 50 * np.sin(t / period) + rng.normal(0, 5, steps)
+                      for name, period in (("Plants", 500), ("Herbivores", 700), ("Predators", 900))}
+        yield f"dashboard.build[steps={steps}]", measure(lambda: dashboard_views(series), repeat, min_time=MIN_TIME)
+        views, _ = dashboard_views(series)
+        yield f"dashboard.to_json[steps={steps}]", measure(lambda: [view.to_json() for view in views.values()], repeat, min_time=MIN_TIME)
+
+
+def _cold_load_seconds(path):
+    # A fresh interpreter, so imports and model files are loaded from scratch
+    code = ("import time; start = time.perf_counter(); "
+            "from ecosim.inference import PROFILES; from ecosim.models import load_text_generation; "
+            f"load_text_generation({path!r}, PROFILES['fp32']); print(time.perf_counter() - start)")
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True, cwd=ROOT)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def chatbot_cases(repeat):
+    import torch
+
+    from ecosim.generation import stream_reply
+    from ecosim.inference import PROFILES
+    from ecosim.models import load_text_generation
+
+    from .tiny_model import build_tiny_model
+
+    with tempfile.TemporaryDirectory() as path:
+        build_tiny_model(path)
+        yield "chatbot.cold_load", [_cold_load_seconds(path) for _ in range(max(repeat // 2, 2))]
+
+        chatbot = load_text_generation(path, PROFILES["fp32"])
+        tokenizer, model = chatbot.tokenizer, chatbot.model
+        input_ids = tokenizer.encode(PROMPT + tokenizer.eos_token, return_tensors="pt")
+
+        def generate(n):
+            with torch.inference_mode():
+                model.generate(input_ids, attention_mask=torch.ones_like(input_ids), max_new_tokens=n, min_new_tokens=n,
+                               do_sample=False, pad_token_id=tokenizer.eos_token_id)
+
+        generate(NEW_TOKENS)  # warm-up
+        first, per_token = [], []
+        for _ in range(repeat):
+            # Interleaved, so both runs of a pair see the same machine load; the
+            # tokens after the first cost the difference between them
+            one = measure(lambda: generate(1), 1, warmup=0)[0]
+            full = measure(lambda: generate(NEW_TOKENS), 1, warmup=0)[0]
+            first.append(one)
+            per_token.append((full - one) / (NEW_TOKENS - 1))
+        yield "chatbot.first_token", first
+        yield "chatbot.per_token", per_token
+
+        def stream():
+            with stream_reply(chatbot, PROMPT, max_new_tokens=NEW_TOKENS, min_new_tokens=NEW_TOKENS, do_sample=False) as reply:
+                for _ in reply:
+                    pass
+
+        yield f"chatbot.stream_reply[tokens={NEW_TOKENS}]", measure(stream, repeat)
+
+
+def page_cases(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    def run(app):
+        with warnings.catch_warnings():
+            # Matplotlib warns about emoji its fonts lack on every chart
+            warnings.simplefilter("ignore", UserWarning)
+            app.run()
+        if app.exception:
+            raise RuntimeError(f"CODE.py raised: {app.exception[0].message}")
+        return app
+
+    def fresh():
+        return (AppTest.from_file(PAGE, default_timeout=300),)
+
+    def loaded():
+        return (run(fresh()[0]),)
+
+    def click(app, label):
+        next(b for b in app.button if b.label == label).click()
+        run(app)
+
+    values = iter(range(51, 500))
+
+    def simulation_ready(mode=None):
+        app = loaded()[0]
+        if mode is not None:
+            next(r for r in app.sidebar.radio if r.label == "Choose how to simulate:").set_value(mode)
+        # A new parameter value every time, so the run is not an st.cache_data hit
+        next(s for s in app.sidebar.slider if s.label == "🌼 Initial Plant Population").set_value(next(values))
+        run(app)
+        return (app,)
+
+    def ask(app):
+        next(t for t in app.text_area if t.label.startswith("🔍")).input("How can I help elephants?")
+        click(app, "💡 Get Expert Insights")
+
+    # The page saves every run; keep them out of the shared default store
+    previous = os.environ.get("ECOSIM_RUN_STORE")
+    with tempfile.TemporaryDirectory() as store:
+        os.environ["ECOSIM_RUN_STORE"] = store
+        try:
+            yield "page.new_session", measure(run, repeat, setup=fresh)
+            yield "page.rerun", measure(run, repeat, setup=loaded)
+            yield "page.run_simulation", measure(lambda app: click(app, "Run Simulation"), repeat, setup=simulation_ready)
+            yield ("page.run_ensemble", measure(lambda app: click(app, "Run Simulation"), repeat,
+                                                setup=lambda: simulation_ready("🎲 Monte Carlo Ensemble")))
+            # Answered from the knowledge index, without the model
+            yield "page.chatbot_fast_path", measure(ask, repeat, setup=loaded)
+        finally:
+            if previous is None:
+                os.environ.pop("ECOSIM_RUN_STORE", None)
+            else:
+                os.environ["ECOSIM_RUN_STORE"] = previous
+
+
+GROUPS = {
+    "simulation": simulation_cases,
+    "ensemble": ensemble_cases,
+    "dashboard": dashboard_cases,
+    "chatbot": chatbot_cases,
+    "page": page_cases,
+}
+
+THRESHOLDS = {"simulation": 1.5, "ensemble": 1.5, "dashboard": 1.5, "chatbot": 2.0, "page": 2.0}
@@ -0,0 +1,34 @@
+"""A tiny GPT-2 style chatbot model, built locally as a stand-in for DialoGPT.
+
+Its weights are random, so its answers are noise, but it exercises exactly
+the code paths of the real model (tokenizer, pipeline, generation,
+streaming) in a fraction of the time and without downloading anything.
+"""
+
+TINY_CONFIG = {"n_embd": 64, "n_layer": 2, "n_head": 2, "n_positions": 1024}
+VOCAB_SIZE = 512
+
+
+def _corpus():
+    from ecosim.knowledge import default_documents
+
+    return [document.search_text for document in default_documents()]
+
+
+def build_tiny_model(path, seed=0):
+    """Save a tokenizer and a randomly initialized GPT-2 model to directory ``path``."""
+    import torch
+    from tokenizers import ByteLevelBPETokenizer
+    from transformers import GPT2Config, GPT2LMHeadModel, GPT2TokenizerFast
+
+    tokenizer = ByteLevelBPETokenizer()
+    tokenizer.train_from_iterator(_corpus(), vocab_size=VOCAB_SIZE, special_tokens=["<|endoftext|>"], show_progress=False)
+    tokenizer.save_model(str(path))
+    tokenizer = GPT2TokenizerFast(vocab_file=f"{path}/vocab.json", merges_file=f"{path}/merges.txt")
+    tokenizer.save_pretrained(path)
+
+    torch.manual_seed(seed)
+    config = GPT2Config(vocab_size=len(tokenizer), bos_token_id=tokenizer.eos_token_id,
+                        eos_token_id=tokenizer.eos_token_id, **TINY_CONFIG)
+    GPT2LMHeadModel(config).save_pretrained(path)
+    return path
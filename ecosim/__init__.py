@@ -0,0 +1,32 @@
+"""Simulation engines behind the Advanced Ecosystem Analyzer page (CODE.py).
+
+Submodules are imported on first use of one of the names below, so
+``import ecosim`` stays cheap and never pulls in Streamlit, torch or
+transformers (only ``ecosim.models`` and friends touch those, lazily).
+"""
+
+import importlib
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "DEFAULT_PARAMS": "ensemble", "SPECIES": "ensemble", "EnsembleResult": "ensemble", "run_ensemble": "ensemble",
+    "run_simulation": "core", "population_insights": "core", "run_grid": "core",
+    "FoodWeb": "foodweb", "random_food_web": "foodweb", "simulate_web": "foodweb", "three_species_web": "foodweb",
+    "SpatialEcosystem": "spatial",
+    "ContinuousResult": "continuous", "solve_continuous": "continuous",
+    "SensitivityResult": "sensitivity", "morris_analysis": "sensitivity", "sobol_analysis": "sensitivity",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
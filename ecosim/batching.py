@@ -0,0 +1,168 @@
+"""Micro-batching of chatbot requests from concurrent sessions.
+
+Every session submits its question to one process-wide worker thread instead
+of calling the model itself.  The worker waits briefly for other questions to
+arrive, runs them through the model as one padded batch and hands each answer
+back to the session that asked, through a ``concurrent.futures.Future``.
+"""
+
+import collections
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from .models import CHATBOT_MODEL, registry
+from .timing import span
+
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_WAIT = 0.02  # seconds a batch waits for more requests after the first
+
+
+def percentile(values, q):
+    """Nearest-rank percentile ``q`` (0-100) of ``values``, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(max(math.ceil(q / 100 * len(ordered)), 1), len(ordered))
+    return ordered[rank - 1]
+
+
+class _Request:
+    __slots__ = ("prompt", "kwargs", "key", "future", "enqueued_at")
+
+    def __init__(self, prompt, kwargs):
+        self.prompt = prompt
+        self.kwargs = kwargs
+        # Only requests with identical generation settings can share a batch
+        self.key = tuple(sorted(kwargs.items()))
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchingWorker:
+    """Collects prompts into batches and runs them through ``generate_batch``.
+
+    ``generate_batch(prompts, **kwargs)`` must return one answer per prompt.
+    A batch is dispatched once it holds ``max_batch_size`` requests or
+    ``max_wait`` seconds after its first request arrived, whichever comes
+    first.  Latency figures cover the most recent ``history`` requests.
+    """
+
+    def __init__(self, generate_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT, history=1000):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.generate_batch = generate_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._carry = collections.deque()  # requests left over from a batch with other settings
+        self._stats_lock = threading.Lock()
+        self._latencies = collections.deque(maxlen=history)
+        self._batch_sizes = collections.deque(maxlen=history)
+        self._inference_times = collections.deque(maxlen=history)
+        self._requests = 0
+        self._batches = 0
+        self._thread = threading.Thread(target=self._run, name="chatbot batching worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, prompt, **kwargs):
+        """Queue ``prompt`` for generation and return a Future of the answer."""
+        request = _Request(prompt, kwargs)
+        self._queue.put(request)
+        return request.future
+
+    def _next_request(self, timeout=None):
+        if self._carry:
+            return self._carry.popleft()
+        return self._queue.get(timeout=timeout)
+
+    def _collect(self):
+        first = self._next_request()
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        skipped = []
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._next_request(timeout=remaining)
+            except queue.Empty:
+                break
+            (batch if request.key == first.key else skipped).append(request)
+        self._carry.extend(skipped)
+        # Drop requests whose session gave up waiting before the batch ran
+        return [r for r in batch if r.future.set_running_or_notify_cancel()]
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            start = time.perf_counter()
+            try:
+                answers = self.generate_batch([r.prompt for r in batch], **batch[0].kwargs)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                answers = None
+            finished = time.perf_counter()
+            if answers is not None:
+                for request, answer in zip(batch, answers):
+                    request.future.set_result(answer)
+            with self._stats_lock:
+                self._requests += len(batch)
+                self._batches += 1
+                self._batch_sizes.append(len(batch))
+                self._inference_times.append(finished - start)
+                self._latencies.extend(finished - r.enqueued_at for r in batch)
+
+    def stats(self):
+        """Return queue depth, batch sizes and latency percentiles in seconds."""
+        with self._stats_lock:
+            latencies = list(self._latencies)
+            batch_sizes = list(self._batch_sizes)
+            inference = list(self._inference_times)
+            requests, batches = self._requests, self._batches
+        return {
+            "queue_depth": self._queue.qsize() + len(self._carry),
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": sum(batch_sizes) / len(batch_sizes) if batch_sizes else None,
+            "max_batch_size": max(batch_sizes, default=None),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p90": percentile(latencies, 90),
+            "latency_p99": percentile(latencies, 99),
+            "inference_p50": percentile(inference, 50),
+        }
+
+
+def pipeline_batch_generator(name=CHATBOT_MODEL):
+    """Return a ``generate_batch`` function backed by the shared pipeline ``name``.
+
+    The model is fetched from the registry on the first batch, so creating
+    the worker does not load it.  Its tokenizer already pads on the left
+    (see ``load_text_generation``).
+    """
+    def generate_batch(prompts, **kwargs):
+        chatbot = registry.get(name)
+        with span("model.batch_generate"):
+            outputs = chatbot(prompts, batch_size=len(prompts), **kwargs)
+        return [output[0]["generated_text"] for output in outputs]
+
+    return generate_batch
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def get_worker(name=CHATBOT_MODEL, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT):
+    """Return the process-wide batching worker for model ``name``, creating it on first use."""
+    with _workers_lock:
+        worker = _workers.get(name)
+        if worker is None:
+            worker = _workers[name] = BatchingWorker(pipeline_batch_generator(name), max_batch_size, max_wait)
+        return worker
@@ -0,0 +1,162 @@
+"""Two-tier cache of chatbot responses.
+
+Answers are keyed by the normalized question plus the generation parameters.
+The first tier is an in-memory LRU shared by every session of the process;
+the optional second tier is a SQLite file that survives restarts and is
+bounded both by total size and by entry age.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_DISK_BYTES = 64 * 2**20
+DEFAULT_TTL = 7 * 24 * 3600  # seconds
+
+
+def normalize_query(query):
+    """Fold case, width and spacing so trivially different questions share a key."""
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip("?!. ")
+
+
+def cache_key(query, **params):
+    """Return the cache key for ``query`` generated with ``params``."""
+    payload = json.dumps([normalize_query(query), sorted(params.items())], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU of responses, backed by an optional on-disk tier.
+
+    ``path`` enables the disk tier: a SQLite database whose entries expire
+    ``ttl`` seconds after they were stored and whose least recently used
+    entries are evicted once the stored responses exceed ``max_disk_bytes``.
+    The same ``ttl`` applies to the memory tier.
+    """
+
+    _SCHEMA = """CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL,
+        created REAL NOT NULL, accessed REAL NOT NULL)"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, path=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._memory = collections.OrderedDict()  # key -> (response, created)
+        self._db = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(self._SCHEMA)
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key, response, created):
+        self._memory[key] = (response, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, query, **params):
+        """Return the cached response to ``query``, or None."""
+        key = cache_key(query, **params)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if now - entry[1] < self.ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[0]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created FROM responses WHERE key = ? AND created > ?", (key, now - self.ttl)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                    self._remember(key, *row)
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, query, response, **params):
+        """Store ``response`` as the answer to ``query`` in both tiers."""
+        key = cache_key(query, **params)
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._db is not None:
+                size = len(response.encode())
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, response, size, now, now)
+                )
+                self._evict(now)
+
+    def _evict(self, now):
+        self._db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+        excess = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0] - self.max_disk_bytes
+        if excess <= 0:
+            return
+        # Walk entries from least recently used, dropping them until under budget
+        doomed = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Return hit/miss counters and the size of each tier."""
+        with self._lock:
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_entries": None,
+                "disk_bytes": None,
+            }
+            if self._db is not None:
+                stats["disk_entries"], stats["disk_bytes"] = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else None
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache(max_entries=DEFAULT_MAX_ENTRIES, path=None, max_disk_bytes=DEFAULT_MAX_DISK_BYTES, ttl=DEFAULT_TTL):
+    """Return the process-wide response cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(max_entries, path, max_disk_bytes, ttl)
+        return _cache
@@ -0,0 +1,166 @@
+"""Command-line interface: ``python -m ecosim {run,ensemble,grid} ...``.
+
+Runs the simulation headless and writes the results as CSV (the default,
+to stdout without ``--output``), JSON, or for ensembles NumPy ``.npz``,
+chosen by the output file's extension or ``--format``.  Examples::
+
+    python -m ecosim run --set plant_growth_rate=0.3 --steps 100 -o run.csv
+    python -m ecosim ensemble --replicates 10000 --seed 42 -o bands.csv
+    python -m ecosim grid --vary plant_growth_rate=0.05:0.5:10 --vary human_impact=0,0.5,1 -o grid.csv
+"""
+
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from .core import run_grid, run_simulation, summarize
+from .ensemble import DEFAULT_PARAMS, SPECIES, run_ensemble
+
+FORMATS = ("csv", "json", "npz")
+
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and "." not in text else value
+
+
+def _positive_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a whole number") from None
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def _percentiles(text):
+    try:
+        values = [float(v) for v in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a comma-separated list of numbers") from None
+    for value in values:
+        if not 0 <= value <= 100:
+            raise argparse.ArgumentTypeError(f"must be between 0 and 100, got {value:g}")
+    return values
+
+
+def _assignment(text):
+    name, sep, value = text.partition("=")
+    if not sep or name not in DEFAULT_PARAMS:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE with NAME one of: {', '.join(DEFAULT_PARAMS)}")
+    return name, value
+
+
+def _set(text):
+    name, value = _assignment(text)
+    try:
+        return name, _number(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name}: {value!r} is not a number") from None
+
+
+def _vary(text):
+    # NAME=v1,v2,... or NAME=start:stop:count
+    name, spec = _assignment(text)
+    try:
+        if ":" in spec:
+            start, stop, count = spec.split(":")
+            return name, np.linspace(float(start), float(stop), int(count)).tolist()
+        return name, [_number(v) for v in spec.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name}: expected v1,v2,... or start:stop:count, got {spec!r}") from None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m ecosim", description="Run the ecosystem simulation without the web page.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        command.add_argument("--set", type=_set, action="append", default=[], metavar="NAME=VALUE",
+                             help="set a simulation parameter (repeatable); see ecosim.DEFAULT_PARAMS")
+        command.add_argument("--steps", type=_positive_int, default=50, help="number of time steps (default: 50)")
+        command.add_argument("-o", "--output", help="output file (default: stdout)")
+        command.add_argument("--format", choices=FORMATS, help="output format (default: from the file extension, else csv)")
+
+    add_common(commands.add_parser("run", help="one deterministic run, one row per step"))
+
+    ensemble = commands.add_parser("ensemble", help="random replicates with shocks, percentile bands per step")
+    add_common(ensemble)
+    ensemble.add_argument("--replicates", type=_positive_int, default=1000, help="number of replicates (default: 1000)")
+    ensemble.add_argument("--seed", type=int, help="random seed (default: fresh entropy, printed to stderr)")
+    ensemble.add_argument("--percentiles", type=_percentiles, default="5,25,50,75,95", help="comma-separated percentiles (default: 5,25,50,75,95)")
+
+    grid = commands.add_parser("grid", help="every combination of parameter values, one summary row each")
+    add_common(grid)
+    grid.add_argument("--vary", type=_vary, action="append", required=True, metavar="NAME=VALUES",
+                      help="values to sweep, as v1,v2,... or start:stop:count (repeatable)")
+    grid.add_argument("--shocks", action="store_true", help="apply the ensemble model's random shocks")
+    grid.add_argument("--seed", type=int, help="random seed for --shocks")
+    return parser
+
+
+def _write(output, fmt, rows=None, document=None, arrays=None):
+    if fmt == "npz":
+        if output is None:
+            raise SystemExit("npz output needs --output")
+        np.savez_compressed(output, **arrays)
+        return
+    stream = sys.stdout if output is None else open(output, "w", newline="")
+    try:
+        if fmt == "json":
+            json.dump(document if document is not None else rows, stream, indent=2)
+            stream.write("\n")
+        else:
+            writer = csv.DictWriter(stream, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if output is not None:
+            stream.close()
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    params = {**DEFAULT_PARAMS, **dict(args.set)}
+    fmt = args.format or (Path(args.output).suffix.lstrip(".").lower() if args.output else "csv")
+    if fmt not in FORMATS:
+        raise SystemExit(f"unknown output format {fmt!r}; use --format with one of {', '.join(FORMATS)}")
+
+    if args.command == "run":
+        if fmt == "npz":
+            raise SystemExit("npz output is only available for ensembles")
+        trajectories = run_simulation(params, args.steps)
+        rows = [{"step": t + 1, **dict(zip(SPECIES, values))} for t, values in enumerate(zip(*trajectories))]
+        document = {"params": params, "time_steps": args.steps, **dict(zip(SPECIES, trajectories)), **summarize(*trajectories, params)}
+        _write(args.output, fmt, rows=rows, document=document)
+
+    elif args.command == "ensemble":
+        q = args.percentiles
+        result = run_ensemble(params, args.steps, n_replicates=args.replicates, seed=args.seed)
+        if args.seed is None:
+            print(f"seed: {result.seed}", file=sys.stderr)
+        if fmt == "npz":
+            _write(args.output, fmt, arrays={name: getattr(result, name) for name in SPECIES})
+            return
+        bands = result.percentiles(q)
+        columns = {f"{name}_p{v:g}": bands[name][i] for name in SPECIES for i, v in enumerate(q)}
+        rows = [{"step": t + 1, **{column: float(values[t]) for column, values in columns.items()}} for t in range(args.steps)]
+        document = {"params": params, "time_steps": args.steps, "replicates": args.replicates, "seed": result.seed,
+                    "percentiles": q, **{column: values.tolist() for column, values in columns.items()}}
+        _write(args.output, fmt, rows=rows, document=document)
+
+    else:
+        if fmt == "npz":
+            raise SystemExit("npz output is only available for ensembles")
+        grid = dict(args.vary)
+        combinations, result = run_grid(grid, params, args.steps, shocks=args.shocks, seed=args.seed)
+        rows = [
+            {**{name: c[name] for name in grid}, **summarize(*result.replicate(i), c)}
+            for i, c in enumerate(combinations)
+        ]
+        _write(args.output, fmt, rows=rows)
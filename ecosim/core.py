@@ -0,0 +1,104 @@
+"""The page's three-species model and insight rules, without Streamlit.
+
+``run_simulation`` is the deterministic unit-step update the Advanced
+Ecosystem Analyzer page has always run, and ``population_insights`` the
+checks its "Ecosystem Insights" section is written from.  Both only need
+NumPy, so batch jobs, the command line (``python -m ecosim``) and tests can
+use them without importing Streamlit, torch or transformers.
+"""
+
+import itertools
+
+import numpy as np
+
+from .ensemble import DEFAULT_PARAMS, SPECIES, run_ensemble
+
+# Sliders the unit-step model ignores; the ensemble model turns them into shocks
+SHOCK_PARAMS = ("pollution_level", "natural_disasters", "seasonal_variation", "disease_outbreak")
+
+
+def run_simulation(params=None, time_steps=50):
+    """Run the three-species model for ``time_steps`` steps.
+
+    ``params`` takes the sidebar parameter names of ``DEFAULT_PARAMS``.
+    Returns the (plant_pop, herbivore_pop, predator_pop) lists, one value
+    per step.
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    plant_growth_rate, herbivore_birth_rate, predator_birth_rate = (
+        p["plant_growth_rate"], p["herbivore_birth_rate"], p["predator_birth_rate"])
+    water_availability, human_impact = p["water_availability"], p["human_impact"]
+    soil_quality, temperature_variation = p["soil_quality"], p["temperature_variation"]
+
+    plants, herbivores, predators = p["initial_plants"], p["initial_herbivores"], p["initial_predators"]
+    plant_pop, herbivore_pop, predator_pop = [], [], []
+
+    for t in range(time_steps):
+        plants = max(plants + plants * plant_growth_rate * (1 + water_availability - 0.1 * human_impact) - herbivores * 0.01, 0)
+        herbivores = max(herbivores + herbivores * herbivore_birth_rate * (1 + soil_quality - 0.05 * temperature_variation) - predators * 0.01, 0)
+        predators = max(predators + predators * predator_birth_rate * (herbivores / (herbivores + 1)), 0)
+        plant_pop.append(plants)
+        herbivore_pop.append(herbivores)
+        predator_pop.append(predators)
+
+    return plant_pop, herbivore_pop, predator_pop
+
+
+def population_insights(plant_pop, herbivore_pop, predator_pop, params=None):
+    """Which species thrived, i.e. averaged above their initial population.
+
+    Returns ``{"plants", "herbivores", "predators", "balanced"}`` booleans;
+    the ecosystem is balanced when all three thrived.
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    insights = {
+        "plants": bool(np.mean(plant_pop) > p["initial_plants"]),
+        "herbivores": bool(np.mean(herbivore_pop) > p["initial_herbivores"]),
+        "predators": bool(np.mean(predator_pop) > p["initial_predators"]),
+    }
+    insights["balanced"] = all(insights.values())
+    return insights
+
+
+def parameter_grid(grid, base=None):
+    """Every combination of the values in ``grid`` ({name: values}), on top of ``base``.
+
+    Returns a list of full parameter dicts, the last name in ``grid``
+    varying fastest.
+    """
+    base = {**DEFAULT_PARAMS, **(base or {})}
+    unknown = set(grid) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown simulation parameters: {', '.join(sorted(unknown))}")
+    names = list(grid)
+    return [{**base, **dict(zip(names, values))} for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_grid(grid, base=None, time_steps=50, shocks=False, seed=None):
+    """Simulate every parameter combination of ``grid`` in one vectorized run.
+
+    Without ``shocks`` each combination follows ``run_simulation`` exactly;
+    with them it is one random replicate of the ensemble model, seeded by
+    ``seed``.  Returns ``(combinations, EnsembleResult)``, replicate i of the
+    result belonging to ``combinations[i]``.
+    """
+    combinations = parameter_grid(grid, base)
+    columns = {name: np.array([c[name] for c in combinations], dtype=float) for name in DEFAULT_PARAMS}
+    if not shocks:
+        # With every shock at zero the ensemble update is run_simulation's
+        for name in SHOCK_PARAMS:
+            columns[name] = 0.0
+    return combinations, run_ensemble(columns, time_steps, seed=seed)
+
+
+def summarize(plant_pop, herbivore_pop, predator_pop, params=None):
+    """One summary row of a run: final and mean populations plus its insights."""
+    row = {}
+    for name, pop in zip(SPECIES, (plant_pop, herbivore_pop, predator_pop)):
+        row[f"final_{name}"] = float(pop[-1])
+        row[f"mean_{name}"] = float(np.mean(pop))
+    insights = population_insights(plant_pop, herbivore_pop, predator_pop, params)
+    for name in SPECIES:
+        row[f"{name}_thrived"] = insights[name]
+    row["balanced"] = insights["balanced"]
+    return row
@@ -0,0 +1,199 @@
+"""Vectorized Monte Carlo ensembles of the three-species ecosystem model.
+
+All replicates are stepped together as NumPy arrays, so one call advances
+N parameter sets (or N random replicates of one parameter set) per time step
+instead of running N scalar Python loops.  The update rule is the one used
+by ``run_simulation`` in ecosim.core; on top of it the sliders the scalar
+loop ignores (seasonality, pollution, natural disasters and disease) act as
+stochastic shocks.  With all four of them at zero a replicate reproduces
+``run_simulation`` exactly.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+SPECIES = ("plants", "herbivores", "predators")
+
+# Slider defaults from the sidebar, used for any parameter the caller omits
+DEFAULT_PARAMS = {
+    "plant_growth_rate": 0.2,
+    "herbivore_birth_rate": 0.1,
+    "predator_birth_rate": 0.05,
+    "initial_plants": 100,
+    "initial_herbivores": 30,
+    "initial_predators": 10,
+    "water_availability": 0.5,
+    "temperature_variation": 25,
+    "soil_quality": 0.7,
+    "human_impact": 0.2,
+    "pollution_level": 0.3,
+    "natural_disasters": 2,
+    "seasonal_variation": 0.5,
+    "disease_outbreak": 0.2,
+}
+
+# Shock model constants
+SEASON_LENGTH = 12              # steps per seasonal cycle
+POLLUTION_MORTALITY = 0.02      # mean per-step loss at pollution level 1.0
+DISASTER_SEVERITY = (0.1, 0.5)  # fraction of every population lost in a disaster
+DISEASE_HAZARD = 0.05           # per-step outbreak chance at probability slider 1.0
+DISEASE_SEVERITY = (0.05, 0.3)  # fraction of animals lost in an outbreak
+
+# Random channels drawn per replicate and step.  A shock fires when its draw u
+# falls below the event chance p; u / p is then a fresh uniform that sets the
+# shock's severity, so no separate severity draw is needed.
+_POLLUTION, _DISASTER, _DISEASE = range(3)
+_N_CHANNELS = 3
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix64(z):
+    # SplitMix64 finalizer; uint64 array arithmetic wraps modulo 2**64
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _uniform(keys, counters):
+    # Counter-based stream: draw k of replicate i depends only on (keys[i], k),
+    # so replicates stay reproducible whatever the ensemble size or chunking.
+    # Returns an array of shape (len(counters), len(keys)).
+    z = keys[None, :] + counters[:, None] * _GOLDEN
+    return (_mix64(z) >> np.uint64(11)) * (1.0 / (1 << 53))
+
+
+def replicate_keys(seed, n_replicates):
+    """Return one 64-bit stream key per replicate, derived from ``seed``."""
+    base = np.random.SeedSequence(seed).generate_state(1, np.uint64)[0]
+    return _mix64(base + np.arange(n_replicates, dtype=np.uint64) * _GOLDEN)
+
+
+@dataclass
+class EnsembleResult:
+    """Trajectories of an ensemble run, one (n_replicates, time_steps) array per species.
+
+    ``seed`` reproduces the run, or is None when it was driven by explicit keys.
+    """
+
+    plants: np.ndarray
+    herbivores: np.ndarray
+    predators: np.ndarray
+    seed: int
+
+    @property
+    def n_replicates(self):
+        return self.plants.shape[0]
+
+    @property
+    def time_steps(self):
+        return self.plants.shape[1]
+
+    def replicate(self, i):
+        """Return the (plant_pop, herbivore_pop, predator_pop) trajectories of replicate ``i``."""
+        return self.plants[i], self.herbivores[i], self.predators[i]
+
+    def percentiles(self, q=(5, 50, 95)):
+        """Return ``{species: array of shape (len(q), time_steps)}`` percentile bands.
+
+        Matches ``np.percentile(..., axis=0)`` with linear interpolation, but
+        sorts each time step once, which is several times faster than
+        NumPy's per-quantile partitioning for large ensembles.
+        """
+        pos = np.asarray(q, dtype=float) / 100 * (self.n_replicates - 1)
+        lo = np.floor(pos).astype(int)
+        hi = np.minimum(lo + 1, self.n_replicates - 1)
+        w = (pos - lo)[:, None]
+        bands = {}
+        for name in SPECIES:
+            ordered = np.sort(getattr(self, name).T, axis=1)
+            bands[name] = ordered[:, lo].T * (1 - w) + ordered[:, hi].T * w
+        return bands
+
+
+def _broadcast_params(params, n_replicates):
+    values = {**DEFAULT_PARAMS, **params}
+    unknown = set(values) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown simulation parameters: {', '.join(sorted(unknown))}")
+
+    sizes = {np.size(v) for v in values.values() if np.ndim(v) > 0}
+    if len(sizes) > 1:
+        raise ValueError("Per-replicate parameter arrays must all have the same length")
+    if sizes:
+        size = sizes.pop()
+        if n_replicates is not None and n_replicates != size:
+            raise ValueError(f"n_replicates={n_replicates} does not match parameter arrays of length {size}")
+        n_replicates = size
+    if n_replicates is None:
+        n_replicates = 1
+
+    return {k: np.broadcast_to(np.asarray(v, dtype=float), (n_replicates,)) for k, v in values.items()}, n_replicates
+
+
+def run_ensemble(params, time_steps, n_replicates=None, seed=None, keys=None):
+    """Simulate many replicates of the ecosystem at once.
+
+    ``params`` maps sidebar parameter names (see ``DEFAULT_PARAMS``) to either a
+    scalar, shared by every replicate, or an array of per-replicate values.
+    ``n_replicates`` defaults to the length of those arrays, or 1.  The same
+    ``seed`` always produces the same trajectories.  ``keys`` (from
+    ``replicate_keys``) replaces the seed with explicit per-replicate random
+    streams, so replicates that share a key see the same shocks; the result
+    then reports no seed, since the keys alone determine the run.
+    """
+    p, n = _broadcast_params(params, n_replicates if keys is None else len(keys))
+    if keys is None:
+        seed = np.random.SeedSequence(seed).entropy
+        keys = replicate_keys(seed, n)
+    else:
+        seed = None
+
+    # Per-replicate factors of the update rule, grouped as in run_simulation
+    plant_rate = p["plant_growth_rate"]
+    plant_env = 1 + p["water_availability"] - 0.1 * p["human_impact"]
+    herbivore_rate = p["herbivore_birth_rate"]
+    herbivore_env = 1 + p["soil_quality"] - 0.05 * p["temperature_variation"]
+    predator_rate = p["predator_birth_rate"]
+
+    # Shock parameters.  sin(omega * t + phase) is expanded so that the random
+    # phase costs two multiplications per step instead of a sine.
+    phase = 2 * np.pi * _uniform(keys, np.zeros(1, dtype=np.uint64))[0]
+    season_cos = p["seasonal_variation"] * np.cos(phase)
+    season_sin = p["seasonal_variation"] * np.sin(phase)
+    pollution = 2 * POLLUTION_MORTALITY * p["pollution_level"]
+    # Zero steps would divide by zero; no step then uses the chance anyway
+    disaster_chance = p["natural_disasters"] / max(time_steps, 1)
+    disease_chance = DISEASE_HAZARD * p["disease_outbreak"]
+    disaster_low, disaster_high = DISASTER_SEVERITY
+    disease_low, disease_high = DISEASE_SEVERITY
+    channels = np.arange(_N_CHANNELS, dtype=np.uint64)
+
+    plants = p["initial_plants"].copy()
+    herbivores = p["initial_herbivores"].copy()
+    predators = p["initial_predators"].copy()
+    # Filled one time step (row) at a time, so stored time-major
+    out = np.empty((len(SPECIES), time_steps, n))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for t in range(time_steps):
+            omega_t = 2 * np.pi * t / SEASON_LENGTH
+            seasonal = 1 + np.sin(omega_t) * season_cos + np.cos(omega_t) * season_sin
+            plants = np.maximum(plants + plants * plant_rate * plant_env * seasonal - herbivores * 0.01, 0)
+            herbivores = np.maximum(herbivores + herbivores * herbivore_rate * herbivore_env - predators * 0.01, 0)
+            predators = np.maximum(predators + predators * predator_rate * (herbivores / (herbivores + 1)), 0)
+
+            u = _uniform(keys, channels + np.uint64(1 + t * _N_CHANNELS))
+            survival = 1 - pollution * u[_POLLUTION]
+            hit = u[_DISASTER] < disaster_chance
+            survival *= np.where(hit, 1 - disaster_low - (disaster_high - disaster_low) * (u[_DISASTER] / disaster_chance), 1)
+            hit = u[_DISEASE] < disease_chance
+            disease = survival * np.where(hit, 1 - disease_low - (disease_high - disease_low) * (u[_DISEASE] / disease_chance), 1)
+
+            plants *= survival
+            herbivores *= disease
+            predators *= disease
+            out[0, t], out[1, t], out[2, t] = plants, herbivores, predators
+
+    return EnsembleResult(out[0].T, out[1].T, out[2].T, seed=seed)
@@ -0,0 +1,201 @@
+"""Token-by-token chatbot replies that can be cancelled mid-generation."""
+
+import contextvars
+import threading
+import time
+
+from .timing import span
+
+
+class ReplyStream:
+    """Iterates over a reply's text as the model generates it.
+
+    Generation runs in a background thread that stops at the next token once
+    ``cancel()`` is called, or when a ``with`` block around the stream exits,
+    for instance because Streamlit interrupted the script run that was
+    displaying it.  ``text`` holds everything received so far, and ``output``
+    what ``generate`` returned once it has finished.
+
+    ``prompt`` may be None when ``generate_kwargs`` already hold the
+    tokenized ``input_ids``; ``skip_prompt`` leaves the prompt out of the
+    streamed text.  ``on_finish(stream)``, if given, is called from the
+    background thread as soon as generation ends, finished, cancelled or
+    failed (``output`` is then None), whether or not anyone still reads
+    the stream.
+    """
+
+    def __init__(self, chatbot, prompt, token_timeout=60.0, skip_prompt=False, on_finish=None, **generate_kwargs):
+        from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+        cancel_event = self._cancel_event = threading.Event()
+
+        class _StopOnCancel(StoppingCriteria):
+            def __call__(self, input_ids, scores, **kwargs):
+                return cancel_event.is_set()
+
+        tokenizer, model = chatbot.tokenizer, chatbot.model
+        inputs = {} if prompt is None else tokenizer(prompt, return_tensors="pt").to(model.device)
+        self._streamer = TextIteratorStreamer(tokenizer, skip_prompt=skip_prompt, skip_special_tokens=True, timeout=token_timeout)
+        generate_kwargs.setdefault("pad_token_id", tokenizer.eos_token_id)
+        self._kwargs = dict(
+            inputs,
+            streamer=self._streamer,
+            stopping_criteria=StoppingCriteriaList([_StopOnCancel()]),
+            **generate_kwargs,
+        )
+        self._model = model
+        self._on_finish = on_finish
+        self._error = None
+        self.output = None
+        self.text = ""
+        self.started = time.perf_counter()
+        self.first_token_seconds = None
+        # With the caller's context, so the generation span counts for its session
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._generate,),
+                                        name="chatbot stream", daemon=True)
+        self._thread.start()
+
+    def _generate(self):
+        try:
+            with span("model.generate"):
+                self.output = self._model.generate(**self._kwargs)
+        except Exception as e:
+            self._error = e
+            self._streamer.end()
+        if self._on_finish is not None:
+            self._on_finish(self)
+
+    def __iter__(self):
+        for chunk in self._streamer:
+            if self.cancelled:
+                break
+            if not chunk:
+                continue
+            if self.first_token_seconds is None:
+                self.first_token_seconds = time.perf_counter() - self.started
+            self.text += chunk
+            yield chunk
+        if self._error is not None:
+            raise self._error
+
+    def cancel(self):
+        """Stop generating; the background thread exits after the current token."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def wait(self, timeout=None):
+        """Wait for the background generation to finish; returns False on timeout."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+        return False
+
+
+def stream_reply(chatbot, prompt, **generate_kwargs):
+    """Start generating a reply to ``prompt`` with a text-generation pipeline's model.
+
+    Returns a ``ReplyStream``; ``generate_kwargs`` are passed to ``model.generate``.
+    """
+    return ReplyStream(chatbot, prompt, **generate_kwargs)
+
+
+class Conversation:
+    """A multi-turn chat that reuses the model's key/value cache between turns.
+
+    DialoGPT reads a conversation as its turns joined by end-of-text tokens.
+    Instead of re-encoding that whole history for every new message, the
+    attention keys and values computed so far are kept, and each turn only
+    feeds the model the tokens it has not seen yet.  Once the history
+    exceeds ``max_history_tokens`` the oldest tokens are dropped, which
+    invalidates the cache and costs one full re-encode.
+
+    ``reused_tokens`` and ``encoded_tokens`` count history tokens served from
+    the cache and tokens the model had to process, over all turns.
+    """
+
+    def __init__(self, chatbot, max_history_tokens=512):
+        self._chatbot = chatbot
+        self.max_history_tokens = max_history_tokens
+        self._lock = threading.Lock()
+        self._ids = None      # token ids of the whole conversation so far
+        self._cache = None    # key/values of all but the last of those ids
+        self._pending = None  # ReplyStream of the latest turn, while it generates
+        self.turns = []       # (message, reply) pairs; the reply is None while it generates
+        self.reused_tokens = 0
+        self.encoded_tokens = 0
+
+    def _finish(self, reply, prompt_length):
+        # Called by the reply's generation thread as soon as it ends, so the
+        # turn is complete whether or not the page is still showing it
+        with self._lock:
+            if reply is not self._pending:
+                return  # reset, or given up on, meanwhile
+            self._pending = None
+            if reply.output is None:
+                # Failed: start over without a cache
+                self._ids = self._cache = None
+                text = reply.text
+            else:
+                self._ids = reply.output.sequences
+                self._cache = reply.output.past_key_values
+                text = self._chatbot.tokenizer.decode(self._ids[0, prompt_length:], skip_special_tokens=True)
+            self.turns[-1] = (self.turns[-1][0], text)
+
+    def _settle(self):
+        # A new turn continues from the latest reply, so wait for it to finish
+        reply = self._pending
+        if reply is None or reply.wait(timeout=60):
+            return
+        with self._lock:
+            if reply is self._pending:
+                # Still stuck: give up on it and start over without a cache
+                reply.cancel()
+                self._pending = None
+                self._ids = self._cache = None
+                self.turns[-1] = (self.turns[-1][0], reply.text)
+
+    def reply(self, message, **generate_kwargs):
+        """Start answering ``message``; returns a ``ReplyStream`` of the reply text only.
+
+        The answer is added to ``turns`` as soon as generation ends.
+        """
+        import torch
+
+        self._settle()
+        tokenizer = self._chatbot.tokenizer
+        device = self._chatbot.model.device
+        new = tokenizer.encode(message + tokenizer.eos_token, return_tensors="pt").to(device)
+        ids = new if self._ids is None else torch.cat([self._ids, new], dim=1)
+        cache = self._cache
+        if ids.shape[1] > self.max_history_tokens:
+            ids, cache = ids[:, -self.max_history_tokens:], None
+        cached = 0 if cache is None else cache.get_seq_length()
+        self.reused_tokens += cached
+        self.encoded_tokens += ids.shape[1] - cached
+
+        generate_kwargs.setdefault("max_new_tokens", 100)
+        self.turns.append((message, None))
+        with self._lock:
+            # Held until _pending is set, so a quick reply cannot finish unseen
+            self._pending = ReplyStream(
+                self._chatbot, None, skip_prompt=True, input_ids=ids, attention_mask=torch.ones_like(ids),
+                past_key_values=cache, return_dict_in_generate=True,
+                on_finish=lambda reply: self._finish(reply, ids.shape[1]), **generate_kwargs,
+            )
+            return self._pending
+
+    def reset(self):
+        """Forget the conversation and its cache, stopping a reply still being generated."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.cancel()
+            self._ids = self._cache = self._pending = None
+            self.turns.clear()
@@ -0,0 +1,240 @@
+"""CPU inference profiles for the chatbot model.
+
+A profile decides how a freshly loaded model is prepared and how many
+threads torch may use:
+
+- ``quantize``: dynamic int8 quantization of every linear layer.  Weights
+  are stored as int8 and activations quantized on the fly, which roughly
+  quarters the memory of those layers and speeds up CPU matrix products.
+  GPT-2 style models (DialoGPT) implement their projections as
+  ``transformers`` ``Conv1D`` modules, which are converted to equivalent
+  ``nn.Linear`` layers first so that they are quantized too.
+- ``intra_op_threads`` / ``inter_op_threads``: torch's thread pools.  By
+  default torch gives every generation all cores, so concurrent sessions
+  oversubscribe the CPU; ``thread_budget`` splits the cores between the
+  expected number of concurrent generations instead.
+
+Thread pools are process-wide in torch, so one profile is active per
+process; ``configure`` must run before the model is loaded.
+
+Run ``python -m ecosim.inference --model NAME`` to benchmark load time,
+memory and tokens/sec of each profile, each measured in a fresh process.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class InferenceProfile:
+    """How to prepare the chatbot model for CPU inference (see module docstring)."""
+
+    name: str = "fp32"
+    quantize: bool = False
+    intra_op_threads: int = None
+    inter_op_threads: int = None
+
+
+PROFILES = {
+    "fp32": InferenceProfile("fp32"),
+    "int8": InferenceProfile("int8", quantize=True),
+}
+
+_active = PROFILES["fp32"]
+
+
+def thread_budget(concurrent_sessions, cores=None):
+    """Return ``(intra_op, inter_op)`` thread counts that share ``cores`` between sessions."""
+    cores = cores or os.cpu_count() or 1
+    return max(1, cores // max(1, concurrent_sessions)), 1
+
+
+def get_profile(name, concurrent_sessions=None):
+    """Profile ``name`` from ``PROFILES``, with thread budgets for ``concurrent_sessions`` if given."""
+    try:
+        profile = PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown inference profile {name!r}; choose from {', '.join(PROFILES)}") from None
+    if concurrent_sessions:
+        intra, inter = thread_budget(concurrent_sessions)
+        profile = InferenceProfile(profile.name, profile.quantize, intra, inter)
+    return profile
+
+
+def configure(profile):
+    """Make ``profile`` the active profile and apply its thread budgets to torch."""
+    global _active
+    _active = profile
+    if profile.intra_op_threads is None and profile.inter_op_threads is None:
+        return
+    import torch
+
+    if profile.intra_op_threads is not None:
+        torch.set_num_threads(profile.intra_op_threads)
+    if profile.inter_op_threads is not None:
+        try:
+            torch.set_num_interop_threads(profile.inter_op_threads)
+        except RuntimeError:
+            # Only settable before torch's first parallel work; keep the existing pool
+            pass
+
+
+def active_profile():
+    return _active
+
+
+def _conv1d_to_linear(module):
+    # transformers' Conv1D computes x @ weight + bias with weight (in, out);
+    # nn.Linear stores (out, in)
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            linear = torch.nn.Linear(child.weight.shape[0], child.weight.shape[1])
+            linear.weight = torch.nn.Parameter(child.weight.detach().t().contiguous())
+            linear.bias = torch.nn.Parameter(child.bias.detach().clone())
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
+def prepare_model(model, profile=None):
+    """Apply ``profile`` (default: the active one) to a loaded model and return it."""
+    profile = profile or _active
+    if not profile.quantize:
+        return model
+    import torch
+
+    with torch.no_grad():
+        _conv1d_to_linear(model)
+        # In place, so the fp32 weights are freed as their layers are replaced
+        model = torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        # The remaining fp32 tensors still point into the memory-mapped
+        # checkpoint, whose pages were all read during conversion and would
+        # stay resident; copying them lets the mapping go
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            tensor.data = tensor.data.clone()
+    _release_freed_memory()
+    return model
+
+
+def _release_freed_memory():
+    # glibc keeps freed heap memory for reuse; hand it back to the OS so the
+    # smaller quantized model shows up as a smaller process
+    import ctypes
+    import gc
+
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):  # not glibc
+        pass
+
+
+def _measure(model_name, profile_name, new_tokens, turns):
+    # Runs in a fresh process so load time and memory are not skewed by
+    # another profile's model
+    import torch
+
+    from .generation import Conversation
+    from .models import load_text_generation, resident_memory
+
+    profile = get_profile(profile_name)
+    configure(profile)
+    rss_before = resident_memory()
+    start = time.perf_counter()
+    chatbot = load_text_generation(model_name, profile)
+    load_seconds = time.perf_counter() - start
+    tokenizer, model = chatbot.tokenizer, chatbot.model
+    greedy = {"do_sample": False, "pad_token_id": tokenizer.eos_token_id}
+
+    def timed_generate(input_ids, **kwargs):
+        start = time.perf_counter()
+        with torch.inference_mode():
+            output = model.generate(input_ids, attention_mask=torch.ones_like(input_ids), max_new_tokens=new_tokens,
+                                    min_new_tokens=new_tokens, return_dict_in_generate=True, **greedy, **kwargs)
+        return output, time.perf_counter() - start
+
+    prompt = tokenizer.encode("How do predators maintain ecological balance?" + tokenizer.eos_token, return_tensors="pt")
+    timed_generate(prompt)  # warm-up
+    _, seconds = timed_generate(prompt)
+
+    # Multi-turn: re-encoding the whole history every turn vs. reusing the cache
+    messages = [f"Question {i + 1}: what threatens coral reefs and how can we help?" for i in range(turns)]
+    history, reencode_seconds = None, 0.0
+    for message in messages:
+        new = tokenizer.encode(message + tokenizer.eos_token, return_tensors="pt")
+        history = new if history is None else torch.cat([history, new], dim=1)
+        output, elapsed = timed_generate(history)
+        history = output.sequences
+        reencode_seconds += elapsed
+    conversation = Conversation(chatbot, max_history_tokens=10**9)
+    start = time.perf_counter()
+    for message in messages:
+        with conversation.reply(message, max_new_tokens=new_tokens, min_new_tokens=new_tokens, **greedy) as reply:
+            for _ in reply:
+                pass
+    cached_seconds = time.perf_counter() - start
+
+    return {
+        "profile": profile_name,
+        "load_seconds": load_seconds,
+        "rss_mb": resident_memory() / 2**20,
+        "model_rss_mb": (resident_memory() - rss_before) / 2**20,
+        "tokens_per_second": new_tokens / seconds,
+        "multi_turn_reencode_seconds": reencode_seconds,
+        "multi_turn_cached_seconds": cached_seconds,
+        "threads": torch.get_num_threads(),
+    }
+
+
+def benchmark(model_name, profiles=tuple(PROFILES), new_tokens=64, turns=4):
+    """Measure every profile in its own subprocess; returns one result dict per profile."""
+    results = []
+    for name in profiles:
+        output = subprocess.run(
+            [sys.executable, "-m", "ecosim.inference", "--model", model_name, "--measure", name,
+             "--tokens", str(new_tokens), "--turns", str(turns)],
+            check=True, capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ecosim.inference", description="Benchmark chatbot CPU inference profiles.")
+    parser.add_argument("--model", default=None, help="model name or path (default: the page's chatbot model)")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help=f"comma-separated profiles (default: {','.join(PROFILES)})")
+    parser.add_argument("--tokens", type=int, default=64, help="new tokens per generation (default: 64)")
+    parser.add_argument("--turns", type=int, default=4, help="conversation turns in the multi-turn test (default: 4)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.model is None:
+        from .models import CHATBOT_MODEL
+
+        args.model = CHATBOT_MODEL
+
+    if args.measure:
+        print(json.dumps(_measure(args.model, args.measure, args.tokens, args.turns)))
+        return
+
+    results = benchmark(args.model, args.profiles.split(","), args.tokens, args.turns)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'profile':<8} {'load s':>7} {'model MB':>9} {'RSS MB':>7} {'tok/s':>7} {'multi-turn s':>13} {'cached s':>9}")
+    for r in results:
+        print(f"{r['profile']:<8} {r['load_seconds']:>7.2f} {r['model_rss_mb']:>9.0f} {r['rss_mb']:>7.0f} "
+              f"{r['tokens_per_second']:>7.1f} {r['multi_turn_reencode_seconds']:>13.2f} {r['multi_turn_cached_seconds']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
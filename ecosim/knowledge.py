@@ -0,0 +1,340 @@
+"""Curated conservation content and a BM25 retrieval index over it.
+
+The page's conservation guides, quiz and educational resources live here as
+data, and ``KnowledgeIndex`` turns them into an in-memory inverted index,
+built once per process (see ``get_index``):
+
+- ``search`` ranks documents with Okapi BM25.  Term weights are
+  precomputed, so a lookup only sums a few small postings dicts and takes
+  microseconds.  Query words missing from the vocabulary are matched to
+  their closest indexed word, which absorbs typos.
+- ``answer`` is the chatbot's fast path: it returns the best document only
+  when it covers most of the question and clearly beats the runner-up.
+- ``prompt`` puts the best matching passages in front of a question that
+  still goes to the language model.
+
+``match_species`` resolves free-form species names ("tigers", "sea turtle",
+"elefant") to the species that have a guide.
+"""
+
+import difflib
+import functools
+import math
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+
+CONSERVATION_GUIDES = {
+    "Tiger": """
+**Conservation Strategies for Tigers:**
+- Protect natural habitats from deforestation and illegal logging.
+- Strengthen anti-poaching laws and wildlife crime monitoring.
+- Support breeding programs in conservation reserves.
+- Reduce human-wildlife conflict by promoting safe buffer zones.
+- Raise awareness about illegal wildlife trade and tiger farming.
+""",
+    "Elephant": """
+**Conservation Strategies for Elephants:**
+- Preserve migratory corridors to ensure safe movement.
+- Prevent poaching by enforcing strict anti-ivory trade laws.
+- Reduce habitat destruction by promoting sustainable agriculture.
+- Support eco-tourism that funds conservation efforts.
+- Raise awareness on human-elephant conflict resolution.
+""",
+    "Panda": """
+**Conservation Strategies for Pandas:**
+- Expand and protect bamboo forests, their primary food source.
+- Prevent habitat fragmentation by creating wildlife corridors.
+- Strengthen captive breeding and reintroduction programs.
+- Promote sustainable farming near panda habitats.
+- Educate communities about the ecological importance of pandas.
+""",
+    "Coral Reefs": """
+**Conservation Strategies for Coral Reefs:**
+- Reduce ocean pollution, especially plastic and chemical runoff.
+- Implement sustainable fishing practices to prevent overfishing.
+- Combat climate change by reducing carbon footprints.
+- Promote coral reef restoration projects like coral farming.
+- Encourage marine protected areas (MPAs) and responsible tourism.
+""",
+    "Blue Whale": """
+**Conservation Strategies for Blue Whales:**
+- Reduce ship strikes by implementing safe marine traffic routes.
+- Minimize ocean noise pollution to avoid disrupting whale communication.
+- Combat illegal whaling through international agreements.
+- Monitor populations through satellite tracking and conservation programs.
+- Protect krill populations by managing sustainable fisheries.
+""",
+    "Mangroves": """
+**Conservation Strategies for Mangroves:**
+- Prevent coastal deforestation and illegal land reclamation.
+- Promote mangrove afforestation and restoration projects.
+- Reduce pollution from agricultural and industrial waste.
+- Educate communities about the role of mangroves in flood control.
+- Establish protected mangrove reserves with strict regulations.
+""",
+    "Amazon Rainforest": """
+**Conservation Strategies for the Amazon Rainforest:**
+- Combat illegal logging and land encroachment.
+- Support indigenous communities and their conservation efforts.
+- Promote sustainable agriculture to reduce deforestation.
+- Reduce greenhouse gas emissions to combat climate change.
+- Strengthen law enforcement against wildlife trafficking.
+""",
+    "Snow Leopard": """
+**Conservation Strategies for Snow Leopards:**
+- Protect mountain ecosystems and prevent habitat fragmentation.
+- Work with local herders to reduce human-wildlife conflict.
+- Strengthen anti-poaching and illegal fur trade enforcement.
+- Support snow leopard monitoring programs using GPS tracking.
+- Raise awareness through global conservation campaigns.
+""",
+    "Sea Turtles": """
+**Conservation Strategies for Sea Turtles:**
+- Reduce plastic pollution to prevent ingestion and entanglement.
+- Protect nesting beaches from human encroachment.
+- Implement fishing gear modifications to prevent accidental capture.
+- Enforce laws against turtle egg poaching and illegal trade.
+- Educate coastal communities about turtle conservation.
+""",
+    "Monarch Butterfly": """
+**Conservation Strategies for Monarch Butterflies:**
+- Plant milkweed, their primary food source, in gardens and wild areas.
+- Reduce pesticide and herbicide use to prevent poisoning.
+- Protect migratory routes by preserving wildflower habitats.
+- Raise awareness about butterfly conservation through education.
+- Support research on population declines and climate adaptation.
+""",
+}
+
+QUIZ_QUESTIONS = {
+    "What is the biggest threat to biodiversity?": {
+        "options": ["Habitat Loss", "Climate Change", "Pollution", "Overexploitation"],
+        "answer": "Habitat Loss"
+    },
+    "Which gas is primarily responsible for global warming?": {
+        "options": ["Oxygen", "Carbon Dioxide", "Nitrogen", "Methane"],
+        "answer": "Carbon Dioxide"
+    },
+    "What percentage of the Earth's surface is covered by forests?": {
+        "options": ["10%", "31%", "50%", "75%"],
+        "answer": "31%"
+    },
+    "Which organization maintains the Red List of Threatened Species?": {
+        "options": ["UNESCO", "WWF", "IUCN", "Greenpeace"],
+        "answer": "IUCN"
+    },
+    "Which biome is home to the most biodiversity?": {
+        "options": ["Desert", "Tundra", "Tropical Rainforest", "Savanna"],
+        "answer": "Tropical Rainforest"
+    }
+}
+
+# (heading, [(name, url, description), ...]) per section of the resources list
+RESOURCES = [
+    ("🌿 **Global Biodiversity & Conservation**", [
+        ("IUCN Red List", "https://www.iucnredlist.org/", "A comprehensive source that tracks the conservation status of species worldwide, including endangered and extinct species."),
+        ("World Wildlife Fund (WWF)", "https://www.worldwildlife.org/", "Provides insights into global conservation efforts, endangered species protection, and climate action."),
+        ("Convention on Biological Diversity (CBD)", "https://www.cbd.int/", "The official platform for international biodiversity agreements and action plans."),
+    ]),
+    ("🌏 **Climate Change & Environmental Science**", [
+        ("NASA Climate Change", "https://climate.nasa.gov/", "Real-time data on global climate change, temperature variations, and CO₂ levels."),
+        ("United Nations Environment Programme (UNEP)", "https://www.unep.org/", "Reports on climate policies, biodiversity loss, and sustainable development goals (SDGs)."),
+        ("IPCC (Intergovernmental Panel on Climate Change)", "https://www.ipcc.ch/", "Scientific assessments on climate change, its impacts, and potential adaptation strategies."),
+    ]),
+    ("📖 **Educational Platforms & Learning**", [
+        ("National Geographic", "https://www.nationalgeographic.com/", "Engaging articles, documentaries, and interactive maps on biodiversity, wildlife, and ecosystems."),
+        ("Khan Academy - Ecology", "https://www.khanacademy.org/science/biology/ecology", "Free courses on ecosystems, food webs, and environmental science."),
+        ("Smithsonian National Museum of Natural History", "https://naturalhistory.si.edu/education", "A collection of interactive exhibits and educational materials on biodiversity and evolution."),
+    ]),
+    ("🏞 **Citizen Science & Wildlife Monitoring**", [
+        ("eBird", "https://ebird.org/", "A platform where birdwatchers contribute data on bird populations and migration patterns."),
+        ("iNaturalist", "https://www.inaturalist.org/", "Allows users to document and share observations of plant and animal species with a global community."),
+        ("Global Biodiversity Information Facility (GBIF)", "https://www.gbif.org/", "Provides open access to biodiversity data, including species distribution maps and occurrence records."),
+    ]),
+]
+
+# Words too common in questions to say anything about the topic
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been best but by can could do does did doing for from
+has have how i if in into is it its me more most my of on or our should so some than that the their
+them then there these they this those to us was we what when where which who why will with would you your
+explain give good help idea know left like main many much need please practice practices save strategies
+strategy tell thing things tip tips way ways
+""".split())
+
+
+def _stem(word):
+    # Plural folding only: enough to match "tigers" with "Tiger"
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lowercased, plural-folded words of ``text`` without stopwords."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return [_stem(word) for word in re.findall(r"[^\W_]+", text) if word not in STOPWORDS]
+
+
+def match_species(name, cutoff=0.75):
+    """The species of ``CONSERVATION_GUIDES`` that ``name`` refers to, or None.
+
+    Every word of ``name`` must match a word of the species name (at least
+    ``cutoff`` similar), so "leopard" finds Snow Leopard but "tiger shark"
+    finds nothing; of several such species, the one with fewest extra
+    words wins.
+    """
+    words = tokenize(name)
+    if not words:
+        return None
+    best = None
+    for species in CONSERVATION_GUIDES:
+        species_words = tokenize(species)
+        if all(difflib.get_close_matches(word, species_words, 1, cutoff) for word in words):
+            if best is None or len(species_words) < len(best[1]):
+                best = species, species_words
+    return None if best is None else best[0]
+
+
+@dataclass(frozen=True)
+class Document:
+    """One entry of the index: ``text`` is shown to users, ``search_text`` is what gets indexed."""
+
+    kind: str
+    title: str
+    text: str
+    search_text: str
+
+
+@dataclass(frozen=True)
+class Hit:
+    """A search result.
+
+    ``coverage`` is the share of the question the document matched: the
+    idf of the question words it contains over the idf of all of them, with
+    words the index has never seen counting as the rarest.
+    """
+
+    document: Document
+    score: float
+    coverage: float
+
+
+def default_documents():
+    """Documents of the guides, quiz answers and resources."""
+    documents = [
+        Document("guide", species, guide.strip(), f"{species} {guide}")
+        for species, guide in CONSERVATION_GUIDES.items()
+    ]
+    documents += [
+        Document("quiz", question, f"{question} **{item['answer']}**.", f"{question} {item['answer']}")
+        for question, item in QUIZ_QUESTIONS.items()
+    ]
+    documents += [
+        Document("resource", name, f"**[{name}]({url})** – {description}", f"{name} {description}")
+        for _, entries in RESOURCES for name, url, description in entries
+    ]
+    return documents
+
+
+class KnowledgeIndex:
+    """Okapi BM25 index over ``documents`` (see module docstring)."""
+
+    def __init__(self, documents=None, k1=1.2, b=0.75):
+        self.documents = list(default_documents() if documents is None else documents)
+        self.k1 = k1
+        token_lists = [tokenize(d.search_text) for d in self.documents]
+        n = len(token_lists)
+        average_length = sum(map(len, token_lists)) / max(n, 1)
+        frequencies = {}
+        for i, tokens in enumerate(token_lists):
+            for token in tokens:
+                counts = frequencies.setdefault(token, {})
+                counts[i] = counts.get(i, 0) + 1
+        # term -> {document: BM25 weight}, and the largest weight a term can
+        # reach, which bounds any document's score for a query
+        self._postings = {}
+        self._idf = {}
+        for token, counts in frequencies.items():
+            idf = math.log(1 + (n - len(counts) + 0.5) / (len(counts) + 0.5))
+            self._idf[token] = idf
+            self._postings[token] = {
+                i: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(token_lists[i]) / average_length))
+                for i, tf in counts.items()
+            }
+        self._unknown_idf = math.log(1 + (n + 0.5) / 0.5)
+        self._vocabulary = sorted(self._postings)
+        self._correct = functools.lru_cache(maxsize=4096)(self._closest_term)
+
+    def _closest_term(self, token):
+        matches = difflib.get_close_matches(token, self._vocabulary, 1, 0.8)
+        return matches[0] if matches else None
+
+    def _terms(self, query):
+        # Returns the indexed terms of the query and the idf of all its words
+        terms, total_idf = [], 0.0
+        for token in dict.fromkeys(tokenize(query)):
+            if token not in self._postings:
+                token = self._correct(token)
+            if token is None:
+                total_idf += self._unknown_idf
+            else:
+                terms.append(token)
+                total_idf += self._idf[token]
+        return terms, total_idf
+
+    def search(self, query, k=3):
+        """The ``k`` best ``Hit``s for ``query``, best first."""
+        terms, total_idf = self._terms(query)
+        scores, matched_idf = {}, {}
+        for term in terms:
+            idf = self._idf[term]
+            for i, weight in self._postings[term].items():
+                scores[i] = scores.get(i, 0.0) + weight
+                matched_idf[i] = matched_idf.get(i, 0.0) + idf
+        best = sorted(scores.items(), key=lambda item: -item[1])[:k]
+        return [Hit(self.documents[i], score, matched_idf[i] / total_idf) for i, score in best]
+
+    def answer(self, query, min_coverage=0.6, margin=1.5):
+        """The ``Hit`` that answers ``query`` on its own, or None.
+
+        The best document must reach ``min_coverage`` and outscore the
+        runner-up by a factor of ``margin``.
+        """
+        hits = self.search(query, k=2)
+        if not hits or hits[0].coverage < min_coverage:
+            return None
+        if len(hits) > 1 and hits[0].score < margin * hits[1].score:
+            return None
+        return hits[0]
+
+    def context(self, query, k=2, min_coverage=0.2, max_chars=600):
+        """Plain text of the best documents for ``query``, at most ``max_chars`` long."""
+        passages = []
+        for hit in self.search(query, k):
+            if hit.coverage < min_coverage:
+                break
+            passages.append(re.sub(r"[*#\[\]]|\(https?://\S+\)", "", hit.document.text).strip())
+        return "\n".join(passages)[:max_chars]
+
+    def prompt(self, query, separator):
+        """``query`` preceded by its ``context`` and ``separator``, or ``query`` alone if nothing matched."""
+        context = self.context(query)
+        return f"{context}{separator}{query}{separator}" if context else query
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the process-wide index of the default documents, building it on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = KnowledgeIndex()
+        return _index
@@ -0,0 +1,141 @@
+"""Process-wide registry of lazily loaded language models.
+
+Streamlit re-executes CODE.py on every widget interaction and runs each
+browser session in its own script thread, but imported modules live once per
+process.  The registry defined here therefore holds a single instance of each
+model for every session, built the first time it is actually needed (or ahead
+of time by a background warm-up thread).
+"""
+
+import os
+import threading
+import time
+
+from .timing import span
+
+CHATBOT_MODEL = "microsoft/DialoGPT-medium"
+
+
+def resident_memory():
+    """Return the resident set size of this process in bytes, or 0 if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    # Peak rather than current RSS: KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def load_text_generation(name, profile=None):
+    """Build a transformers text-generation pipeline for model ``name``.
+
+    The model is prepared for inference ``profile``, by default the active
+    one (see ``ecosim.inference``).  Its tokenizer is set up for batches
+    once, here, because every session shares it afterwards.
+    """
+    from transformers import pipeline
+
+    from .inference import prepare_model
+
+    chatbot = pipeline("text-generation", model=name, framework="pt")
+    chatbot.model = prepare_model(chatbot.model, profile)
+    tokenizer = chatbot.tokenizer
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    # Decoder-only models continue from the end of the prompt, so pad on the left
+    tokenizer.padding_side = "left"
+    return chatbot
+
+
+class _Entry:
+    def __init__(self):
+        self.ready = threading.Event()
+        self.model = None
+        self.error = None
+        self.status = "loading"
+        self.load_seconds = None
+        self.rss_delta = None
+
+
+class ModelRegistry:
+    """Loads each named model at most once and shares it between callers.
+
+    ``loader(name)`` builds a model; it runs in whichever thread first asks
+    for the model, and concurrent callers wait for that load instead of
+    starting their own.  A failed load is reported to every waiting caller
+    and retried on the next request.
+    """
+
+    def __init__(self, loader=load_text_generation):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _claim(self, name):
+        # Returns (entry, owner): owner is True if the caller must do the load
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.status == "failed":
+                entry = self._entries[name] = _Entry()
+                return entry, True
+            return entry, False
+
+    def _load(self, name, entry):
+        rss_before = resident_memory()
+        start = time.perf_counter()
+        try:
+            with span("model.load"):
+                entry.model = self._loader(name)
+        except Exception as e:
+            entry.error = e
+            entry.status = "failed"
+        else:
+            entry.status = "ready"
+        finally:
+            entry.load_seconds = time.perf_counter() - start
+            entry.rss_delta = resident_memory() - rss_before
+            entry.ready.set()
+
+    def get(self, name=CHATBOT_MODEL):
+        """Return model ``name``, loading it in the calling thread if needed."""
+        entry, owner = self._claim(name)
+        if owner:
+            self._load(name, entry)
+        entry.ready.wait()
+        if entry.error is not None:
+            raise entry.error
+        return entry.model
+
+    def warm_up(self, name=CHATBOT_MODEL):
+        """Start loading ``name`` in a daemon thread unless it is loaded or loading."""
+        entry, owner = self._claim(name)
+        if owner:
+            threading.Thread(target=self._load, args=(name, entry), name=f"warm-up {name}", daemon=True).start()
+
+    def is_loaded(self, name=CHATBOT_MODEL):
+        entry = self._entries.get(name)
+        return entry is not None and entry.status == "ready"
+
+    def stats(self):
+        """Return ``{name: {...}}`` with status, load time and memory cost of each model."""
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            name: {
+                "status": entry.status,
+                "load_seconds": entry.load_seconds,
+                "rss_delta_bytes": entry.rss_delta,
+                "error": None if entry.error is None else str(entry.error),
+            }
+            for name, entry in entries.items()
+        }
+
+
+# Shared by every session served by this process
+registry = ModelRegistry()
@@ -0,0 +1,151 @@
+"""Interactive Plotly views of a run, drawn in the browser.
+
+The dashboard used to be a 2x2 matplotlib/seaborn figure rasterized on the
+server for every run.  Here each view is a Plotly figure that the browser
+draws; the server only prepares the data:
+
+- long series are decimated to at most ``max_points`` points per species,
+  keeping each bucket's minimum and maximum so peaks stay visible;
+- histograms and kernel density estimates are computed with NumPy (the
+  KDE on a binned grid, linear in the series length) instead of seaborn.
+
+``dashboard_views`` also reports, per view, how many points it sends, the
+size of its JSON payload and how long it took to build.
+"""
+
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+COLORS = {"Plants": "green", "Herbivores": "blue", "Predators": "red"}
+
+# Grid points of the kernel density estimate
+KDE_POINTS = 256
+
+
+def decimate(values, max_points=2000):
+    """Indices of a subset of ``values`` of at most ``max_points`` points that keeps every bucket's extremes."""
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max((max_points - 2) // 2, 1)
+    width = -(-n // buckets)
+    # Pad with the last value; argmin/argmax return the first occurrence, so
+    # padding is never picked over a real point
+    padded = np.empty(buckets * width)
+    padded[:n] = values
+    padded[n:] = values[-1]
+    shaped = padded.reshape(buckets, width)
+    starts = np.arange(buckets) * width
+    indices = np.concatenate([[0, n - 1], starts + shaped.argmin(axis=1), starts + shaped.argmax(axis=1)])
+    return np.unique(indices[indices < n])
+
+
+def histogram_kde(values, bins=20):
+    """Histogram counts and a Gaussian KDE scaled to the same counts.
+
+    Returns ``(bin_edges, counts, grid, density)``.  The KDE uses Scott's
+    bandwidth, like seaborn, and is evaluated by binning the data on
+    ``KDE_POINTS`` grid points and convolving with the kernel.  Non-finite
+    values are left out; when none are left every array is empty.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return np.array([]), np.array([], dtype=np.int64), np.array([]), np.array([])
+    counts, edges = np.histogram(values, bins=bins)
+    n = len(values)
+    spread = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or spread == 0:
+        return edges, counts, np.array([]), np.array([])
+    bandwidth = spread * n ** (-1 / 5)
+    grid = np.linspace(values.min() - 3 * bandwidth, values.max() + 3 * bandwidth, KDE_POINTS)
+    step = grid[1] - grid[0]
+    # Linear binning: each value is split between its two nearest grid points
+    position = (values - grid[0]) / step
+    left = np.floor(position).astype(int)
+    weight = position - left
+    binned = np.bincount(left, 1 - weight, KDE_POINTS) + np.bincount(left + 1, weight, KDE_POINTS + 1)[:KDE_POINTS]
+    offsets = np.arange(-KDE_POINTS + 1, KDE_POINTS) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    # Full convolution; grid point i sits at index i + KDE_POINTS - 1
+    density = np.convolve(binned, kernel)[KDE_POINTS - 1:2 * KDE_POINTS - 1]
+    # Scale from probability density to counts per histogram bin, like seaborn
+    return edges, counts, grid, density * (edges[1] - edges[0])
+
+
+def dashboard_views(series, max_points=2000):
+    """The four dashboard views of ``series`` ({species label: populations per step}).
+
+    Returns ``(views, stats)``: ``views`` maps a title to a Plotly figure,
+    ``stats`` holds one row per view with the points sent, the JSON payload
+    size in bytes and the build time in milliseconds.
+    """
+    series = {name: np.asarray(values, dtype=float) for name, values in series.items()}
+    steps = np.arange(len(next(iter(series.values()))))
+    views, stats = {}, []
+
+    def measure(title, build):
+        start = time.perf_counter()
+        fig, points = build()
+        fig.update_layout(title=title, margin={"t": 50, "b": 40, "l": 40, "r": 20}, height=420)
+        payload = len(fig.to_json())
+        views[title] = fig
+        stats.append({"view": title, "points": points, "payload_bytes": payload, "build_ms": (time.perf_counter() - start) * 1000})
+
+    def trends():
+        fig, points = go.Figure(), 0
+        for name, values in series.items():
+            keep = decimate(values, max_points)
+            fig.add_trace(go.Scatter(x=steps[keep], y=values[keep], name=name, mode="lines", line={"color": COLORS.get(name), "width": 2}))
+            points += len(keep)
+        fig.update_xaxes(title="Time Steps")
+        fig.update_yaxes(title="Population")
+        return fig, points
+
+    def proportions():
+        # A stacked area needs shared x values, so decimate by the summed series
+        keep = decimate(sum(series.values()), max_points)
+        fig = go.Figure()
+        for name, values in series.items():
+            fig.add_trace(go.Scatter(x=steps[keep], y=values[keep], name=name, mode="lines", stackgroup="species",
+                                     line={"color": COLORS.get(name), "width": 0.5}))
+        fig.update_xaxes(title="Time Steps")
+        fig.update_yaxes(title="Population")
+        return fig, len(keep) * len(series)
+
+    def distribution():
+        fig, points, empty = go.Figure(), 0, []
+        for name, values in series.items():
+            edges, counts, grid, density = histogram_kde(values)
+            if not len(counts):
+                empty.append(name)
+                continue
+            color = COLORS.get(name)
+            fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), name=name,
+                                 marker={"color": color}, opacity=0.4, legendgroup=name))
+            fig.add_trace(go.Scatter(x=grid, y=density, mode="lines", line={"color": color}, legendgroup=name, showlegend=False))
+            points += len(counts) + len(grid)
+        fig.update_layout(barmode="overlay")
+        if empty:
+            fig.add_annotation(text=f"No finite populations to show for {', '.join(empty)}", showarrow=False,
+                               xref="paper", yref="paper", x=0.5, y=0.5)
+        fig.update_xaxes(title="Population Count")
+        fig.update_yaxes(title="Frequency")
+        return fig, points
+
+    def correlation():
+        names = list(series)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            matrix = np.corrcoef(np.stack(list(series.values())))
+        fig = go.Figure(go.Heatmap(z=matrix, x=names, y=names, zmin=-1, zmax=1, colorscale="RdBu_r",
+                                   text=np.round(matrix, 2), texttemplate="%{text}"))
+        fig.update_yaxes(autorange="reversed")
+        return fig, matrix.size
+
+    measure("📈 Population Trends Over Time", trends)
+    measure("📊 Proportional Representation of Species Over Time", proportions)
+    measure("📊 Population Distribution (Fluctuations Over Time)", distribution)
+    measure("🔗 Correlation Between Species Populations", correlation)
+    return views, stats
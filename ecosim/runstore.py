@@ -0,0 +1,314 @@
+"""On-disk store of simulation runs, for comparing and replaying them later.
+
+A store is a directory of three files:
+
+- ``trajectories.f32``: every run's populations as raw float32, appended
+  run after run.  A run of T steps takes 3 * T values, one contiguous
+  column per species, so one species of one run is a single slice of the
+  memory-mapped file;
+- ``runs.bin``: the catalog, one fixed-size record per run (``CATALOG_DTYPE``)
+  with its parameters, where its columns start, and per-species summary
+  statistics.  Filtering and summarizing runs reads only this file;
+- ``meta.json``: the format version and the parameter names.
+
+Both data files are only ever appended to.  A run's columns are written
+before its catalog record, so a run is visible only once it is complete,
+and a record cut short by a crash is ignored (and overwritten by the next
+append).  Any number of processes may read and append to one store:
+appends, and the clean-up a store does when it is opened, hold an exclusive
+``flock`` on the catalog.  Without ``fcntl`` (on Windows) they are only
+serialized within one process.
+
+Populations are stored as float32: values beyond its range (about 3.4e38,
+reached by runs that overflow) become infinite.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .ensemble import DEFAULT_PARAMS, SPECIES
+
+FORMAT_VERSION = 1
+PARAMETERS = tuple(DEFAULT_PARAMS)
+STATISTICS = ("mean", "min", "max", "final")
+
+CATALOG_DTYPE = np.dtype(
+    [("run_id", "<i8"), ("offset", "<i8"), ("steps", "<i4"), ("created", "<f8"),
+     ("session", "S16"), ("mode", "S48"), ("label", "S64"), ("settings", "S128")]
+    + [(name, "<f8") for name in PARAMETERS]
+    + [(f"{species}_{stat}", "<f4") for species in SPECIES for stat in STATISTICS]
+)
+_TEXT_FIELDS = ("session", "mode", "label", "settings")
+
+
+def _encode(text, size):
+    # Cut at a character boundary so the stored bytes always decode
+    data = str(text).encode()[:size]
+    return data.decode(errors="ignore").encode()
+
+
+def _encode_settings(settings):
+    return _encode(json.dumps(settings or {}, sort_keys=True, separators=(",", ":"), default=str), 128)
+
+
+class RunStore:
+    """Runs appended to the store in directory ``path``, created if missing.
+
+    Run ids are consecutive from 0, in the order runs were appended.  Safe to
+    use from several threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._data_path = os.path.join(path, "trajectories.f32")
+        self._catalog_path = os.path.join(path, "runs.bin")
+        self._lock = threading.Lock()
+        self._catalog = self._data = None
+        self._sorted = {}  # parameter -> (runs indexed, run ids sorted by it, its sorted values)
+        with self._exclusive():
+            self._check_meta(os.path.join(path, "meta.json"))
+            open(self._data_path, "ab").close()
+            self._recover()
+
+    @contextmanager
+    def _exclusive(self):
+        # Held across every write, by this process's threads and by other
+        # processes, so no append is ever seen, or cut off, half-written
+        with self._lock, open(self._catalog_path, "ab") as catalog:
+            if fcntl is not None:
+                fcntl.flock(catalog, fcntl.LOCK_EX)
+            yield catalog
+
+    def _check_meta(self, meta_path):
+        meta = {"version": FORMAT_VERSION, "parameters": list(PARAMETERS), "species": list(SPECIES)}
+        try:
+            with open(meta_path) as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            with open(meta_path, "w") as f:
+                json.dump(meta, f, indent=2)
+            return
+        if stored != meta:
+            raise ValueError(f"{self.path} holds runs in another format ({stored}); use a new directory")
+
+    def _recover(self):
+        # Drop a catalog record or columns left incomplete by an interrupted append
+        size = os.path.getsize(self._catalog_path)
+        n = size // CATALOG_DTYPE.itemsize
+        if size % CATALOG_DTYPE.itemsize:
+            os.truncate(self._catalog_path, n * CATALOG_DTYPE.itemsize)
+        end = 0
+        if n:
+            last = self._records()[-1]
+            end = (int(last["offset"]) + len(SPECIES) * int(last["steps"])) * 4
+        if os.path.getsize(self._data_path) > end:
+            os.truncate(self._data_path, end)
+
+    def _records(self):
+        # The memory maps are reopened whenever the files have grown
+        n = os.path.getsize(self._catalog_path) // CATALOG_DTYPE.itemsize
+        if self._catalog is None or len(self._catalog) != n:
+            self._catalog = (np.memmap(self._catalog_path, CATALOG_DTYPE, mode="r", shape=(n,)) if n
+                             else np.zeros(0, CATALOG_DTYPE))
+        return self._catalog
+
+    def _values(self):
+        n = os.path.getsize(self._data_path) // 4
+        if self._data is None or len(self._data) != n:
+            self._data = np.memmap(self._data_path, np.float32, mode="r", shape=(n,)) if n else np.zeros(0, np.float32)
+        return self._data
+
+    def __len__(self):
+        return os.path.getsize(self._catalog_path) // CATALOG_DTYPE.itemsize
+
+    def append(self, params, series, mode="", label="", session="", settings=None):
+        """Store one run and return its id.
+
+        ``params`` holds the simulation parameters (any missing one is stored
+        as NaN), ``series`` the three population series in ``SPECIES`` order,
+        ``settings`` the mode's extra settings, kept as JSON for display.
+        """
+        columns = np.asarray(series, dtype=np.float64)
+        if columns.ndim != 2 or len(columns) != len(SPECIES) or not columns.shape[1]:
+            raise ValueError(f"expected {len(SPECIES)} non-empty series of equal length, got shape {columns.shape}")
+        with np.errstate(over="ignore"):
+            columns = columns.astype(np.float32)
+        record = np.zeros((), CATALOG_DTYPE)
+        record["steps"] = columns.shape[1]
+        record["created"] = time.time()
+        record["session"] = _encode(session, 16)
+        record["mode"] = _encode(mode, 48)
+        record["label"] = _encode(label, 64)
+        record["settings"] = _encode_settings(settings)
+        for name in PARAMETERS:
+            record[name] = params.get(name, np.nan)
+        with np.errstate(invalid="ignore", over="ignore"):
+            for species, column in zip(SPECIES, columns):
+                for stat, value in zip(STATISTICS, (column.mean(dtype=np.float64), column.min(), column.max(), column[-1])):
+                    record[f"{species}_{stat}"] = value
+
+        with self._exclusive() as catalog:
+            run_id = len(self)
+            record["run_id"] = run_id
+            with open(self._data_path, "ab") as f:
+                record["offset"] = f.tell() // 4
+                f.write(columns.tobytes())
+            catalog.write(record.tobytes())
+        return run_id
+
+    def catalog(self, run_ids=None):
+        """The catalog records of ``run_ids`` (default: every run) as a read-only structured array."""
+        records = self._records()
+        return records if run_ids is None else records[np.asarray(run_ids, dtype=np.int64)]
+
+    def rows(self, run_ids=None):
+        """The catalog records of ``run_ids`` as dicts, with text fields decoded, for tables."""
+        rows = []
+        for record in self.catalog(run_ids):
+            row = {name: record[name].item() for name in CATALOG_DTYPE.names if name != "offset"}
+            for name in _TEXT_FIELDS:
+                row[name] = row[name].decode(errors="ignore")
+            rows.append(row)
+        return rows
+
+    def params(self, run_id):
+        """The parameters run ``run_id`` was simulated with, plus ``time_steps``."""
+        record = self.catalog()[run_id]
+        # Integer parameters come back as integers, as the sliders give them
+        params = {name: type(DEFAULT_PARAMS[name])(record[name]) for name in PARAMETERS if not np.isnan(record[name])}
+        params["time_steps"] = int(record["steps"])
+        return params
+
+    def trajectory(self, run_id):
+        """The populations of run ``run_id``, a read-only ``(species, steps)`` view of the memory-mapped file."""
+        record = self.catalog()[run_id]
+        start, steps = int(record["offset"]), int(record["steps"])
+        return self._values()[start:start + len(SPECIES) * steps].reshape(len(SPECIES), steps)
+
+    def _index(self, name):
+        # Run ids sorted by one parameter, rebuilt after appends; a range query
+        # is then two binary searches instead of a scan of every record
+        records = self.catalog()
+        indexed, order, values = self._sorted.get(name, (-1, None, None))
+        if indexed != len(records):
+            column = np.asarray(records[name])
+            order = np.argsort(column, kind="stable")
+            values = column[order]
+            self._sorted[name] = (len(records), order, values)
+        return order, values
+
+    def select(self, session=None, mode=None, time_steps=None, settings=None, **ranges):
+        """Ids of the runs matching every condition, in the order they were stored.
+
+        Each of ``ranges`` maps a parameter to a value or to an inclusive
+        ``(low, high)`` range; ``None`` for either bound leaves it open.
+        """
+        records = self.catalog()
+        selected = np.arange(len(records))
+        for name, bounds in ranges.items():
+            if name not in PARAMETERS:
+                raise ValueError(f"unknown parameter {name!r}; choose from {', '.join(PARAMETERS)}")
+            low, high = bounds if isinstance(bounds, (tuple, list)) else (bounds, bounds)
+            order, values = self._index(name)
+            start = 0 if low is None else np.searchsorted(values, low, side="left")
+            stop = len(values) if high is None else np.searchsorted(values, high, side="right")
+            selected = np.intersect1d(selected, order[start:stop], assume_unique=True)
+        matches = np.ones(len(selected), dtype=bool)
+        if session is not None:
+            matches &= records["session"][selected] == _encode(session, 16)
+        if mode is not None:
+            matches &= records["mode"][selected] == _encode(mode, 48)
+        if time_steps is not None:
+            matches &= records["steps"][selected] == time_steps
+        if settings is not None:
+            matches &= records["settings"][selected] == _encode_settings(settings)
+        return selected[matches]
+
+    def find(self, params, time_steps, mode=None, settings=None, session=None):
+        """Id of the latest run with exactly these parameters and length, or ``None``."""
+        matches = self.select(session=session, mode=mode, time_steps=time_steps, settings=settings,
+                              **{name: value for name, value in params.items() if name in PARAMETERS})
+        return int(matches[-1]) if len(matches) else None
+
+    def overlay(self, run_ids, species, max_points=2000):
+        """``{run_id: (steps, values)}`` of one species across runs, each decimated to ``max_points``.
+
+        Only the decimated points are copied out of the memory-mapped file.
+        """
+        from .plots import decimate
+
+        row = SPECIES.index(species)
+        series = {}
+        for run_id in run_ids:
+            values = self.trajectory(run_id)[row]
+            steps = decimate(values, max_points)
+            series[int(run_id)] = (steps + 1, values[steps].astype(np.float64))
+        return series
+
+    def diff(self, a, b, max_points=2000):
+        """How run ``b`` differs from run ``a``.
+
+        Returns the parameters that differ (``{name: (a's, b's)}``), and per
+        species the largest absolute and the root mean square difference,
+        and the final values of both, over the steps both runs have.  The
+        difference series ``b - a`` is included decimated to ``max_points``
+        as ``(steps, values)``.
+        """
+        from .plots import decimate
+
+        params_a, params_b = self.params(a), self.params(b)
+        params = {name: (params_a.get(name), params_b.get(name)) for name in dict.fromkeys([*params_a, *params_b])
+                  if params_a.get(name) != params_b.get(name)}
+        first, second = self.trajectory(a), self.trajectory(b)
+        steps = min(first.shape[1], second.shape[1])
+        species = {}
+        with np.errstate(invalid="ignore", over="ignore"):
+            for name, x, y in zip(SPECIES, first[:, :steps], second[:, :steps]):
+                difference = y.astype(np.float64) - x
+                shown = decimate(difference, max_points)
+                species[name] = {
+                    "max_abs": float(np.abs(difference).max()),
+                    "rmse": float(np.sqrt(np.mean(difference ** 2))),
+                    "final_a": float(x[-1]), "final_b": float(y[-1]),
+                    "series": (shown + 1, difference[shown]),
+                }
+        return {"steps": steps, "params": params, "species": species}
+
+    def summary(self, run_ids=None):
+        """Per-species statistics of ``run_ids`` (default: every run), from the catalog alone.
+
+        ``{species: {stat: (lowest, median, highest)}}`` across the runs, for
+        each of ``STATISTICS``.
+        """
+        records = self.catalog(run_ids)
+        if not len(records):
+            return {}
+        with np.errstate(invalid="ignore"):
+            return {species: {stat: tuple(np.nanpercentile(records[f"{species}_{stat}"].astype(np.float64), [0, 50, 100]))
+                              for stat in STATISTICS}
+                    for species in SPECIES}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_run_store(path):
+    """Return the process-wide run store in directory ``path``, opening it on first use."""
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = RunStore(path)
+        return store
@@ -0,0 +1,233 @@
+"""Global sensitivity analysis of the ensemble model over the sidebar parameters.
+
+Two methods are offered:
+
+- Morris screening: elementary effects along random one-at-a-time
+  trajectories through the parameter space.  ``mu_star`` (mean absolute
+  effect) ranks parameters by influence; ``sigma`` flags interactions and
+  non-linearity.  Cheap: ``n_trajectories * (k + 1)`` evaluations.
+- Sobol indices: the share of output variance explained by each parameter
+  alone (``S1``) and including its interactions (``ST``), estimated from a
+  scrambled Sobol sample (Saltelli's S1 estimator, Jansen's ST estimator).
+  Costs ``n_base * (k + 2)`` evaluations.
+
+Parameters are sampled uniformly over their slider ranges.  Each evaluation
+is one replicate of ``run_ensemble`` (so the shock sliders count too), and
+the outputs are ``log(1 + mean population)`` of each species over the run:
+populations grow exponentially, and on a linear scale a handful of runs
+would dominate every variance.  Points that are compared with each other
+share a random stream, so the indices measure parameter effects rather
+than shock noise.
+
+Evaluations are vectorized in chunks and spread over a process pool.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import numpy as np
+
+from .ensemble import DEFAULT_PARAMS, SPECIES, replicate_keys, run_ensemble
+
+# Slider ranges of the sidebar, i.e. the space the analysis samples
+PARAMETER_RANGES = {
+    "plant_growth_rate": (0.01, 0.5),
+    "herbivore_birth_rate": (0.01, 0.3),
+    "predator_birth_rate": (0.01, 0.2),
+    "initial_plants": (50, 500),
+    "initial_herbivores": (10, 100),
+    "initial_predators": (5, 50),
+    "water_availability": (0.0, 1.0),
+    "temperature_variation": (-10, 40),
+    "soil_quality": (0.1, 1.0),
+    "human_impact": (0.0, 1.0),
+    "pollution_level": (0.0, 1.0),
+    "natural_disasters": (0, 10),
+    "seasonal_variation": (0.0, 1.0),
+    "disease_outbreak": (0.0, 1.0),
+}
+
+# Evaluations per task sent to a worker process
+CHUNK_SIZE = 4096
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # One pool per process, reused by every analysis.  Workers are spawned
+    # rather than forked: the Streamlit server is multi-threaded, and forking
+    # it can deadlock a child on a lock held by another thread.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+@dataclass
+class SensitivityResult:
+    """Sensitivity indices of one analysis.
+
+    ``indices[species][index]`` holds one value per parameter of ``names``:
+    ``mu_star``, ``mu`` and ``sigma`` for Morris, ``S1`` and ``ST`` for
+    Sobol.
+    """
+
+    method: str
+    names: tuple
+    indices: dict
+    n_evaluations: int
+    seconds: float
+
+    @property
+    def key_index(self):
+        """The index parameters are ranked by."""
+        return "mu_star" if self.method == "morris" else "ST"
+
+    def ranking(self, species):
+        """Parameter names ordered from most to least influential on ``species``."""
+        order = np.argsort(-self.indices[species][self.key_index], kind="stable")
+        return [self.names[i] for i in order]
+
+    def rows(self):
+        """One row per (species, parameter), with every index as a column."""
+        return [
+            {"species": species, "parameter": name, **{index: float(values[i]) for index, values in indices.items()}}
+            for species, indices in self.indices.items()
+            for i, name in enumerate(self.names)
+        ]
+
+
+def _evaluate_chunk(columns, keys, time_steps):
+    result = run_ensemble(columns, time_steps, keys=keys)
+    return np.log1p(np.stack([getattr(result, name).mean(axis=1) for name in SPECIES]))
+
+
+def evaluate(samples, names, keys, time_steps=50, base=None, workers=None, progress=None):
+    """Model outputs for parameter ``samples`` in the unit hypercube.
+
+    ``samples`` has one row per evaluation and one column per parameter of
+    ``names``, scaled onto ``PARAMETER_RANGES``; other parameters come from
+    ``base``.  ``keys`` gives each evaluation's random stream.  Chunks run in
+    the process pool, one worker per core, unless ``workers`` is 1, the
+    machine has a single core or there is only one chunk;
+    ``progress(done, total)`` is called after each.  Returns an array of
+    shape (3, n_evaluations).
+    """
+    base = {**DEFAULT_PARAMS, **(base or {})}
+    low = np.array([PARAMETER_RANGES[name][0] for name in names], dtype=float)
+    high = np.array([PARAMETER_RANGES[name][1] for name in names], dtype=float)
+    values = low + samples * (high - low)
+    n = len(samples)
+    outputs = np.empty((len(SPECIES), n))
+
+    def chunk(start):
+        stop = min(start + CHUNK_SIZE, n)
+        columns = {**base, **{name: values[start:stop, i] for i, name in enumerate(names)}}
+        return start, stop, (columns, keys[start:stop], time_steps)
+
+    chunks = [chunk(start) for start in range(0, n, CHUNK_SIZE)]
+    done = 0
+    if workers == 1 or (os.cpu_count() or 1) == 1 or len(chunks) == 1:
+        for start, stop, args in chunks:
+            outputs[:, start:stop] = _evaluate_chunk(*args)
+            done += stop - start
+            if progress is not None:
+                progress(done, n)
+        return outputs
+
+    pool = _get_pool()
+    futures = {pool.submit(_evaluate_chunk, *args): (start, stop) for start, stop, args in chunks}
+    try:
+        for future in as_completed(futures):
+            start, stop = futures[future]
+            outputs[:, start:stop] = future.result()
+            done += stop - start
+            if progress is not None:
+                progress(done, n)
+    finally:
+        # Drop queued chunks if the caller is interrupted
+        for future in futures:
+            future.cancel()
+    return outputs
+
+
+def morris_analysis(n_trajectories=1000, time_steps=50, names=None, base=None, levels=4, seed=None, workers=None, progress=None):
+    """Morris elementary-effects screening of ``names`` (default: every slider).
+
+    Effects are per full slider range, so they compare across parameters.
+    """
+    start_time = time.perf_counter()
+    names = tuple(names or PARAMETER_RANGES)
+    k, r = len(names), n_trajectories
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    rows = np.arange(r)[:, None]
+
+    # Each trajectory starts on the level grid and moves every parameter by
+    # +-delta once, in random order
+    direction = rng.choice([-1.0, 1.0], (r, k))
+    start = rng.integers(0, levels // 2, (r, k)) / (levels - 1) + delta * (direction < 0)
+    order = np.argsort(rng.random((r, k)), axis=1)
+    moves = np.zeros((r, k + 1, k))
+    moves[rows, np.arange(1, k + 1)[None, :], order] = direction[rows, order] * delta
+    points = start[:, None, :] + np.cumsum(moves, axis=1)
+
+    keys = np.repeat(replicate_keys(rng.integers(2**63), r), k + 1)
+    y = evaluate(points.reshape(-1, k), names, keys, time_steps, base, workers, progress).reshape(len(SPECIES), r, k + 1)
+
+    indices = {}
+    for s, species in enumerate(SPECIES):
+        effects = np.empty((r, k))
+        effects[rows, order] = np.diff(y[s], axis=1) / (direction[rows, order] * delta)
+        indices[species] = {
+            "mu_star": np.abs(effects).mean(axis=0),
+            "mu": effects.mean(axis=0),
+            "sigma": effects.std(axis=0, ddof=1) if r > 1 else np.zeros(k),
+        }
+    return SensitivityResult("morris", names, indices, r * (k + 1), time.perf_counter() - start_time)
+
+
+def sobol_analysis(n_base=4096, time_steps=50, names=None, base=None, seed=None, workers=None, progress=None):
+    """First-order and total Sobol indices of ``names`` (default: every slider).
+
+    ``n_base`` is rounded up to a power of two, as the Sobol sequence needs.
+    """
+    from scipy.stats import qmc
+
+    start_time = time.perf_counter()
+    names = tuple(names or PARAMETER_RANGES)
+    k = len(names)
+    m = max(int(np.ceil(np.log2(n_base))), 1)
+    n = 2**m
+    rng = np.random.default_rng(seed)
+    ab = qmc.Sobol(2 * k, scramble=True, seed=rng).random_base2(m)
+    a, b = ab[:, :k], ab[:, k:]
+    # Blocks A, B, then A with column i taken from B, for each i
+    samples = np.empty(((k + 2) * n, k))
+    samples[:n], samples[n:2 * n] = a, b
+    for i in range(k):
+        block = samples[(i + 2) * n:(i + 3) * n]
+        block[:] = a
+        block[:, i] = b[:, i]
+
+    keys = np.tile(replicate_keys(rng.integers(2**63), n), k + 2)
+    y = evaluate(samples, names, keys, time_steps, base, workers, progress).reshape(len(SPECIES), k + 2, n)
+
+    indices = {}
+    for s, species in enumerate(SPECIES):
+        y_a, y_b, y_ab = y[s, 0], y[s, 1], y[s, 2:]
+        variance = np.var(np.concatenate([y_a, y_b]))
+        if variance == 0:
+            indices[species] = {"S1": np.zeros(k), "ST": np.zeros(k)}
+            continue
+        indices[species] = {
+            "S1": np.mean(y_b * (y_ab - y_a), axis=1) / variance,
+            "ST": 0.5 * np.mean((y_a - y_ab) ** 2, axis=1) / variance,
+        }
+    return SensitivityResult("sobol", names, indices, (k + 2) * n, time.perf_counter() - start_time)
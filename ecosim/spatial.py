@@ -0,0 +1,181 @@
+"""Spatial mode: plants, herbivores and predators on a 2D lattice.
+
+Every cell runs the local update of ``run_simulation`` with its own water and
+soil values, taken from smooth random terrain maps centred on the sidebar's
+``water_availability`` and ``soil_quality``.  After the local step each
+species migrates by diffusion to the four neighbouring cells, with
+reflecting borders so migration neither creates nor destroys individuals.
+
+All state lives in a fixed set of float32 arrays of the grid's shape (three
+populations, two growth-rate maps and one scratch buffer), updated in
+place, so memory stays at about 24 bytes per cell whatever the run length:
+24 MB for a 1000x1000 grid.
+
+The model has no carrying capacity, so fast-growing scenarios outgrow the
+float32 range within a few hundred steps; ``run`` then stops at the last
+step that kept every density in range.
+"""
+
+import numpy as np
+
+from .ensemble import DEFAULT_PARAMS
+
+# Fraction of a cell's population that moves to each neighbour per step is
+# diffusion / 4; values above 0.25 would make the explicit scheme unstable.
+DEFAULT_DIFFUSION = {"plants": 0.01, "herbivores": 0.1, "predators": 0.2}
+
+# Spread of the terrain maps around their slider value
+TERRAIN_SPREAD = 0.25
+
+# Largest density a step may reach; the diffusion step computes 4x the
+# density, which must stay finite as well
+DENSITY_LIMIT = float(np.finfo(np.float32).max) / 8
+
+
+def terrain_map(shape, mean, low=0.0, high=1.0, scale=None, rng=None):
+    """Smooth random field with the given mean, clipped to [low, high].
+
+    ``scale`` is the feature size in cells (an eighth of the grid by default).
+    """
+    rng = np.random.default_rng(rng)
+    height, width = shape
+    if scale is None:
+        scale = max(height, width) / 8
+    noise = rng.standard_normal(shape).astype(np.float32)
+    # Gaussian low-pass filter in Fourier space
+    ky = np.fft.fftfreq(height)[:, None]
+    kx = np.fft.rfftfreq(width)[None, :]
+    kernel = np.exp(-2 * (np.pi * scale) ** 2 * (kx ** 2 + ky ** 2))
+    field = np.fft.irfft2(np.fft.rfft2(noise) * kernel, s=shape).astype(np.float32)
+    field -= field.mean()
+    field /= field.std() or 1.0
+    field *= TERRAIN_SPREAD
+    field += mean
+    return np.clip(field, low, high, out=field)
+
+
+class SpatialEcosystem:
+    """Three-species ecosystem on a ``shape`` grid of cells.
+
+    ``params`` takes the sidebar parameter names of ``DEFAULT_PARAMS``;
+    initial populations are per-cell densities, randomly varied by +-50%
+    between cells.  ``water_map`` and ``soil_map`` replace the generated
+    terrain when given.
+    """
+
+    def __init__(self, params=None, shape=(200, 200), diffusion=None, seed=None, water_map=None, soil_map=None):
+        p = {**DEFAULT_PARAMS, **(params or {})}
+        self.shape = tuple(shape)
+        self.diffusion = {**DEFAULT_DIFFUSION, **(diffusion or {})}
+        if any(not 0 <= d <= 0.25 for d in self.diffusion.values()):
+            raise ValueError("diffusion coefficients must lie in [0, 0.25]")
+        rng = np.random.default_rng(seed)
+
+        if water_map is None:
+            water_map = terrain_map(self.shape, p["water_availability"], rng=rng)
+        if soil_map is None:
+            soil_map = terrain_map(self.shape, p["soil_quality"], low=0.1, rng=rng)
+
+        # Per-cell growth rates; the model needs nothing else from the terrain
+        self.plant_rate = (1 + np.asarray(water_map, dtype=np.float32) - np.float32(0.1 * p["human_impact"])) * np.float32(p["plant_growth_rate"])
+        self.herbivore_rate = (1 + np.asarray(soil_map, dtype=np.float32) - np.float32(0.05 * p["temperature_variation"])) * np.float32(p["herbivore_birth_rate"])
+        self.predator_rate = np.float32(p["predator_birth_rate"])
+        # Largest factor by which a density can grow in one step; diffusion
+        # only averages neighbouring cells, so it never raises the maximum
+        self._max_growth = 1 + max(float(self.plant_rate.max()), float(self.herbivore_rate.max()), float(self.predator_rate), 0.0)
+
+        def initial(density):
+            return (density * rng.uniform(0.5, 1.5, self.shape)).astype(np.float32)
+
+        self.plants = initial(p["initial_plants"])
+        self.herbivores = initial(p["initial_herbivores"])
+        self.predators = initial(p["initial_predators"])
+        self._scratch = np.empty(self.shape, dtype=np.float32)
+        self.t = 0
+
+    def _local_step(self):
+        plants, herbivores, predators, tmp = self.plants, self.herbivores, self.predators, self._scratch
+        np.multiply(plants, self.plant_rate, out=tmp)
+        plants += tmp
+        np.multiply(herbivores, np.float32(0.01), out=tmp)
+        plants -= tmp
+        np.maximum(plants, 0, out=plants)
+
+        np.multiply(herbivores, self.herbivore_rate, out=tmp)
+        herbivores += tmp
+        np.multiply(predators, np.float32(0.01), out=tmp)
+        herbivores -= tmp
+        np.maximum(herbivores, 0, out=herbivores)
+
+        # predators += predators * rate * herbivores / (herbivores + 1)
+        np.add(herbivores, np.float32(1), out=tmp)
+        np.divide(herbivores, tmp, out=tmp)
+        tmp *= self.predator_rate
+        tmp *= predators
+        predators += tmp
+        np.maximum(predators, 0, out=predators)
+
+    def _diffuse(self, x, d):
+        # x += d/4 * (sum of the four neighbours - 4 x), reflecting at the edges
+        if d == 0:
+            return
+        lap = self._scratch
+        np.multiply(x, np.float32(-4), out=lap)
+        lap[1:] += x[:-1]
+        lap[:-1] += x[1:]
+        lap[:, 1:] += x[:, :-1]
+        lap[:, :-1] += x[:, 1:]
+        lap[0] += x[0]
+        lap[-1] += x[-1]
+        lap[:, 0] += x[:, 0]
+        lap[:, -1] += x[:, -1]
+        lap *= np.float32(d / 4)
+        x += lap
+
+    def step(self):
+        """Advance every cell by one time step.
+
+        Returns False, leaving the grid as it is, if a density could exceed
+        ``DENSITY_LIMIT`` in this step.
+        """
+        peak = max(float(self.plants.max()), float(self.herbivores.max()), float(self.predators.max()))
+        if peak * self._max_growth > DENSITY_LIMIT:
+            return False
+        self._local_step()
+        self._diffuse(self.plants, self.diffusion["plants"])
+        self._diffuse(self.herbivores, self.diffusion["herbivores"])
+        self._diffuse(self.predators, self.diffusion["predators"])
+        self.t += 1
+        return True
+
+    def mean_densities(self):
+        """Return the mean (plants, herbivores, predators) population per cell."""
+        # Summed in float64: float32 sums of large densities overflow
+        return tuple(float(x.mean(dtype=np.float64)) for x in (self.plants, self.herbivores, self.predators))
+
+    def run(self, time_steps, frame_every=1):
+        """Step ``time_steps`` times, yielding ``self.t`` every ``frame_every`` steps and at the end.
+
+        Stops early if a step would take a density out of range (see ``step``).
+        """
+        for i in range(time_steps):
+            if not self.step():
+                return
+            if self.t % frame_every == 0 or i == time_steps - 1:
+                yield self.t
+
+    def frame(self, max_size=None):
+        """Render the grid as an RGB uint8 image: plants green, herbivores blue, predators red.
+
+        Each channel shows log abundance relative to that species' current
+        maximum.  Grids larger than ``max_size`` pixels are subsampled.
+        """
+        stride = 1 if max_size is None else max(1, -(-max(self.shape) // max_size))
+        image = np.empty(self.plants[::stride, ::stride].shape + (3,), dtype=np.uint8)
+        for channel, x in ((1, self.plants), (2, self.herbivores), (0, self.predators)):
+            view = np.log1p(x[::stride, ::stride])
+            peak = view.max()
+            if peak > 0:
+                view *= np.float32(255 / peak)
+            image[..., channel] = view
+        return image
@@ -0,0 +1,207 @@
+"""Long-horizon runs streamed in chunks, summarized in bounded memory.
+
+``simulation_chunks`` yields the ``run_simulation`` trajectory a chunk of
+steps at a time instead of building three lists of every value.  Consumers
+keep only what they need:
+
+- ``RunningStats`` folds chunks into min, max, mean and the correlation
+  matrix of the species in O(1) memory;
+- ``PeakDownsampler`` keeps a display series of at most ``max_points``
+  points that still contains every bucket's minimum and maximum, so peaks
+  and crashes survive downsampling however long the run.
+
+``run_simulation``'s model has no carrying capacity, so most scenarios
+outgrow the floating-point range within 100,000 steps; the stream then ends
+at the last finite step.  Give ``simulation_chunks`` a ``capacity`` and
+populations grow logistically towards it instead, so runs stay finite over
+any horizon.
+"""
+
+import numpy as np
+
+from .ensemble import DEFAULT_PARAMS, SPECIES
+
+
+def simulation_chunks(params=None, time_steps=1_000_000, chunk_size=65536, capacity=None):
+    """Yield the trajectory of ``run_simulation`` as (3, n) arrays of at most ``chunk_size`` steps.
+
+    ``capacity`` holds a carrying capacity per species, in ``SPECIES``
+    order; each growth term is then scaled by ``1 - population / capacity``.
+    Without it the trajectory is exactly ``run_simulation``'s, and stops
+    early, after the last finite step, if a population overflows.
+
+    Steps depend on the step before, so they are computed one at a time,
+    except once the populations settle: when a chunk ends in a state that
+    repeats every step or every other step (bounded runs get there within a
+    few thousand steps, at most one unit in the last place apart), the rest
+    of the run is filled in from it without stepping.
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    plant_growth_rate, herbivore_birth_rate, predator_rate = (
+        p["plant_growth_rate"], p["herbivore_birth_rate"], p["predator_birth_rate"])
+    plant_env = 1 + p["water_availability"] - 0.1 * p["human_impact"]
+    herbivore_env = 1 + p["soil_quality"] - 0.05 * p["temperature_variation"]
+    plant_capacity, herbivore_capacity, predator_capacity = capacity or (np.inf,) * len(SPECIES)
+    plants, herbivores, predators = p["initial_plants"], p["initial_herbivores"], p["initial_predators"]
+
+    steady = None  # the last two states, once the run repeats them
+    for start in range(0, time_steps, chunk_size):
+        n = min(chunk_size, time_steps - start)
+        if steady is not None:
+            chunk = np.tile(steady, (n + 1) // 2)[:, :n]
+            steady = chunk[:, -2:] if n > 1 else steady[:, ::-1]
+            yield chunk
+            continue
+        plant_pop, herbivore_pop, predator_pop = [], [], []
+        for _ in range(n):
+            # Same expressions, in the same order, as run_simulation; without a
+            # capacity each growth term is multiplied by exactly 1.0
+            plants = max(plants + plants * plant_growth_rate * plant_env * (1 - plants / plant_capacity) - herbivores * 0.01, 0)
+            herbivores = max(herbivores + herbivores * herbivore_birth_rate * herbivore_env * (1 - herbivores / herbivore_capacity)
+                             - predators * 0.01, 0)
+            predators = max(predators + predators * predator_rate * (herbivores / (herbivores + 1))
+                            * (1 - predators / predator_capacity), 0)
+            plant_pop.append(plants)
+            herbivore_pop.append(herbivores)
+            predator_pop.append(predators)
+        chunk = np.array([plant_pop, herbivore_pop, predator_pop])
+        finite = np.isfinite(chunk).all(axis=0)
+        if not finite.all():
+            last = int(np.argmin(finite))
+            if last:
+                yield chunk[:, :last]
+            return
+        if n >= 3 and (chunk[:, -1] == chunk[:, -3]).all():
+            # The next state is the one before the last, and so on
+            steady = chunk[:, -2:]
+        yield chunk
+
+
+class RunningStats:
+    """Min, max, mean and correlation of streamed chunks, in O(1) memory.
+
+    Chunks of shape (n_series, n) are merged with the pairwise update of
+    Chan et al., which stays accurate over millions of values.
+    """
+
+    def __init__(self, names=SPECIES):
+        self.names = tuple(names)
+        k = len(self.names)
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+        self._comoment = np.zeros((k, k))
+
+    def update(self, chunk):
+        n = chunk.shape[1]
+        if n == 0:
+            return
+        mean = chunk.mean(axis=1)
+        centered = chunk - mean[:, None]
+        delta = mean - self.mean
+        total = self.count + n
+        self._comoment += centered @ centered.T + np.outer(delta, delta) * (self.count * n / total)
+        self.mean += delta * (n / total)
+        self.count = total
+        np.minimum(self.min, chunk.min(axis=1), out=self.min)
+        np.maximum(self.max, chunk.max(axis=1), out=self.max)
+
+    @property
+    def std(self):
+        return np.sqrt(np.diag(self._comoment) / max(self.count, 1))
+
+    @property
+    def correlation(self):
+        """Correlation matrix of the series; NaN where a series is constant."""
+        scale = np.sqrt(np.diag(self._comoment))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._comoment / np.outer(scale, scale)
+
+
+class PeakDownsampler:
+    """Bounded display series of a stream that keeps its peaks.
+
+    Steps are grouped into buckets of equal width, and each bucket keeps the
+    step and value of every series' minimum and maximum.  When there are
+    more than ``max_points / 2`` buckets, neighbouring buckets are merged
+    and the width doubles, so memory stays bounded while every extreme of
+    the full run remains visible.
+    """
+
+    def __init__(self, max_points=4000, n_series=len(SPECIES)):
+        self.max_buckets = max(max_points // 2, 1)
+        self.width = 1
+        self.count = 0
+        # One row per bucket: (n_buckets, n_series)
+        self._min_value = np.empty((0, n_series))
+        self._min_step = np.empty((0, n_series), dtype=np.int64)
+        self._max_value = np.empty((0, n_series))
+        self._max_step = np.empty((0, n_series), dtype=np.int64)
+
+    def update(self, chunk):
+        """Add a (n_series, n) chunk of consecutive steps."""
+        values = chunk.T
+        steps = np.arange(self.count, self.count + len(values))
+        self.count += len(values)
+        while len(values):
+            # Fill the open bucket up to its boundary, then whole buckets
+            room = self.width - steps[0] % self.width
+            if room < self.width:
+                self._extend(values[:room], steps[:room])
+                values, steps = values[room:], steps[room:]
+                continue
+            whole = len(values) // self.width * self.width
+            if whole:
+                shaped = values[:whole].reshape(-1, self.width, values.shape[1])
+                starts = steps[:whole:self.width]
+                self._append(shaped, starts)
+                values, steps = values[whole:], steps[whole:]
+            else:
+                self._append(values[None], steps[:1])
+                values, steps = values[:0], steps[:0]
+            self._shrink()
+
+    def _append(self, shaped, starts):
+        # shaped: (n_buckets, steps per bucket, n_series)
+        lo, hi = shaped.argmin(axis=1), shaped.argmax(axis=1)
+        self._min_value = np.concatenate([self._min_value, np.take_along_axis(shaped, lo[:, None], axis=1)[:, 0]])
+        self._max_value = np.concatenate([self._max_value, np.take_along_axis(shaped, hi[:, None], axis=1)[:, 0]])
+        self._min_step = np.concatenate([self._min_step, starts[:, None] + lo])
+        self._max_step = np.concatenate([self._max_step, starts[:, None] + hi])
+
+    def _extend(self, values, steps):
+        # Fold values into the last (open) bucket
+        lo, hi = values.argmin(axis=0), values.argmax(axis=0)
+        columns = np.arange(values.shape[1])
+        lower = values[lo, columns] < self._min_value[-1]
+        higher = values[hi, columns] > self._max_value[-1]
+        self._min_value[-1] = np.where(lower, values[lo, columns], self._min_value[-1])
+        self._min_step[-1] = np.where(lower, steps[lo], self._min_step[-1])
+        self._max_value[-1] = np.where(higher, values[hi, columns], self._max_value[-1])
+        self._max_step[-1] = np.where(higher, steps[hi], self._max_step[-1])
+
+    def _shrink(self):
+        while len(self._min_value) > self.max_buckets:
+            # Buckets start at multiples of the width, so pairs (2j, 2j + 1)
+            # form the buckets of the doubled width; an odd last one stays open
+            n = len(self._min_value)
+            pairs = n // 2 * 2
+
+            def merge(value, step, pick):
+                v, s = value[:pairs].reshape(-1, 2, value.shape[1]), step[:pairs].reshape(-1, 2, step.shape[1])
+                first = pick(v[:, 0], v[:, 1])
+                merged_v = np.where(first, v[:, 0], v[:, 1])
+                merged_s = np.where(first, s[:, 0], s[:, 1])
+                return np.concatenate([merged_v, value[pairs:]]), np.concatenate([merged_s, step[pairs:]])
+
+            self._min_value, self._min_step = merge(self._min_value, self._min_step, np.less_equal)
+            self._max_value, self._max_step = merge(self._max_value, self._max_step, np.greater_equal)
+            self.width *= 2
+
+    def series(self, i):
+        """Return (steps, values) of series ``i``, in step order, for plotting."""
+        steps = np.stack([self._min_step[:, i], self._max_step[:, i]], axis=1).ravel()
+        values = np.stack([self._min_value[:, i], self._max_value[:, i]], axis=1).ravel()
+        order = np.argsort(steps, kind="stable")
+        return steps[order], values[order]
@@ -0,0 +1,280 @@
+"""Wall-clock timing of the sections of a page run, and of its hot paths.
+
+``SectionTimer.section`` times a section of CODE.py for one session;
+``span`` times a hot path (model loading, inference, simulation, chart
+building) wherever it runs.  Every measurement is recorded twice: by the
+session timer whose section encloses it, and by the process-wide
+``process_timer`` shared by every session.  Spans are nested in their
+sections, so a section's time includes the spans it contains.
+
+The process-wide figures can be exported in the Prometheus text format
+(``start_prometheus_export`` rewrites a file for node_exporter's textfile
+collector) and every measurement logged as a JSON line
+(``enable_span_log``).  ``SamplingProfiler`` finds where time goes within
+a single run.
+"""
+
+import bisect
+import collections
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# The session timer whose section is executing in this thread (or in the
+# thread that started this one with a copy of its context)
+_current = contextvars.ContextVar("ecosim_section_timer", default=None)
+
+_span_log = logging.getLogger("ecosim.spans")
+
+
+class SectionTimer:
+    """Counts how often each named section executes and how long it takes.
+
+    CODE.py keeps one timer per session in ``st.session_state``, which shows
+    which sections a widget interaction actually re-executes.  Safe to
+    record into from several threads.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._sections = {}  # name -> {"runs", "last", "total", "max", "buckets"}
+
+    @contextmanager
+    def section(self, name):
+        """Time the body of the ``with`` block as one execution of ``name``.
+
+        Spans inside the block are recorded by this timer as well.
+        """
+        token = _current.set(self)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            _record(name, elapsed, self)
+
+    def record(self, name, seconds):
+        """Add one execution of ``name`` that took ``seconds``."""
+        with self._lock:
+            record = self._sections.get(name)
+            if record is None:
+                record = self._sections[name] = {"runs": 0, "last": 0.0, "total": 0.0, "max": 0.0,
+                                                 "buckets": [0] * (len(BUCKETS) + 1)}
+            record["runs"] += 1
+            record["last"] = seconds
+            record["total"] += seconds
+            record["max"] = max(record["max"], seconds)
+            record["buckets"][bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def report(self):
+        """Return one row per section, in first-executed order, with times in milliseconds."""
+        with self._lock:
+            sections = [(name, dict(record)) for name, record in self._sections.items()]
+        return [
+            {
+                "section": name,
+                "runs": record["runs"],
+                "last_ms": record["last"] * 1000,
+                "mean_ms": record["total"] / record["runs"] * 1000,
+                "max_ms": record["max"] * 1000,
+                "total_ms": record["total"] * 1000,
+            }
+            for name, record in sections
+        ]
+
+    def histograms(self):
+        """Return ``{name: (bucket counts, runs, total seconds)}``; the last bucket is above ``BUCKETS[-1]``."""
+        with self._lock:
+            return {name: (list(r["buckets"]), r["runs"], r["total"]) for name, r in self._sections.items()}
+
+    def reset(self):
+        with self._lock:
+            self._sections.clear()
+
+
+# Shared by every session served by this process
+process_timer = SectionTimer()
+
+
+def _record(name, seconds, timer):
+    if timer is not None and timer is not process_timer:
+        timer.record(name, seconds)
+    process_timer.record(name, seconds)
+    if _span_log.isEnabledFor(logging.INFO):
+        _span_log.info(json.dumps({
+            "time": time.time(), "span": name, "seconds": seconds,
+            "session": None if timer is None else timer.id, "thread": threading.current_thread().name,
+        }))
+
+
+@contextmanager
+def span(name):
+    """Time the body of the ``with`` block as one execution of hot path ``name``."""
+    timer = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start, timer)
+
+
+def prometheus_text(timer=None, metric="ecosim_span_seconds"):
+    """The histograms of ``timer`` (default: ``process_timer``) in the Prometheus text format."""
+    timer = timer or process_timer
+    lines = [f"# HELP {metric} Time spent in sections and hot paths of the Ecosystem Analyzer.",
+             f"# TYPE {metric} histogram"]
+    for name, (buckets, runs, total) in timer.histograms().items():
+        label = name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        cumulative = 0
+        for bound, count in zip(BUCKETS, buckets):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{span="{label}",le="{bound:g}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{span="{label}",le="+Inf"}} {runs}')
+        lines.append(f'{metric}_sum{{span="{label}"}} {total:.6f}')
+        lines.append(f'{metric}_count{{span="{label}"}} {runs}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, timer=None):
+    """Write ``prometheus_text`` to ``path``, atomically so scrapers never read a partial file."""
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        f.write(prometheus_text(timer))
+    os.replace(temporary, path)
+
+
+_exporters = {}
+_exporters_lock = threading.Lock()
+
+
+def start_prometheus_export(path, interval=15.0):
+    """Rewrite ``path`` from ``process_timer`` every ``interval`` seconds in a daemon thread.
+
+    Calling it again with the same path does nothing.
+    """
+    with _exporters_lock:
+        if path in _exporters:
+            return
+
+        def export():
+            while True:
+                try:
+                    write_prometheus(path)
+                except OSError as e:
+                    _span_log.warning("Could not write metrics to %s: %s", path, e)
+                time.sleep(interval)
+
+        thread = _exporters[path] = threading.Thread(target=export, name=f"metrics export {path}", daemon=True)
+        thread.start()
+
+
+def enable_span_log(path):
+    """Append every section and span measurement to ``path`` as one JSON object per line.
+
+    Calling it again with the same path does nothing.
+    """
+    path = os.path.abspath(path)
+    with _exporters_lock:
+        if any(getattr(handler, "baseFilename", None) == path for handler in _span_log.handlers):
+            return
+        handler = logging.FileHandler(path)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _span_log.addHandler(handler)
+        _span_log.setLevel(logging.INFO)
+        _span_log.propagate = False
+
+
+class SamplingProfiler:
+    """Samples the call stack of one thread at a fixed interval.
+
+    Unlike a tracing profiler it does not slow down every call of the
+    profiled code; it only adds a thread that wakes every ``interval``
+    seconds and takes tens of microseconds per sample, so it can be switched
+    on for a single page run in production.  Sampling stops after
+    ``max_seconds`` even if ``stop`` is never called.
+    """
+
+    def __init__(self, thread_id=None, interval=0.001, max_seconds=120.0):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples = 0
+        self.seconds = 0.0
+        self._stacks = collections.Counter()  # tuple of frames, outermost first -> samples
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, name="sampling profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def _sample(self):
+        deadline = self._started + self.max_seconds
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            self._stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+        self.seconds = time.perf_counter() - self._started
+
+    def top(self, limit=25):
+        """The ``limit`` functions with most samples, including their callees, with their own share too.
+
+        Frames every sample shares at its root (thread start-up, the script
+        runner) are left out.
+        """
+        stacks = self._stacks
+        first = next(iter(stacks), ())
+        common = min((len(stack) for stack in stacks), default=0)
+        for stack in stacks:
+            common = next((i for i in range(common) if stack[i] != first[i]), common)
+        total, own = collections.Counter(), collections.Counter()
+        for stack, count in stacks.items():
+            own[stack[-1]] += count
+            # Keep the innermost shared frame, where the profiled code starts
+            for frame in set(stack[max(common - 1, 0):]):
+                total[frame] += count
+        samples = max(self.samples, 1)
+        return [
+            {
+                "function": name,
+                "location": f"{os.path.basename(filename)}:{line}",
+                "total_pct": total[frame] / samples * 100,
+                "own_pct": own[frame] / samples * 100,
+                "samples": total[frame],
+            }
+            for frame, _ in total.most_common(limit)
+            for name, filename, line in [frame]
+        ]
+
+    def collapsed(self):
+        """Stacks in the collapsed format of flame graph tools: ``outer;inner samples`` per line."""
+        return "\n".join(
+            ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack) + f" {count}"
+            for stack, count in self._stacks.most_common()
+        ) + "\n"
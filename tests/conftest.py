@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def tiny_model_path(tmp_path_factory):
+    """Directory of a tiny randomly initialized GPT-2 model, standing in for DialoGPT."""
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from benchmarks.tiny_model import build_tiny_model
+
+    return str(build_tiny_model(tmp_path_factory.mktemp("tiny_model")))
+
+
+@pytest.fixture(scope="session")
+def chatbot(tiny_model_path):
+    from ecosim.inference import PROFILES
+    from ecosim.models import load_text_generation
+
+    return load_text_generation(tiny_model_path, PROFILES["fp32"])
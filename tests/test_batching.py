@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from ecosim.batching import BatchingWorker, percentile, pipeline_batch_generator
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([], 50) is None
+    assert percentile([3, 1, 2, 4], 50) == 2
+    assert percentile([3, 1, 2, 4], 100) == 4
+    assert percentile([5], 1) == 5
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    def generate_batch(prompts, **kwargs):
+        batches.append(list(prompts))
+        return [prompt.upper() for prompt in prompts]
+
+    worker = BatchingWorker(generate_batch, max_batch_size=4, max_wait=0.2)
+    futures = [worker.submit(f"q{i}") for i in range(4)]
+    assert [f.result(timeout=5) for f in futures] == ["Q0", "Q1", "Q2", "Q3"]
+    assert batches == [["q0", "q1", "q2", "q3"]]
+    assert worker.stats()["mean_batch_size"] == 4
+
+
+def test_requests_with_other_settings_run_in_their_own_batch():
+    batches = []
+
+    def generate_batch(prompts, **kwargs):
+        batches.append((list(prompts), kwargs))
+        return prompts
+
+    worker = BatchingWorker(generate_batch, max_batch_size=8, max_wait=0.2)
+    futures = [worker.submit("a", max_length=10), worker.submit("b", max_length=20), worker.submit("c", max_length=10)]
+    assert [f.result(timeout=5) for f in futures] == ["a", "b", "c"]
+    assert (["a", "c"], {"max_length": 10}) in batches and (["b"], {"max_length": 20}) in batches
+
+
+def test_errors_reach_every_request_of_the_batch():
+    def generate_batch(prompts, **kwargs):
+        raise RuntimeError("model failed")
+
+    worker = BatchingWorker(generate_batch, max_batch_size=2, max_wait=0.2)
+    futures = [worker.submit("a"), worker.submit("b")]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model failed"):
+            future.result(timeout=5)
+
+
+def test_cancelled_requests_are_skipped():
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def generate_batch(prompts, **kwargs):
+        seen.extend(prompts)
+        started.set()
+        release.wait(5)
+        return prompts
+
+    worker = BatchingWorker(generate_batch, max_batch_size=1, max_wait=0)
+    first = worker.submit("first")
+    assert started.wait(5)
+    second = worker.submit("second")
+    assert second.cancel()
+    release.set()
+    assert first.result(timeout=5) == "first"
+    time.sleep(0.1)
+    assert seen == ["first"]
+
+
+def test_pipeline_batches_with_the_padding_set_at_load(chatbot, tiny_model_path, monkeypatch):
+    from ecosim import batching
+
+    monkeypatch.setattr(batching.registry, "get", lambda name: chatbot)
+    # Set once by load_text_generation, never by the worker thread
+    assert chatbot.tokenizer.padding_side == "left" and chatbot.tokenizer.pad_token is not None
+    answers = pipeline_batch_generator(tiny_model_path)(["How do predators help?", "Why?"], max_new_tokens=4,
+                                                         do_sample=False, pad_token_id=chatbot.tokenizer.eos_token_id)
+    assert len(answers) == 2 and all(isinstance(answer, str) for answer in answers)
@@ -0,0 +1,57 @@
+import pytest
+
+from ecosim.cache import ResponseCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable replacement for time.time, starting at 1000."""
+    now = [1000.0]
+    monkeypatch.setattr("ecosim.cache.time.time", lambda: now[0])
+    return now
+
+
+def test_trivially_different_questions_share_a_key():
+    assert cache_key("  How do Bees help?? ", tokens=64) == cache_key("how do bees help", tokens=64)
+    assert cache_key("how do bees help", tokens=64) != cache_key("how do bees help", tokens=128)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_entries_expire_after_ttl(clock, tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.db"), ttl=60)
+    cache.put("q", "answer")
+    clock[0] += 59
+    assert cache.get("q") == "answer"
+    clock[0] += 2
+    assert cache.get("q") is None
+    cache.put("other", "x")
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_disk_tier_survives_a_restart_and_stays_under_budget(clock, tmp_path):
+    path = str(tmp_path / "cache.db")
+    # One entry in memory, so the lookup of "a" refreshes it on disk
+    cache = ResponseCache(max_entries=1, path=path, max_disk_bytes=25)
+    for i, query in enumerate("abc"):
+        clock[0] += 1
+        cache.put(query, "x" * 10)
+        if i == 1:
+            clock[0] += 1
+            cache.get("a")
+    stats = cache.stats()
+    assert stats["disk_entries"] == 2 and stats["disk_bytes"] <= 25
+
+    restarted = ResponseCache(path=path)
+    assert restarted.get("b") is None
+    assert restarted.get("a") == "x" * 10
+    assert restarted.stats()["disk_hits"] == 1
@@ -0,0 +1,46 @@
+import csv
+import json
+
+import pytest
+
+from ecosim.cli import main
+from ecosim.core import run_simulation
+
+
+def test_run_writes_one_row_per_step(tmp_path):
+    output = tmp_path / "run.csv"
+    main(["run", "--steps", "5", "--set", "plant_growth_rate=0.3", "-o", str(output)])
+    with open(output, newline="") as f:
+        rows = list(csv.DictReader(f))
+    plants, _, _ = run_simulation({"plant_growth_rate": 0.3}, 5)
+    assert [int(row["step"]) for row in rows] == [1, 2, 3, 4, 5]
+    assert [float(row["plants"]) for row in rows] == pytest.approx(plants)
+
+
+def test_ensemble_json_has_every_percentile(tmp_path):
+    output = tmp_path / "bands.json"
+    main(["ensemble", "--steps", "4", "--replicates", "20", "--seed", "1", "--percentiles", "5,95", "-o", str(output)])
+    document = json.loads(output.read_text())
+    assert document["seed"] == 1
+    assert len(document["plants_p5"]) == len(document["plants_p95"]) == 4
+
+
+@pytest.mark.parametrize("argv", [
+    ["run", "--steps", "0"],
+    ["run", "--steps", "-3"],
+    ["run", "--steps", "1.5"],
+    ["ensemble", "--replicates", "0"],
+])
+def test_rejects_counts_below_one(argv, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(argv)
+    assert exit_info.value.code == 2
+    assert "error: argument" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("percentiles", ["5,abc", "150", "5,,95", "-1", "nan"])
+def test_rejects_malformed_or_out_of_range_percentiles(percentiles, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["ensemble", "--steps", "2", "--replicates", "5", "--percentiles", percentiles])
+    assert exit_info.value.code == 2
+    assert "error: argument --percentiles" in capsys.readouterr().err
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from ecosim.continuous import ODE_METHODS, ecosystem_rhs, solve_continuous
+from ecosim.ensemble import DEFAULT_PARAMS
+
+T_END = 20.0
+TIMES = np.linspace(0, T_END, 11)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    """Classic Runge-Kutta with a fixed step of 0.001, at ``TIMES``."""
+    f, _ = ecosystem_rhs(DEFAULT_PARAMS)
+    x = np.array([DEFAULT_PARAMS[f"initial_{name}"] for name in ("plants", "herbivores", "predators")], dtype=float)
+    h, per_output = 1e-3, round((TIMES[1] - TIMES[0]) / 1e-3)
+    out = [x.copy()]
+    for _ in range(len(TIMES) - 1):
+        for _ in range(per_output):
+            k1 = f(0, x)
+            k2 = f(0, x + h / 2 * k1)
+            k3 = f(0, x + h / 2 * k2)
+            k4 = f(0, x + h * k3)
+            x = x + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+        out.append(x.copy())
+    return np.array(out).T
+
+
+@pytest.mark.parametrize("method", ODE_METHODS)
+def test_every_method_converges_to_the_reference(method, reference):
+    result = solve_continuous(DEFAULT_PARAMS, T_END, method=method, rtol=1e-9, atol=1e-9, t_eval=TIMES)
+    np.testing.assert_array_equal(result.t, TIMES)
+    np.testing.assert_allclose(np.array([result.plants, result.herbivores, result.predators]), reference, rtol=1e-5)
+
+
+@pytest.mark.parametrize("method", ODE_METHODS)
+def test_cost_is_reported(method):
+    loose = solve_continuous(DEFAULT_PARAMS, T_END, method=method, rtol=1e-3, atol=1e-3)
+    tight = solve_continuous(DEFAULT_PARAMS, T_END, method=method, rtol=1e-10, atol=1e-10)
+    assert loose.method == method
+    assert 0 < loose.n_steps < tight.n_steps
+    assert loose.n_steps <= loose.nfev < tight.nfev
+    # Without t_eval the solution is given at the solver's own steps
+    assert len(loose.t) == loose.n_steps + 1
+    if method in ("Radau", "BDF"):
+        assert loose.njev > 0 and loose.nlu > 0
+
+
+def test_plants_alone_grow_exponentially():
+    params = {**DEFAULT_PARAMS, "initial_herbivores": 0, "initial_predators": 0}
+    rate = params["plant_growth_rate"] * (1 + params["water_availability"] - 0.1 * params["human_impact"])
+    result = solve_continuous(params, T_END, method="DOP853", rtol=1e-10, atol=1e-10)
+    np.testing.assert_allclose(result.at(TIMES)[0], params["initial_plants"] * np.exp(rate * TIMES), rtol=1e-8)
+    assert not result.at(TIMES)[1:].any()
+
+
+def test_at_interpolates_between_output_times(reference):
+    result = solve_continuous(DEFAULT_PARAMS, T_END, method="LSODA", rtol=1e-9, atol=1e-9, t_eval=TIMES)
+    # At the output times, the same values; in between, a tighter solution's
+    np.testing.assert_allclose(result.at(TIMES), [result.plants, result.herbivores, result.predators], rtol=1e-12)
+    initial = [DEFAULT_PARAMS["initial_plants"], DEFAULT_PARAMS["initial_herbivores"], DEFAULT_PARAMS["initial_predators"]]
+    np.testing.assert_allclose(result.at([0.0])[:, 0], initial, rtol=1e-12)
+    midpoints = solve_continuous(DEFAULT_PARAMS, T_END, method="DOP853", rtol=1e-12, atol=1e-12).at(TIMES[:-1] + 1)
+    np.testing.assert_allclose(result.at(TIMES[:-1] + 1), midpoints, rtol=1e-6)
+
+
+def test_populations_never_go_negative():
+    # Predators eat the herbivores out and the plants run out
+    params = {**DEFAULT_PARAMS, "initial_plants": 1, "initial_herbivores": 500, "initial_predators": 20000,
+              "plant_growth_rate": 0.01, "herbivore_birth_rate": 0.01}
+    result = solve_continuous(params, 200, method="LSODA")
+    assert (result.at(np.linspace(0, 200, 401)) >= 0).all()
+    assert result.herbivores[-1] == pytest.approx(0, abs=1e-3)
+
+
+def test_rejects_unknown_methods():
+    with pytest.raises(ValueError):
+        solve_continuous(method="Euler")
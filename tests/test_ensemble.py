@@ -0,0 +1,45 @@
+import warnings
+
+import numpy as np
+
+from ecosim.core import SHOCK_PARAMS, run_simulation
+from ecosim.ensemble import DEFAULT_PARAMS, replicate_keys, run_ensemble
+
+NO_SHOCKS = {name: 0 for name in SHOCK_PARAMS}
+
+
+def test_matches_run_simulation_without_shocks():
+    params = {**DEFAULT_PARAMS, **NO_SHOCKS}
+    result = run_ensemble(params, 60, n_replicates=3, seed=0)
+    expected = run_simulation(params, 60)
+    for name, series in zip(("plants", "herbivores", "predators"), expected):
+        np.testing.assert_allclose(getattr(result, name), np.tile(series, (3, 1)), rtol=1e-12)
+
+
+def test_same_seed_same_trajectories():
+    first, second = (run_ensemble(DEFAULT_PARAMS, 30, n_replicates=50, seed=7) for _ in range(2))
+    assert np.array_equal(first.plants, second.plants)
+    assert not np.array_equal(first.plants, run_ensemble(DEFAULT_PARAMS, 30, n_replicates=50, seed=8).plants)
+
+
+def test_per_replicate_parameters():
+    rates = np.array([0.05, 0.1, 0.2])
+    result = run_ensemble({**NO_SHOCKS, "plant_growth_rate": rates}, 10, seed=0)
+    assert result.plants.shape == (3, 10)
+    for i, rate in enumerate(rates):
+        np.testing.assert_allclose(result.plants[i], run_simulation({**NO_SHOCKS, "plant_growth_rate": rate}, 10)[0])
+
+
+def test_zero_steps_is_empty_and_quiet():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = run_ensemble(DEFAULT_PARAMS, 0, n_replicates=4, seed=1)
+    assert result.plants.shape == (4, 0)
+
+
+def test_reports_the_seed_only_when_it_drove_the_run():
+    seeded = run_ensemble(DEFAULT_PARAMS, 10, n_replicates=4, seed=3)
+    assert seeded.seed == 3
+    fresh = run_ensemble(DEFAULT_PARAMS, 10, n_replicates=4)
+    np.testing.assert_array_equal(run_ensemble(DEFAULT_PARAMS, 10, n_replicates=4, seed=fresh.seed).plants, fresh.plants)
+    assert run_ensemble(DEFAULT_PARAMS, 10, keys=replicate_keys(3, 4)).seed is None
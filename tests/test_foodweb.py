@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from ecosim.core import run_simulation
+from ecosim.ensemble import DEFAULT_PARAMS
+from ecosim.foodweb import random_food_web, simulate_web, three_species_env, three_species_web
+
+
+@pytest.mark.parametrize("params", [
+    DEFAULT_PARAMS,
+    {**DEFAULT_PARAMS, "plant_growth_rate": 0.01, "herbivore_birth_rate": 0.3, "predator_birth_rate": 0.2,
+     "water_availability": 0.2, "human_impact": 1.0, "temperature_variation": 10},
+])
+def test_three_species_web_matches_run_simulation(params):
+    web = three_species_web(params["plant_growth_rate"], params["herbivore_birth_rate"], params["predator_birth_rate"])
+    env = three_species_env(params["water_availability"], params["human_impact"], params["soil_quality"],
+                            params["temperature_variation"])
+    initial = [params["initial_plants"], params["initial_herbivores"], params["initial_predators"]]
+    trajectory = simulate_web(web, initial, 100, env)
+    np.testing.assert_allclose(trajectory.T, np.array(run_simulation(params, 100)), rtol=1e-10)
+
+
+def test_batched_initial_conditions_step_independently():
+    web = three_species_web(0.1, 0.05, 0.02)
+    initial = np.array([[100.0, 20.0, 5.0], [50.0, 10.0, 1.0]])
+    batched = simulate_web(web, initial, 30)
+    for i, row in enumerate(initial):
+        np.testing.assert_array_equal(batched[:, i], simulate_web(web, row, 30))
+
+
+def test_sparse_and_dense_random_webs_agree():
+    dense = random_food_web(60, seed=3, sparse=False)
+    sparse = random_food_web(60, seed=3, sparse=True)
+    initial = np.full(60, 10.0)
+    np.testing.assert_allclose(simulate_web(sparse, initial, 50), simulate_web(dense, initial, 50), rtol=1e-10)
+
+
+def test_rejects_populations_of_the_wrong_size():
+    with pytest.raises(ValueError):
+        simulate_web(three_species_web(0.1, 0.05, 0.02), [1.0, 2.0], 5)
@@ -0,0 +1,52 @@
+from ecosim.generation import Conversation, stream_reply
+
+
+def test_stream_collects_the_reply_text(chatbot):
+    finished = []
+    with stream_reply(chatbot, "How do predators help?", max_new_tokens=8, min_new_tokens=8, do_sample=False,
+                      on_finish=finished.append) as reply:
+        chunks = list(reply)
+    assert reply.wait(timeout=30)
+    assert "".join(chunks) == reply.text
+    assert finished == [reply] and reply.output is not None
+
+
+def test_cancel_stops_generation(chatbot):
+    reply = stream_reply(chatbot, "How do predators help?", max_new_tokens=500, min_new_tokens=500, do_sample=False)
+    reply.cancel()
+    assert reply.wait(timeout=30)
+    assert reply.output.shape[1] < 500
+
+
+def test_turn_is_recorded_when_its_reply_finishes(chatbot):
+    conversation = Conversation(chatbot)
+    with conversation.reply("What do herbivores eat?", max_new_tokens=8, min_new_tokens=8, do_sample=False) as reply:
+        for _ in reply:
+            pass
+    assert reply.wait(timeout=30)
+    # Without waiting for a next turn
+    assert conversation.turns == [("What do herbivores eat?", reply.text)]
+
+
+def test_follow_up_reuses_the_cache(chatbot):
+    conversation = Conversation(chatbot)
+    first = conversation.reply("What do herbivores eat?", max_new_tokens=8, min_new_tokens=8, do_sample=False)
+    assert first.wait(timeout=30)
+    encoded = conversation.encoded_tokens
+    second = conversation.reply("And predators?", max_new_tokens=8, min_new_tokens=8, do_sample=False)
+    assert second.wait(timeout=30)
+    assert conversation.reused_tokens > 0
+    assert conversation.encoded_tokens - encoded < conversation.reused_tokens
+    assert [answer is not None for _, answer in conversation.turns] == [True, True]
+
+
+def test_reset_forgets_the_turns(chatbot):
+    conversation = Conversation(chatbot)
+    reply = conversation.reply("What do herbivores eat?", max_new_tokens=200, min_new_tokens=200, do_sample=False)
+    conversation.reset()
+    assert reply.wait(timeout=30) and reply.cancelled
+    assert conversation.turns == []
+    assert conversation.reply("And predators?", max_new_tokens=8, do_sample=False).wait(timeout=30)
+    # Started over, without the cache of the forgotten turn
+    assert [message for message, _ in conversation.turns] == ["And predators?"]
+    assert conversation.reused_tokens == 0
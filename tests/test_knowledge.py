@@ -0,0 +1,100 @@
+import math
+
+import pytest
+
+from ecosim.knowledge import CONSERVATION_GUIDES, Document, KnowledgeIndex, get_index, match_species, tokenize
+
+
+def document(title, text):
+    return Document("guide", title, text, text)
+
+
+@pytest.fixture
+def index():
+    return KnowledgeIndex([
+        document("A", "owl owl owl forest"),
+        document("B", "owl forest river"),
+        document("C", "river river fish"),
+    ])
+
+
+def test_tokenize_folds_case_plurals_and_stopwords():
+    assert tokenize("How can I protect the Butterflies and TIGERS?") == ["protect", "butterfly", "tiger"]
+
+
+def test_scores_follow_bm25(index):
+    hits = index.search("owl")
+    assert [hit.document.title for hit in hits] == ["A", "B"]
+    # Document A: owl three times, four words; the average document has 10/3
+    idf = math.log(1 + (3 - 2 + 0.5) / (2 + 0.5))
+    tf, length, average = 3, 4, 10 / 3
+    expected = idf * tf * 2.2 / (tf + 1.2 * (1 - 0.75 + 0.75 * length / average))
+    assert hits[0].score == pytest.approx(expected)
+
+
+def test_rare_words_outweigh_common_ones(index):
+    # "river" is in two documents, "fish" only in C
+    assert index.search("river fish")[0].document.title == "C"
+    assert index.search("fish", k=5)[0].coverage == 1.0
+
+
+def test_misspelled_words_match_their_closest_term(index):
+    assert {hit.document.title for hit in index.search("forrest")} == {"A", "B"}
+
+
+def test_unknown_words_lower_coverage(index):
+    hit = index.search("owl zebra")[0]
+    assert hit.document.title == "A"
+    # An unseen word counts as the rarest, so it outweighs the word that matched
+    assert 0 < hit.coverage < 0.5
+    assert index.answer("owl zebra") is None
+    assert index.answer("owl zebra", min_coverage=hit.coverage, margin=1.0).document.title == "A"
+
+
+def test_answer_needs_a_clear_winner(index):
+    first, second = index.search("forest")
+    assert first.score < 1.5 * second.score
+    assert index.answer("forest") is None
+    assert index.answer("forest", margin=1.0).document.title == first.document.title
+    assert index.answer("fish").document.title == "C"
+
+
+def test_guide_questions_are_answered_without_the_model():
+    hit = get_index().answer("How can I help elephants?")
+    assert hit.document.kind == "guide" and hit.document.title == "Elephant"
+
+
+@pytest.mark.parametrize("question", ["How do predators maintain ecological balance?",
+                                      "How can I help tigers and pandas?"])
+def test_vague_questions_fall_through_with_context(question):
+    index = get_index()
+    assert index.answer(question) is None
+    prompt = index.prompt(question, " || ")
+    assert prompt.endswith(f" || {question} || ") and len(prompt) > len(question) + 8
+
+
+def test_unrelated_questions_fall_through_alone():
+    index = get_index()
+    assert index.answer("What is the capital of France?") is None
+    assert index.prompt("What is the capital of France?", " || ") == "What is the capital of France?"
+
+
+@pytest.mark.parametrize("name, species", [
+    ("tigers", "Tiger"),
+    ("Elefant", "Elephant"),
+    ("sea turtle", "Sea Turtles"),
+    ("leopard", "Snow Leopard"),
+    ("monarch butterflies", "Monarch Butterfly"),
+    ("  Blue WHALES ", "Blue Whale"),
+    ("Tiger Shark", None),
+    ("Blue jay", None),
+    ("Coral snake", None),
+    ("the", None),
+    ("", None),
+])
+def test_match_species(name, species):
+    assert match_species(name) == species
+
+
+def test_every_guide_matches_its_own_name():
+    assert all(match_species(name) == name for name in CONSERVATION_GUIDES)
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from ecosim.models import ModelRegistry, load_text_generation
+
+
+class CountingLoader:
+    """Loads the tiny model, counting the loads; the first ``failures`` fail."""
+
+    def __init__(self, failures=0, delay=0.2):
+        self.calls = 0
+        self.failures = failures
+        self.delay = delay
+        self.threads = set()
+
+    def __call__(self, name):
+        from ecosim.inference import PROFILES
+
+        self.calls += 1
+        self.threads.add(threading.current_thread().name)
+        # Keeps the load in progress while other callers arrive
+        time.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise OSError(f"could not load {name}")
+        return load_text_generation(name, PROFILES["fp32"])
+
+
+def get_concurrently(registry, name, n=8):
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def get(i):
+        barrier.wait()
+        try:
+            results[i] = registry.get(name)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=get, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_callers_share_one_load(tiny_model_path):
+    loader = CountingLoader()
+    registry = ModelRegistry(loader)
+    results = get_concurrently(registry, tiny_model_path)
+    assert loader.calls == 1
+    assert all(model is results[0] for model in results)
+    assert registry.get(tiny_model_path) is results[0] and loader.calls == 1
+    assert registry.is_loaded(tiny_model_path)
+
+
+def test_a_failed_load_is_reported_to_every_caller_and_retried(tiny_model_path):
+    loader = CountingLoader(failures=1)
+    registry = ModelRegistry(loader)
+    results = get_concurrently(registry, tiny_model_path)
+    assert loader.calls == 1
+    assert all(isinstance(result, OSError) for result in results)
+    stats = registry.stats()[tiny_model_path]
+    assert stats["status"] == "failed" and "could not load" in stats["error"]
+    assert not registry.is_loaded(tiny_model_path)
+
+    model = registry.get(tiny_model_path)
+    assert loader.calls == 2 and model is not None
+    assert registry.stats()[tiny_model_path]["status"] == "ready"
+
+
+def test_warm_up_loads_in_the_background(tiny_model_path):
+    loader = CountingLoader()
+    registry = ModelRegistry(loader)
+    registry.warm_up(tiny_model_path)
+    assert registry.stats()[tiny_model_path]["status"] == "loading"
+    assert not registry.is_loaded(tiny_model_path)
+    registry.warm_up(tiny_model_path)
+    model = registry.get(tiny_model_path)
+    registry.warm_up(tiny_model_path)
+    assert loader.calls == 1 and loader.threads == {f"warm-up {tiny_model_path}"}
+    assert registry.get(tiny_model_path) is model
+
+
+def test_stats_report_load_time_and_memory(tiny_model_path):
+    registry = ModelRegistry(CountingLoader(delay=0))
+    assert registry.stats() == {}
+    start = time.perf_counter()
+    registry.get(tiny_model_path)
+    elapsed = time.perf_counter() - start
+    stats = registry.stats()[tiny_model_path]
+    assert stats["status"] == "ready" and stats["error"] is None
+    assert 0 < stats["load_seconds"] <= elapsed
+    assert isinstance(stats["rss_delta_bytes"], int)
+
+
+def test_models_are_kept_apart_by_name(tiny_model_path):
+    loader = CountingLoader(delay=0)
+
+    def load(name):
+        if name != tiny_model_path:
+            raise OSError(f"{name} is not a model")
+        return loader(name)
+
+    registry = ModelRegistry(load)
+    with pytest.raises(OSError):
+        registry.get("missing")
+    assert registry.get(tiny_model_path) is not None
+    assert {name: stats["status"] for name, stats in registry.stats().items()} == {"missing": "failed", tiny_model_path: "ready"}
@@ -0,0 +1,181 @@
+"""Smoke tests of CODE.py, driven through Streamlit's AppTest."""
+
+import os
+import warnings
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(app):
+    with warnings.catch_warnings():
+        # Matplotlib warns about emoji its fonts lack on every chart
+        warnings.simplefilter("ignore", UserWarning)
+        app.run()
+    assert not app.exception, app.exception[0].message
+    return app
+
+
+def click(app, label):
+    next(b for b in app.button if b.label == label).click()
+    return run(app)
+
+
+def sidebar(app, widget, label, value):
+    next(w for w in getattr(app.sidebar, widget) if w.label == label).set_value(value)
+    return run(app)
+
+
+def rerun_fragment(app, name):
+    """Rerun only the fragment function ``name``, as the browser does after an interaction inside it.
+
+    AppTest reruns the whole script after every widget change, so the
+    fragment is queued on its script runner directly.
+    """
+    import functools
+    from unittest import mock
+
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+    from streamlit.testing.v1 import local_script_runner
+
+    fragment_id = next(key for key, fragment in app._fragment_storage._fragments.items()
+                       if any(getattr(cell.cell_contents, "__name__", None) == name for cell in fragment.__closure__ or ()))
+    scoped = functools.partial(RerunData, fragment_id=fragment_id, fragment_id_queue=[fragment_id], is_fragment_scoped_rerun=True)
+    with mock.patch.object(local_script_runner, "RerunData", scoped):
+        return run(app)
+
+
+@pytest.fixture
+def page(tmp_path, monkeypatch):
+    """CODE.py after its first run, saving runs to a store of its own."""
+    from streamlit.testing.v1 import AppTest
+
+    monkeypatch.setenv("ECOSIM_RUN_STORE", str(tmp_path / "runs"))
+    return run(AppTest.from_file(os.path.join(ROOT, "CODE.py"), default_timeout=300))
+
+
+@pytest.mark.parametrize("mode", [
+    "📈 Single Run",
+    "🎲 Monte Carlo Ensemble",
+    "🕸 Large Food Web",
+    "🗺 Spatial Grid",
+    "〰️ Continuous Time (Adaptive ODE)",
+    "♾️ Long Horizon (Streaming)",
+])
+def test_every_mode_runs_and_is_saved(page, tmp_path, mode):
+    from ecosim.runstore import get_run_store
+
+    sidebar(page, "radio", "Choose how to simulate:", mode)
+    click(page, "Run Simulation")
+    assert page.get("plotly_chart")
+    runs = get_run_store(str(tmp_path / "runs"))
+    if mode.startswith("♾️"):
+        # Long-horizon runs keep summaries only, no trends to save
+        assert not len(runs)
+    else:
+        assert len(runs) == 1 and runs.rows()[0]["mode"] == mode
+
+
+def test_long_horizon_reaches_the_default_horizon(page):
+    sidebar(page, "radio", "Choose how to simulate:", "♾️ Long Horizon (Streaming)")
+    click(page, "Run Simulation")
+    assert not page.warning
+    assert "1,000,000 Steps" in page.get("plotly_chart")[0].proto.spec
+
+
+def test_spatial_run_that_overflows_stops_with_a_warning(page):
+    sidebar(page, "radio", "Choose how to simulate:", "🗺 Spatial Grid")
+    sidebar(page, "slider", "🗺 Grid Size (cells per side)", 50)
+    sidebar(page, "slider", "🌱 Plant Growth Rate", 0.5)
+    sidebar(page, "slider", "💧 Water Availability", 1.0)
+    sidebar(page, "slider", "⏱ Simulation Duration (Steps)", 200)
+    click(page, "Run Simulation")
+    assert any("outgrew" in warning.value for warning in page.warning)
+
+
+def test_sensitivity_runs_as_many_evaluations_as_offered(page):
+    from ecosim.sensitivity import PARAMETER_RANGES
+
+    next(r for r in page.radio if r.label == "Method").set_value("Sobol indices")
+    run(page)
+    smallest = 2**9 * (len(PARAMETER_RANGES) + 2)
+    next(s for s in page.select_slider if s.label == "Model evaluations").set_value(smallest)
+    click(run(page), "Run Sensitivity Analysis")
+    assert any(f"analysis of {smallest:,} runs" in caption.value for caption in page.caption)
+
+
+def test_saved_runs_are_read_only_once_opened(page):
+    click(page, "Run Simulation")
+    assert not page.multiselect
+    next(t for t in page.toggle if t.label == "Browse saved runs").set_value(True)
+    run(page)
+    table = next(d.value for d in page.dataframe if "run_id" in d.value)
+    assert table["run_id"].tolist() == [0]
+    click(page, "Replay Run")
+    assert page.session_state["current_run"]["run_id"] == 0
+
+
+@pytest.mark.parametrize("name, warned", [("Tiger Shark", True), ("tigers", False)])
+def test_conservation_guide_only_shows_guides_that_match(page, name, warned):
+    next(t for t in page.sidebar.text_input if t.label == "Or enter a species name:").input(name)
+    run(page)
+    assert any("No guide matches" in warning.value for warning in page.sidebar.warning) == warned
+    assert any("Conservation Guide for **Tiger**" in m.value for m in page.sidebar.markdown) != warned
+
+
+def section_runs(app):
+    return {row["section"]: row["runs"] for row in app.session_state["section_timer"].report()}
+
+
+def test_identical_runs_come_from_the_cache(page):
+    import streamlit as st
+
+    # simulate() is cached across sessions; its span only records cache misses
+    st.cache_data.clear()
+    click(page, "Run Simulation")
+    first = page.session_state["current_run"]["plant_pop"]
+    click(page, "Run Simulation")
+    assert section_runs(page)["simulate"] == 1
+    sidebar(page, "slider", "🌱 Plant Growth Rate", 0.3)
+    click(page, "Run Simulation")
+    assert section_runs(page)["simulate"] == 2
+    sidebar(page, "radio", "Choose how to simulate:", "🎲 Monte Carlo Ensemble")
+    click(page, "Run Simulation")
+    assert section_runs(page)["simulate"] == 3
+    sidebar(page, "radio", "Choose how to simulate:", "📈 Single Run")
+    sidebar(page, "slider", "🌱 Plant Growth Rate", 0.2)
+    click(page, "Run Simulation")
+    assert section_runs(page)["simulate"] == 3
+    assert page.session_state["current_run"]["plant_pop"] == first
+
+
+def test_fragment_interactions_leave_the_simulation_alone(page):
+    click(page, "Run Simulation")
+    results = page.session_state["current_run"]
+    simulated = section_runs(page).get("simulate", 0)
+
+    def only_reruns(section, interact, fragment):
+        before = section_runs(page)
+        interact()
+        rerun_fragment(page, fragment)
+        assert page.success or page.error
+        after = section_runs(page)
+        assert {name: after[name] - before[name] for name in before} == {name: int(name == section) for name in before}
+        assert page.session_state["current_run"] is results
+        # After a fragment rerun the tree holds only the fragment's elements
+        run(page)
+
+    def answer_quiz():
+        answer = next(r for r in page.radio if r.label == "Select your answer:")
+        answer.set_value(answer.options[0])
+        next(b for b in page.button if b.label == "Submit Answer").click()
+
+    def give_feedback():
+        next(t for t in page.text_area if t.label.startswith("Please provide your feedback")).input("Nice charts")
+        next(b for b in page.button if b.label == "Submit Feedback").click()
+
+    only_reruns("Quiz", answer_quiz, "quiz_section")
+    only_reruns("Feedback", give_feedback, "feedback_section")
+    # Full reruns run every section, but never simulate again
+    assert section_runs(page).get("simulate", 0) == simulated
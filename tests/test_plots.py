@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from scipy.stats import gaussian_kde
+
+from ecosim.plots import dashboard_views, decimate, histogram_kde
+
+
+def test_decimate_keeps_extremes_and_ends():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=100_000)
+    keep = decimate(values, 500)
+    assert len(keep) <= 500
+    assert keep[0] == 0 and keep[-1] == len(values) - 1
+    assert values.argmax() in keep and values.argmin() in keep
+    np.testing.assert_array_equal(decimate(values[:100], 500), np.arange(100))
+
+
+def test_kde_matches_scipy():
+    values = np.random.default_rng(0).lognormal(size=500)
+    edges, counts, grid, density = histogram_kde(values)
+    assert counts.sum() == len(values)
+    # Scaled from a probability density to counts per histogram bin
+    expected = gaussian_kde(values)(grid) * (edges[1] - edges[0]) * len(values)
+    np.testing.assert_allclose(density, expected, rtol=0.01, atol=expected.max() * 0.005)
+
+
+@pytest.mark.parametrize("values", [[1.0, np.inf, 2.0, np.nan, 3.0], [np.nan] * 4, [np.inf, -np.inf]])
+def test_histogram_leaves_out_non_finite_values(values):
+    edges, counts, grid, density = histogram_kde(values)
+    assert counts.sum() == np.isfinite(values).sum()
+    assert np.isfinite(edges).all() and np.isfinite(density).all()
+
+
+def test_dashboard_of_non_finite_series_shows_an_empty_state():
+    finite = np.linspace(1, 100, 50)
+    views, stats = dashboard_views({"Plants": [np.nan] * 50, "Herbivores": finite, "Predators": finite})
+    assert len(views) == len(stats) == 4
+    distribution = next(fig for title, fig in views.items() if "Distribution" in title)
+    assert "Plants" in distribution.layout.annotations[0].text
@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from ecosim import runstore
+from ecosim.core import run_simulation
+from ecosim.ensemble import DEFAULT_PARAMS
+from ecosim.runstore import CATALOG_DTYPE, RunStore
+
+
+def simulate(store, steps=40, **params):
+    params = {**DEFAULT_PARAMS, **params}
+    return store.append(params, run_simulation(params, steps), mode="single", label="test", session="s1")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RunStore(str(tmp_path / "runs"))
+
+
+def test_append_and_read_back(store):
+    assert simulate(store) == 0 and simulate(store, plant_growth_rate=0.2, steps=25) == 1
+    assert len(store) == 2
+    expected = np.array(run_simulation({"plant_growth_rate": 0.2}, 25), dtype=np.float32)
+    assert np.array_equal(store.trajectory(1), expected)
+    assert store.params(1) == {**DEFAULT_PARAMS, "plant_growth_rate": 0.2, "time_steps": 25}
+    row = store.rows([1])[0]
+    assert (row["mode"], row["label"], row["session"]) == ("single", "test", "s1")
+    assert row["plants_final"] == pytest.approx(expected[0, -1])
+
+
+def test_rejects_empty_series(store):
+    with pytest.raises(ValueError):
+        store.append(DEFAULT_PARAMS, [[], [], []])
+
+
+def test_select_and_find(store):
+    rates = [0.05, 0.3, 0.1, 0.3]
+    for rate in rates:
+        simulate(store, plant_growth_rate=rate)
+    assert store.select(plant_growth_rate=(0.08, 0.3)).tolist() == [1, 2, 3]
+    assert store.select(plant_growth_rate=(None, 0.1)).tolist() == [0, 2]
+    assert store.select(plant_growth_rate=0.3, session="other").tolist() == []
+    simulate(store, plant_growth_rate=0.2)
+    assert store.select(plant_growth_rate=(0.15, 0.25)).tolist() == [4]
+    assert store.find({**DEFAULT_PARAMS, "plant_growth_rate": 0.3}, 40) == 3
+    assert store.find({**DEFAULT_PARAMS, "plant_growth_rate": 0.3}, 41) is None
+
+
+def test_diff_and_overlay(store):
+    a, b = simulate(store), simulate(store, herbivore_birth_rate=0.2, steps=30)
+    diff = store.diff(a, b)
+    assert diff["steps"] == 30
+    assert diff["params"] == {"herbivore_birth_rate": (DEFAULT_PARAMS["herbivore_birth_rate"], 0.2), "time_steps": (40, 30)}
+    first, second = store.trajectory(a)[1, :30].astype(float), store.trajectory(b)[1].astype(float)
+    assert diff["species"]["herbivores"]["max_abs"] == pytest.approx(np.abs(second - first).max())
+    assert store.diff(a, a)["species"]["plants"]["rmse"] == 0
+    steps, values = store.overlay([a], "plants", max_points=10)[a]
+    assert len(steps) <= 10 and np.array_equal(values, store.trajectory(a)[0, steps - 1])
+
+
+def test_reopening_drops_an_interrupted_append(store):
+    simulate(store)
+    with open(os.path.join(store.path, "trajectories.f32"), "ab") as f:
+        f.write(b"\0" * 12)
+    with open(os.path.join(store.path, "runs.bin"), "ab") as f:
+        f.write(b"\0" * (CATALOG_DTYPE.itemsize // 2))
+    reopened = RunStore(store.path)
+    assert len(reopened) == 1
+    assert simulate(reopened) == 1
+    assert np.array_equal(reopened.trajectory(1), reopened.trajectory(0))
+
+
+def test_two_stores_on_one_directory_interleave_appends(store):
+    other = RunStore(store.path)
+    for i in range(6):
+        writer = store if i % 2 else other
+        assert writer.append(DEFAULT_PARAMS, np.full((3, 10 + i), i)) == i
+    # Opening the directory again must not drop any of them
+    for reader in (store, other, RunStore(store.path)):
+        assert len(reader) == 6
+        assert [int(reader.trajectory(i)[0, -1]) for i in range(6)] == list(range(6))
+        assert [reader.trajectory(i).shape[1] for i in range(6)] == list(range(10, 16))
+
+
+def _append_runs(path, first, count):
+    store = RunStore(path)
+    for value in range(first, first + count):
+        store.append(DEFAULT_PARAMS, np.full((3, 1000), value), label=str(value))
+
+
+def _open_repeatedly(path, count):
+    for _ in range(count):
+        RunStore(path)
+
+
+@pytest.mark.skipif(runstore.fcntl is None, reason="appends are locked across processes only with fcntl")
+def test_processes_appending_and_opening_at_once(tmp_path):
+    path = str(tmp_path / "runs")
+    processes = [multiprocessing.Process(target=_append_runs, args=(path, 0, 40)),
+                 multiprocessing.Process(target=_append_runs, args=(path, 100, 40)),
+                 multiprocessing.Process(target=_open_repeatedly, args=(path, 100))]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+    store = RunStore(path)
+    rows = store.rows()
+    assert [row["run_id"] for row in rows] == list(range(80))
+    assert all((store.trajectory(row["run_id"]) == int(row["label"])).all() for row in rows)
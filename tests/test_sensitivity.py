@@ -0,0 +1,42 @@
+import numpy as np
+
+from ecosim.ensemble import replicate_keys
+from ecosim.sensitivity import PARAMETER_RANGES, evaluate, morris_analysis, sobol_analysis
+
+NAMES = ("plant_growth_rate", "herbivore_birth_rate", "predator_birth_rate", "pollution_level")
+
+
+def test_evaluation_counts():
+    k = len(PARAMETER_RANGES)
+    assert morris_analysis(20, 20, seed=0, workers=1).n_evaluations == 20 * (k + 1)
+    assert sobol_analysis(64, 20, seed=0, workers=1).n_evaluations == 64 * (k + 2)
+    # Rounded up to a power of two
+    assert sobol_analysis(100, 20, seed=0, workers=1).n_evaluations == 128 * (k + 2)
+
+
+def test_same_seed_same_indices():
+    first = sobol_analysis(64, 20, names=NAMES, seed=3, workers=1)
+    second = sobol_analysis(64, 20, names=NAMES, seed=3, workers=1)
+    for species, indices in first.indices.items():
+        np.testing.assert_array_equal(indices["ST"], second.indices[species]["ST"])
+
+
+def test_each_population_is_driven_by_its_own_growth_rate():
+    morris = morris_analysis(200, 30, names=NAMES, seed=0, workers=1)
+    sobol = sobol_analysis(1024, 30, names=NAMES, seed=0, workers=1)
+    for result in (morris, sobol):
+        assert result.ranking("plants")[0] == "plant_growth_rate"
+        assert result.ranking("herbivores")[0] == "herbivore_birth_rate"
+    # Total effects include the first-order ones, up to estimation error
+    for indices in sobol.indices.values():
+        assert (indices["ST"] >= indices["S1"] - 0.05).all()
+
+
+def test_process_pool_matches_a_single_process():
+    rng = np.random.default_rng(0)
+    samples = rng.random((9000, len(NAMES)))
+    keys = replicate_keys(0, len(samples))
+    done = []
+    pooled = evaluate(samples, NAMES, keys, 20, workers=None, progress=lambda done_, total: done.append((done_, total)))
+    np.testing.assert_array_equal(pooled, evaluate(samples, NAMES, keys, 20, workers=1))
+    assert done[-1] == (9000, 9000)
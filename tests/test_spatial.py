@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from ecosim.core import run_simulation
+from ecosim.ensemble import DEFAULT_PARAMS
+from ecosim.spatial import DENSITY_LIMIT, SpatialEcosystem, terrain_map
+
+FAST_GROWTH = {**DEFAULT_PARAMS, "plant_growth_rate": 0.5, "water_availability": 1.0}
+
+
+def test_terrain_map_is_clipped_around_its_mean():
+    field = terrain_map((64, 64), 0.5, rng=0)
+    assert field.dtype == np.float32
+    assert field.min() >= 0 and field.max() <= 1
+    assert abs(field.mean() - 0.5) < 0.05
+
+
+def test_uniform_grid_follows_run_simulation():
+    shape = (4, 4)
+    eco = SpatialEcosystem(DEFAULT_PARAMS, shape=shape, seed=0, water_map=np.full(shape, DEFAULT_PARAMS["water_availability"]),
+                           soil_map=np.full(shape, DEFAULT_PARAMS["soil_quality"]))
+    for x, name in ((eco.plants, "initial_plants"), (eco.herbivores, "initial_herbivores"), (eco.predators, "initial_predators")):
+        x.fill(DEFAULT_PARAMS[name])
+    expected = np.array(run_simulation(DEFAULT_PARAMS, 20))[:, -1]
+    list(eco.run(20))
+    np.testing.assert_allclose(eco.mean_densities(), expected, rtol=1e-4)
+
+
+def test_diffusion_conserves_individuals():
+    eco = SpatialEcosystem(DEFAULT_PARAMS, shape=(32, 48), seed=0)
+    before = eco.herbivores.sum(dtype=np.float64)
+    eco._diffuse(eco.herbivores, 0.25)
+    assert eco.herbivores.sum(dtype=np.float64) == pytest.approx(before, rel=1e-5)
+
+
+def test_run_stops_before_densities_overflow():
+    eco = SpatialEcosystem(FAST_GROWTH, shape=(50, 50), seed=0)
+    steps = list(eco.run(200))
+    assert 0 < eco.t < 200 and steps[-1] == eco.t
+    for x in (eco.plants, eco.herbivores, eco.predators):
+        assert np.isfinite(x).all() and x.max() <= DENSITY_LIMIT
+    assert np.isfinite(eco.mean_densities()).all()
+    assert not eco.step() and eco.t == steps[-1]
+
+
+def test_frame_is_an_rgb_image():
+    eco = SpatialEcosystem(DEFAULT_PARAMS, shape=(300, 200), seed=0)
+    image = eco.frame(max_size=100)
+    assert image.dtype == np.uint8 and image.shape == (100, 67, 3)
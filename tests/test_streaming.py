@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from ecosim.core import run_simulation
+from ecosim.ensemble import DEFAULT_PARAMS
+from ecosim.streaming import PeakDownsampler, RunningStats, simulation_chunks
+
+CAPACITY = [100 * DEFAULT_PARAMS[f"initial_{name}"] for name in ("plants", "herbivores", "predators")]
+
+
+def collect(chunks):
+    return np.concatenate(list(chunks), axis=1)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+def test_chunks_match_run_simulation(chunk_size):
+    expected = np.array(run_simulation(DEFAULT_PARAMS, 200))
+    assert np.array_equal(collect(simulation_chunks(DEFAULT_PARAMS, 200, chunk_size)), expected)
+
+
+def test_unbounded_run_stops_at_the_last_finite_step():
+    trajectory = collect(simulation_chunks(DEFAULT_PARAMS, 10**6))
+    assert 0 < trajectory.shape[1] < 10**6
+    assert np.isfinite(trajectory).all()
+
+
+@pytest.mark.parametrize("params", [
+    DEFAULT_PARAMS,
+    # Settles into a cycle of two states one unit in the last place apart
+    {**DEFAULT_PARAMS, "plant_growth_rate": 0.5, "water_availability": 1.0, "human_impact": 0.0},
+])
+def test_steady_state_fill_matches_stepping(params):
+    capacity = [100 * params[f"initial_{name}"] for name in ("plants", "herbivores", "predators")]
+    stepped = collect(simulation_chunks(params, 30_000, chunk_size=30_000, capacity=capacity))
+    for chunk_size in (3, 1000, 4999):
+        assert np.array_equal(collect(simulation_chunks(params, 30_000, chunk_size, capacity=capacity)), stepped)
+
+
+def test_bounded_run_reaches_long_horizons():
+    trajectory = collect(simulation_chunks(DEFAULT_PARAMS, 10**7, capacity=CAPACITY))
+    assert trajectory.shape == (3, 10**7)
+    assert (trajectory <= np.array(CAPACITY)[:, None]).all()
+
+
+def test_running_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(size=(3, 10_000))
+    stats = RunningStats()
+    for start in range(0, data.shape[1], 999):
+        stats.update(data[:, start:start + 999])
+    assert stats.count == data.shape[1]
+    np.testing.assert_allclose(stats.mean, data.mean(axis=1))
+    np.testing.assert_allclose(stats.std, data.std(axis=1))
+    np.testing.assert_allclose(stats.correlation, np.corrcoef(data))
+    np.testing.assert_array_equal(stats.min, data.min(axis=1))
+    np.testing.assert_array_equal(stats.max, data.max(axis=1))
+
+
+def test_downsampler_is_bounded_and_keeps_extremes():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(3, 100_000))
+    downsampler = PeakDownsampler(max_points=500)
+    for start in range(0, data.shape[1], 4096):
+        downsampler.update(data[:, start:start + 4096])
+    for i in range(3):
+        steps, values = downsampler.series(i)
+        assert len(values) <= 500
+        assert np.all(np.diff(steps) >= 0)
+        assert values.max() == data[i].max() and values.min() == data[i].min()
+        np.testing.assert_array_equal(data[i, steps], values)
@@ -0,0 +1,173 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+
+import pytest
+
+from ecosim import timing
+from ecosim.timing import BUCKETS, SamplingProfiler, SectionTimer, prometheus_text, span
+
+
+@pytest.fixture
+def process_timer(monkeypatch):
+    """A fresh process-wide timer for the test."""
+    fresh = SectionTimer()
+    monkeypatch.setattr(timing, "process_timer", fresh)
+    return fresh
+
+
+def runs(timer):
+    return {row["section"]: row["runs"] for row in timer.report()}
+
+
+def test_record_and_report():
+    timer = SectionTimer()
+    for seconds in (0.002, 0.004, 0.003):
+        timer.record("chart", seconds)
+    timer.record("setup", 0.5)
+    chart, setup = timer.report()
+    assert (chart["section"], chart["runs"], setup["section"]) == ("chart", 3, "setup")
+    assert chart["last_ms"] == pytest.approx(3) and chart["max_ms"] == pytest.approx(4)
+    assert chart["mean_ms"] == pytest.approx(3) and chart["total_ms"] == pytest.approx(9)
+    timer.reset()
+    assert timer.report() == []
+
+
+def test_spans_are_recorded_by_the_enclosing_section(process_timer):
+    session = SectionTimer()
+    with session.section("Simulation results"):
+        with span("dashboard.build"):
+            with span("figure.png"):
+                pass
+        with span("dashboard.build"):
+            pass
+    assert runs(session) == {"figure.png": 1, "dashboard.build": 2, "Simulation results": 1}
+    assert runs(process_timer) == runs(session)
+    report = {row["section"]: row for row in session.report()}
+    assert report["dashboard.build"]["total_ms"] <= report["Simulation results"]["total_ms"]
+
+    # Outside any section a span is only counted process-wide
+    with span("knowledge.lookup"):
+        pass
+    assert "knowledge.lookup" not in runs(session)
+    assert runs(process_timer)["knowledge.lookup"] == 1
+
+
+def test_each_session_keeps_its_own_spans(process_timer):
+    first, second = SectionTimer(), SectionTimer()
+    with first.section("Chatbot"):
+        with second.section("Chatbot"):
+            with span("simulate"):
+                pass
+        # Leaving the inner section restores the outer one
+        with span("knowledge.lookup"):
+            pass
+    assert runs(first) == {"knowledge.lookup": 1, "Chatbot": 1}
+    assert runs(second) == {"simulate": 1, "Chatbot": 1}
+    assert runs(process_timer) == {"simulate": 1, "knowledge.lookup": 1, "Chatbot": 2}
+
+
+def test_threads_started_with_the_context_record_into_the_session(process_timer):
+    session = SectionTimer()
+
+    def generate():
+        with span("chatbot.generate"):
+            pass
+
+    with session.section("Chatbot"):
+        context = contextvars.copy_context()
+        threads = [threading.Thread(target=context.run, args=(generate,)), threading.Thread(target=generate)]
+        for thread in threads:
+            thread.start()
+            thread.join()
+    assert runs(session) == {"chatbot.generate": 1, "Chatbot": 1}
+    assert runs(process_timer)["chatbot.generate"] == 2
+
+
+def test_prometheus_histogram():
+    timer = SectionTimer()
+    for seconds in (0.003, 0.02, 100.0):
+        timer.record('say "hi"', seconds)
+    lines = prometheus_text(timer, metric="m").splitlines()
+    assert lines[:2] == ["# HELP m Time spent in sections and hot paths of the Ecosystem Analyzer.",
+                         "# TYPE m histogram"]
+    label = 'span="say \\"hi\\""'
+    expected = {0.001: 0, 0.005: 1, 0.01: 1, 0.025: 2}
+    buckets = [f'm_bucket{{{label},le="{bound:g}"}} {expected.get(bound, 2)}' for bound in BUCKETS]
+    assert lines[2:] == buckets + [f'm_bucket{{{label},le="+Inf"}} 3', f"m_sum{{{label}}} 100.023000",
+                                   f"m_count{{{label}}} 3"]
+
+
+def test_write_prometheus_replaces_the_file(tmp_path):
+    timer = SectionTimer()
+    timer.record("simulate", 0.01)
+    path = tmp_path / "ecosim.prom"
+    path.write_text("stale")
+    timing.write_prometheus(str(path), timer)
+    assert path.read_text() == prometheus_text(timer)
+    assert os.listdir(tmp_path) == ["ecosim.prom"]
+
+
+def test_prometheus_export_starts_once_per_path(tmp_path, process_timer):
+    process_timer.record("simulate", 0.01)
+    path = str(tmp_path / "ecosim.prom")
+    timing.start_prometheus_export(path, interval=3600)
+    timing.start_prometheus_export(path, interval=3600)
+    assert [thread.name for thread in threading.enumerate()].count(f"metrics export {path}") == 1
+    deadline = time.monotonic() + 10
+    while not os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with open(path) as f:
+        assert 'ecosim_span_seconds_count{span="simulate"} 1' in f.read()
+
+
+def test_span_log_writes_one_json_line_per_measurement(tmp_path, process_timer):
+    path = str(tmp_path / "spans.jsonl")
+    timing.enable_span_log(path)
+    timing.enable_span_log(path)
+    logger = logging.getLogger("ecosim.spans")
+    try:
+        session = SectionTimer()
+        with session.section("Quiz"):
+            pass
+    finally:
+        for handler in [h for h in logger.handlers if getattr(h, "baseFilename", None) == path]:
+            logger.removeHandler(handler)
+            handler.close()
+        logger.setLevel(logging.NOTSET)
+    with open(path) as f:
+        (line,) = f.read().splitlines()
+    entry = json.loads(line)
+    assert (entry["span"], entry["session"]) == ("Quiz", session.id) and entry["seconds"] >= 0
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_finds_the_busy_function():
+    profiler = SamplingProfiler(interval=0.001).start()
+    busy_loop(0.3)
+    profiler.stop()
+    assert profiler.samples > 10 and profiler.seconds >= 0.3
+    top = {row["function"]: row for row in profiler.top()}
+    assert top["busy_loop"]["total_pct"] > 50
+    assert top["busy_loop"]["location"] == f"test_timing.py:{busy_loop.__code__.co_firstlineno}"
+    for line in profiler.collapsed().splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0 and stack.split(";")[-1].endswith(")")
+    assert any("busy_loop (test_timing.py:" in line for line in profiler.collapsed().splitlines())
+
+
+def test_sampling_profiler_stops_by_itself():
+    profiler = SamplingProfiler(interval=0.001, max_seconds=0.05).start()
+    busy_loop(0.3)
+    assert not profiler._thread.is_alive()
+    samples = profiler.samples
+    busy_loop(0.05)
+    assert profiler.stop().samples == samples